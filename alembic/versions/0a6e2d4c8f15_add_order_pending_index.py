@@ -0,0 +1,41 @@
+"""Add partial index on pending orders
+
+Revision ID: 0a6e2d4c8f15
+Revises: f7c3e9a1d2b4
+Create Date: 2026-10-18 23:12:05.604318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0a6e2d4c8f15"
+down_revision: Union[str, None] = "f7c3e9a1d2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fulfillment workers claim the oldest pending orders; the index only
+    # holds those, so claiming does not scan the order history
+    op.create_index(
+        "ix_order_pending",
+        "order",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_order_pending",
+        table_name="order",
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
@@ -0,0 +1,83 @@
+"""Materialize stock valuation view
+
+Revision ID: 3c8b5e0f9d21
+Revises: a4d7c9e2b815
+Create Date: 2026-10-18 15:02:47.118306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8b5e0f9d21"
+down_revision: Union[str, None] = "a4d7c9e2b815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP VIEW vw_stock_valuation")
+    # No refresh timestamp per product: it would change every row on every
+    # refresh, and a concurrent refresh only rewrites the rows that changed
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW vw_stock_valuation AS
+        SELECT p.id,
+               p.name,
+               p.sku,
+               p.supplier_id,
+               p.price,
+               p.quantity_in_stock,
+               p.price * p.quantity_in_stock AS valuation
+        FROM product p
+        """
+    )
+    # REFRESH ... CONCURRENTLY needs a unique index covering every row
+    op.execute(
+        "CREATE UNIQUE INDEX ux_vw_stock_valuation_id ON vw_stock_valuation (id)"
+    )
+    op.execute(
+        "CREATE INDEX ix_vw_stock_valuation_supplier_id_id "
+        "ON vw_stock_valuation (supplier_id, id)"
+    )
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW vw_supplier_stock_valuation AS
+        SELECT s.id AS supplier_id,
+               s.name AS supplier_name,
+               COUNT(v.id) AS product_count,
+               SUM(v.quantity_in_stock) AS units_in_stock,
+               SUM(v.valuation) AS total_valuation,
+               now() AS refreshed_at
+        FROM vw_stock_valuation v
+        JOIN supplier s ON s.id = v.supplier_id
+        GROUP BY s.id, s.name
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ux_vw_supplier_stock_valuation_supplier_id "
+        "ON vw_supplier_stock_valuation (supplier_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW vw_supplier_stock_valuation")
+    op.execute("DROP MATERIALIZED VIEW vw_stock_valuation")
+    op.execute(
+        """
+        CREATE VIEW vw_stock_valuation AS
+         SELECT p.id,
+            p.name,
+            p.sku,
+            p.price,
+            p.quantity_in_stock,
+            p.price * p.quantity_in_stock AS valuation
+           FROM product p;
+        """
+    )
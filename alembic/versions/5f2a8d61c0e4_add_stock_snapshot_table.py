@@ -0,0 +1,51 @@
+"""Add stock_snapshot table and per-product movement index
+
+Revision ID: 5f2a8d61c0e4
+Revises: 9b1e4c2f7a3d
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2a8d61c0e4"
+down_revision: Union[str, None] = "9b1e4c2f7a3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stock_snapshot",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.PrimaryKeyConstraint("product_id", "taken_at"),
+    )
+    op.create_index(
+        op.f("ix_stock_snapshot_taken_at"), "stock_snapshot", ["taken_at"], unique=False
+    )
+    # Created on the partitioned parent, so every partition (including future
+    # ones) gets its own copy
+    op.create_index(
+        "ix_inventory_movement_product_id_timestamp",
+        "inventory_movement",
+        ["product_id", "timestamp"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_inventory_movement_product_id_timestamp", table_name="inventory_movement"
+    )
+    op.drop_index(op.f("ix_stock_snapshot_taken_at"), table_name="stock_snapshot")
+    op.drop_table("stock_snapshot")
@@ -0,0 +1,30 @@
+"""Add (name, id) index on supplier for keyset pagination
+
+Revision ID: 9b1e4c2f7a3d
+Revises: e1791914e43a
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1e4c2f7a3d"
+down_revision: Union[str, None] = "e1791914e43a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves `ORDER BY name, id` and `WHERE (name, id) > (...)` in one index scan
+    op.create_index("ix_supplier_name_id", "supplier", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_supplier_name_id", table_name="supplier")
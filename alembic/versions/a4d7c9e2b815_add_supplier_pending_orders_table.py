@@ -0,0 +1,58 @@
+"""Add supplier_pending_orders aggregate table
+
+Revision ID: a4d7c9e2b815
+Revises: 5f2a8d61c0e4
+Create Date: 2026-10-18 13:41:02.771530
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7c9e2b815"
+down_revision: Union[str, None] = "5f2a8d61c0e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Maintenance looks up the items of the orders that changed status
+    op.create_index(
+        op.f("ix_order_items_order_id"), "order_items", ["order_id"], unique=False
+    )
+    op.create_table(
+        "supplier_pending_orders",
+        sa.Column("supplier_id", sa.Integer(), nullable=False),
+        sa.Column("pending_orders_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["supplier_id"], ["supplier.id"]),
+        sa.PrimaryKeyConstraint("supplier_id"),
+    )
+    # Backfill from the existing orders
+    op.execute(
+        """
+        INSERT INTO supplier_pending_orders (supplier_id, pending_orders_count)
+        SELECT p.supplier_id, COUNT(DISTINCT o.id)
+        FROM "order" o
+        JOIN order_items oi ON oi.order_id = o.id
+        JOIN product p ON p.id = oi.product_id
+        WHERE o.status = 'PENDING' AND p.supplier_id IS NOT NULL
+        GROUP BY p.supplier_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("supplier_pending_orders")
+    op.drop_index(op.f("ix_order_items_order_id"), table_name="order_items")
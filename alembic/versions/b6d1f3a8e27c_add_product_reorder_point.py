@@ -0,0 +1,90 @@
+"""Add product reorder point and low stock notifications
+
+Revision ID: b6d1f3a8e27c
+Revises: 7e2f4a9c6b13
+Create Date: 2026-10-18 17:05:33.902114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d1f3a8e27c"
+down_revision: Union[str, None] = "7e2f4a9c6b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "product",
+        sa.Column("reorder_point", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Only holds the few products below their reorder point
+    op.create_index(
+        "ix_product_below_reorder_point",
+        "product",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("quantity_in_stock < reorder_point"),
+    )
+    # Every write that moves a product across its reorder point, whichever
+    # code path it comes from, sends a notification on the low_stock channel.
+    # Notifications are only delivered if the transaction commits. The WHEN
+    # clauses keep the cost away from all other updates.
+    op.execute(
+        """
+        CREATE FUNCTION notify_low_stock() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('low_stock', json_build_object(
+                'product_id', NEW.id,
+                'sku', NEW.sku,
+                'name', NEW.name,
+                'quantity_in_stock', NEW.quantity_in_stock,
+                'reorder_point', NEW.reorder_point,
+                'status', CASE WHEN NEW.quantity_in_stock < NEW.reorder_point
+                               THEN 'low' ELSE 'recovered' END,
+                'at', now()
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_low_stock_on_update
+        AFTER UPDATE OF quantity_in_stock, reorder_point ON product
+        FOR EACH ROW
+        WHEN ((OLD.quantity_in_stock < OLD.reorder_point)
+              IS DISTINCT FROM (NEW.quantity_in_stock < NEW.reorder_point))
+        EXECUTE FUNCTION notify_low_stock()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_low_stock_on_insert
+        AFTER INSERT ON product
+        FOR EACH ROW
+        WHEN (NEW.quantity_in_stock < NEW.reorder_point)
+        EXECUTE FUNCTION notify_low_stock()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER product_low_stock_on_insert ON product")
+    op.execute("DROP TRIGGER product_low_stock_on_update ON product")
+    op.execute("DROP FUNCTION notify_low_stock()")
+    op.drop_index(
+        "ix_product_below_reorder_point",
+        table_name="product",
+        postgresql_where=sa.text("quantity_in_stock < reorder_point"),
+    )
+    op.drop_column("product", "reorder_point")
@@ -0,0 +1,99 @@
+"""Add daily inventory movement rollup
+
+Revision ID: c2a9e5d7f140
+Revises: b6d1f3a8e27c
+Create Date: 2026-10-18 18:10:41.377052
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2a9e5d7f140"
+down_revision: Union[str, None] = "b6d1f3a8e27c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "movement_daily_rollup",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "movement_type",
+            postgresql.ENUM(name="movementtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("quantity", sa.BigInteger(), nullable=False),
+        sa.Column("movement_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        # Covering, so that reading a range of days is an index-only scan
+        sa.PrimaryKeyConstraint(
+            "day", "product_id", "movement_type", postgresql_include=["quantity"]
+        ),
+    )
+    op.create_index(
+        "ix_movement_daily_rollup_product_id_day",
+        "movement_daily_rollup",
+        ["product_id", "day"],
+        unique=False,
+    )
+    # Folds every INSERT into inventory_movement into the rollup, once per
+    # statement. Rows are upserted in (product_id, day) order; writers lock
+    # product rows before inserting movements, so this can not deadlock.
+    op.execute(
+        """
+        CREATE FUNCTION rollup_inventory_movements() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO movement_daily_rollup AS r
+                (day, product_id, movement_type, quantity, movement_count)
+            SELECT (timestamp AT TIME ZONE 'UTC')::date, product_id,
+                   movement_type, SUM(quantity_changed), COUNT(*)
+            FROM new_rows
+            GROUP BY 1, 2, 3
+            ORDER BY 2, 1, 3
+            ON CONFLICT (day, product_id, movement_type) DO UPDATE
+            SET quantity = r.quantity + EXCLUDED.quantity,
+                movement_count = r.movement_count + EXCLUDED.movement_count;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER inventory_movement_rollup
+        AFTER INSERT ON inventory_movement
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION rollup_inventory_movements()
+        """
+    )
+    # Backfill from the existing movements
+    op.execute(
+        """
+        INSERT INTO movement_daily_rollup
+            (day, product_id, movement_type, quantity, movement_count)
+        SELECT (timestamp AT TIME ZONE 'UTC')::date, product_id, movement_type,
+               SUM(quantity_changed), COUNT(*)
+        FROM inventory_movement
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER inventory_movement_rollup ON inventory_movement")
+    op.execute("DROP FUNCTION rollup_inventory_movements()")
+    op.drop_index(
+        "ix_movement_daily_rollup_product_id_day", table_name="movement_daily_rollup"
+    )
+    op.drop_table("movement_daily_rollup")
@@ -0,0 +1,167 @@
+"""Add product search indexes and change log
+
+Revision ID: d4b8f2a61e97
+Revises: c2a9e5d7f140
+Create Date: 2026-10-18 19:02:17.514830
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b8f2a61e97"
+down_revision: Union[str, None] = "c2a9e5d7f140"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, sku), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Substring (ILIKE '%...%') and fuzzy (%, <%) matches on name and SKU
+    op.create_index(
+        "ix_product_name_trgm",
+        "product",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_product_sku_trgm",
+        "product",
+        ["sku"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"sku": "gin_trgm_ops"},
+    )
+    # Stored rather than only indexed, so that ranking the matches does not
+    # parse every matching product's text again. Rewrites the table.
+    op.add_column(
+        "product",
+        sa.Column(
+            "search_document",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_DOCUMENT, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_product_search_document",
+        "product",
+        ["search_document"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Products whose name changed, read by the autocomplete index of every
+    # app process (app/core/autocomplete.py). Rows are found by the id of
+    # the transaction that wrote them, see `crud_search.get_name_changes`.
+    op.create_table(
+        "product_search_change",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        # Id of the writing transaction, as a bigint since xid8 has no
+        # SQLAlchemy type; 64-bit transaction ids never reach the sign bit
+        sa.Column(
+            "xid",
+            sa.BigInteger(),
+            server_default=sa.text(
+                "CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)"
+            ),
+            nullable=False,
+        ),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        # The name before an update or delete, NULL for new products
+        sa.Column("old_name", sa.String(), nullable=True),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_product_search_change_xid",
+        "product_search_change",
+        ["xid"],
+        unique=False,
+    )
+    # New products are logged once per statement. Updates only fire the
+    # row trigger when `name` is assigned to something else, so stock and
+    # price updates pay nothing.
+    op.execute(
+        """
+        CREATE FUNCTION log_product_search_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO product_search_change (product_id)
+            SELECT id FROM new_rows;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION log_product_search_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO product_search_change (product_id, old_name)
+            VALUES (OLD.id, OLD.name);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_search_on_insert
+        AFTER INSERT ON product
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION log_product_search_insert()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_search_on_update
+        AFTER UPDATE OF name ON product
+        FOR EACH ROW
+        WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION log_product_search_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_search_on_delete
+        AFTER DELETE ON product
+        FOR EACH ROW
+        EXECUTE FUNCTION log_product_search_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER product_search_on_delete ON product")
+    op.execute("DROP TRIGGER product_search_on_update ON product")
+    op.execute("DROP TRIGGER product_search_on_insert ON product")
+    op.execute("DROP FUNCTION log_product_search_change()")
+    op.execute("DROP FUNCTION log_product_search_insert()")
+    op.drop_index("ix_product_search_change_xid", table_name="product_search_change")
+    op.drop_table("product_search_change")
+    op.drop_index("ix_product_search_document", table_name="product")
+    op.drop_column("product", "search_document")
+    op.drop_index("ix_product_sku_trgm", table_name="product")
+    op.drop_index("ix_product_name_trgm", table_name="product")
+    # pg_trgm is left installed, other objects may depend on it
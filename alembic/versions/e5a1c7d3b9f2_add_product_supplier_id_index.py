@@ -0,0 +1,33 @@
+"""Add (supplier_id, id) index on product
+
+Revision ID: e5a1c7d3b9f2
+Revises: d4b8f2a61e97
+Create Date: 2026-10-18 21:40:06.352917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c7d3b9f2"
+down_revision: Union[str, None] = "d4b8f2a61e97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the products of a batch of suppliers, in id order, and their
+    # per-supplier aggregates, without scanning the whole table
+    op.create_index(
+        "ix_product_supplier_id_id", "product", ["supplier_id", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_supplier_id_id", table_name="product")
@@ -0,0 +1,61 @@
+"""Add row versions to product and supplier
+
+Revision ID: f7c3e9a1d2b4
+Revises: e5a1c7d3b9f2
+Create Date: 2026-10-18 22:31:47.118205
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7c3e9a1d2b4"
+down_revision: Union[str, None] = "e5a1c7d3b9f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows all start at version 1; with a constant default, adding
+    # the column does not rewrite the tables
+    for table in ("product", "supplier"):
+        op.add_column(
+            table,
+            sa.Column("version", sa.BigInteger(), server_default="1", nullable=False),
+        )
+    # Every update bumps the version, whichever code path makes it (ORM,
+    # bulk upserts, stock reservations, movement ingestion), so ETags built
+    # from it can not go stale
+    op.execute(
+        """
+        CREATE FUNCTION bump_row_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ("product", "supplier"):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_bump_version
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW
+            EXECUTE FUNCTION bump_row_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("product", "supplier"):
+        op.execute(f"DROP TRIGGER {table}_bump_version ON {table}")
+    op.execute("DROP FUNCTION bump_row_version()")
+    for table in ("product", "supplier"):
+        op.drop_column(table, "version")
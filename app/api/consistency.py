@@ -0,0 +1,58 @@
+# app/api/consistency.py
+"""
+Read-your-writes on top of a lagging read replica.
+
+With READ_REPLICA_URL set, every successful write request is answered with
+the primary's current WAL position in the `X-Primary-LSN` header. A client
+that passes it back as `X-Min-LSN` on a later read is only served by the
+replica once the replica has replayed that far, and by the primary until
+then (see `deps.get_read_db`). Reads without the header may lag behind the
+primary by as much as the replica does.
+
+Writes accepted for later processing (POST /inventory/movements) are not
+covered: the token is taken before they are written.
+"""
+import re
+
+from sqlalchemy import text
+
+from app.db.session import async_engine
+
+PRIMARY_LSN_HEADER = "X-Primary-LSN"
+MIN_LSN_HEADER = "X-Min-LSN"
+
+LSN_PATTERN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware adding the primary's WAL position to write responses.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_lsn(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                # Taken after the handler committed, so it covers the write
+                async with async_engine.connect() as connection:
+                    lsn = await connection.scalar(
+                        text("SELECT CAST(pg_current_wal_lsn() AS TEXT)")
+                    )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (PRIMARY_LSN_HEADER.lower().encode(), str(lsn).encode()),
+                    ],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_lsn)
@@ -1,10 +1,52 @@
 # app/api/deps.py
-from app.db.session import SessionLocal
+from typing import AsyncIterator
 
+from fastapi import Header, HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_db():
-    db = SessionLocal()
-    try:
+from app.api.consistency import LSN_PATTERN, MIN_LSN_HEADER
+from app.db.session import AsyncSessionLocal, ReplicaSessionLocal
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(
+    min_lsn: str | None = Header(default=None, alias=MIN_LSN_HEADER),
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only routes: on the read replica when one is
+    configured, unless the client asks to see its own writes (the
+    `X-Min-LSN` header, see app.api.consistency) and the replica has not
+    replayed them yet. Without a replica this is `get_db`.
+    """
+    if min_lsn is not None and not LSN_PATTERN.match(min_lsn):
+        raise HTTPException(status_code=400, detail=f"Invalid {MIN_LSN_HEADER}.")
+    if ReplicaSessionLocal is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with ReplicaSessionLocal() as db:
+        if min_lsn is None:
+            yield db
+            return
+        # A server that is not in recovery is not lagging behind anything
+        caught_up = await db.scalar(
+            text(
+                "SELECT COALESCE("
+                "pg_last_wal_replay_lsn() >= CAST(CAST(:lsn AS TEXT) AS pg_lsn), "
+                "NOT pg_is_in_recovery())"
+            ),
+            {"lsn": min_lsn},
+        )
+        if caught_up:
+            db.info["min_lsn"] = min_lsn
+            yield db
+            return
+    async with AsyncSessionLocal() as db:
+        db.info["min_lsn"] = min_lsn
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,110 @@
+# app/api/endpoints/alerts.py
+import asyncio
+import datetime
+import json
+from typing import AsyncIterator
+
+import asyncpg  # type: ignore[import-untyped]
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.alerts import low_stock_alerts
+from app.core.config import settings
+from app.crud import crud_product
+from app.crud.pagination import InvalidCursorError
+from app.db.session import AsyncSessionLocal
+from app.schemas.pagination import Page
+from app.schemas.product import Product
+
+router = APIRouter()
+
+
+@router.get("/low-stock", response_model=Page[Product])
+async def read_low_stock_products(
+    db: AsyncSession = Depends(deps.get_read_db),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    Products currently below their reorder point, one page at a time.
+    """
+    try:
+        products, next_cursor = await crud_product.get_low_stock_products(
+            db, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Page(items=products, next_cursor=next_cursor)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _current_low_stock() -> AsyncIterator[dict]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            products, cursor = await crud_product.get_low_stock_products(
+                db, cursor=cursor, limit=1000
+            )
+            for product in products:
+                yield {
+                    "product_id": product.id,
+                    "sku": product.sku,
+                    "name": product.name,
+                    "quantity_in_stock": product.quantity_in_stock,
+                    "reorder_point": product.reorder_point,
+                    "status": "low",
+                    "at": now,
+                }
+            if cursor is None:
+                return
+
+
+@router.get("/low-stock/stream")
+async def stream_low_stock_alerts(current: bool = True):
+    """
+    Server-Sent Events stream of `low_stock` events, one each time a product
+    drops below its reorder point (status "low") or gets back to it (status
+    "recovered").
+
+    With `current` (the default) the stream starts with a "low" event for
+    every product already below its reorder point, so a client that
+    (re)connects does not miss any. The stream ends if the client falls too
+    far behind; reconnecting resynchronizes it.
+    """
+    try:
+        # Subscribe before reading the current state, so no change falls
+        # in between
+        queue = await low_stock_alerts.subscribe()
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        raise HTTPException(status_code=503, detail=f"Alerts unavailable: {e}")
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            if current:
+                async for alert in _current_low_stock():
+                    yield _sse("low_stock", alert)
+            while True:
+                try:
+                    alert = await asyncio.wait_for(
+                        queue.get(), timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if alert is None:
+                    return
+                yield _sse("low_stock", alert)
+        finally:
+            await low_stock_alerts.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
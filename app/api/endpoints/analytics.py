@@ -0,0 +1,45 @@
+# app/api/endpoints/analytics.py
+import datetime
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.crud import crud_analytics
+from app.schemas.analytics import VelocityReport
+
+router = APIRouter()
+
+
+@router.get("/velocity", response_model=VelocityReport)
+async def read_velocity(
+    db: AsyncSession = Depends(deps.get_read_db),
+    as_of: datetime.date | None = None,
+    window: int = Query(default=28, ge=1, le=365),
+    short_window: int = Query(default=7, ge=1, le=365),
+    product_id: List[int] | None = Query(default=None),
+    sort: Literal["days_of_cover", "velocity"] = "days_of_cover",
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    Daily sales velocity (moving averages of net units sold over `window`
+    and `short_window` days ending on `as_of`, today by default) and days of
+    cover for every product.
+
+    Returns the `limit` products that run out first (`sort=days_of_cover`) or
+    sell fastest (`sort=velocity`), or only the given `product_id`s.
+    """
+    if short_window > window:
+        raise HTTPException(
+            status_code=422, detail="short_window can not exceed window."
+        )
+    return await crud_analytics.get_velocity(
+        db,
+        as_of=as_of or datetime.datetime.now(datetime.timezone.utc).date(),
+        window=window,
+        short_window=short_window,
+        product_ids=product_id,
+        sort=sort,
+        limit=limit,
+    )
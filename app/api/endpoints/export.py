@@ -0,0 +1,71 @@
+# app/api/endpoints/export.py
+import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core import export
+from app.core.export import ExportFormat
+from app.db.session import AsyncSessionLocal, ReplicaSessionLocal
+
+router = APIRouter()
+
+# Exports are long reads that need not see the latest writes
+session_factory = ReplicaSessionLocal or AsyncSessionLocal
+
+
+def _attachment(blocks, name: str, export_format: ExportFormat) -> StreamingResponse:
+    return StreamingResponse(
+        blocks,
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        },
+    )
+
+
+def _as_utc(at: datetime.datetime | None) -> datetime.datetime | None:
+    if at is not None and at.tzinfo is None:
+        return at.replace(tzinfo=datetime.timezone.utc)
+    return at
+
+
+@router.get("/products", response_class=StreamingResponse)
+async def export_products(
+    export_format: ExportFormat = Query(default="csv", alias="format"),
+):
+    """
+    Download the whole catalog, by product id, as CSV (default) or NDJSON.
+
+    The file is streamed while it is read from the database, from a single
+    snapshot.
+    """
+    return _attachment(
+        export.export_products(session_factory, export_format),
+        "products",
+        export_format,
+    )
+
+
+@router.get("/inventory-movements", response_class=StreamingResponse)
+async def export_inventory_movements(
+    start: datetime.datetime | None = Query(default=None, alias="from"),
+    end: datetime.datetime | None = Query(default=None, alias="to"),
+    export_format: ExportFormat = Query(default="csv", alias="format"),
+):
+    """
+    Download the inventory movements recorded from `from` (inclusive) to
+    `to` (exclusive), as CSV (default) or NDJSON. Either bound may be left
+    out; timestamps without a timezone are taken as UTC.
+
+    Only the partitions overlapping the range are read. Movements come
+    roughly in the order they were recorded.
+    """
+    start, end = _as_utc(start), _as_utc(end)
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=422, detail="to must be after from.")
+    return _attachment(
+        export.export_movements(session_factory, export_format, start=start, end=end),
+        "inventory-movements",
+        export_format,
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.db import warmup
+
+router = APIRouter()
+
+
+@router.get("/live")
+def read_liveness():
+    """
+    The process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def read_readiness():
+    """
+    The worker finished its warm-up (app/db/warmup.py) and can take traffic;
+    503 until then. The warm-up outcome is included.
+    """
+    if warmup.warmup_stats is None:
+        return JSONResponse({"status": "warming up"}, status_code=503)
+    return {"status": "ready", "warmup": warmup.warmup_stats}
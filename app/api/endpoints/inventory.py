@@ -0,0 +1,89 @@
+# app/api/endpoints/inventory.py
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from app.api.payload import bulk_request_body, iter_json_items
+from app.core.config import settings
+from app.core.ingest import WriterBusyError, movement_writer
+from app.crud.crud_ledger import Movement
+from app.schemas.inventory import (
+    MovementCreate,
+    MovementIngestResult,
+    MovementItemError,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/movements",
+    response_model=MovementIngestResult,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=bulk_request_body("MovementCreate"),
+    responses={429: {"description": "Buffer full, retry from `next_index`"}},
+)
+async def ingest_movements(request: Request):
+    """
+    Record stock movements reported by the warehouse, in bulk.
+
+    Accepts a JSON array of movements, or one movement per line with
+    `Content-Type: application/x-ndjson`. Movements are buffered and written
+    within a fraction of a second, in large batches; `quantity_in_stock`
+    follows at the same time. Invalid items are reported and skipped.
+
+    When the buffer is full the API answers 429 with `next_index`, the first
+    item that was not accepted; retry from there after `Retry-After`.
+    """
+    result = MovementIngestResult()
+    chunk: list[Movement] = []
+    # Index of the first item of the current chunk
+    chunk_start = 0
+
+    def submit() -> None:
+        movement_writer.submit(chunk)
+        result.accepted += len(chunk)
+        chunk.clear()
+
+    index = 0
+    try:
+        async for raw in iter_json_items(request):
+            try:
+                if isinstance(raw, bytes):
+                    item = MovementCreate.model_validate_json(raw)
+                else:
+                    item = MovementCreate.model_validate(raw)
+                if item.quantity_changed == 0:
+                    raise ValueError("quantity_changed must not be zero")
+                chunk.append(
+                    Movement(
+                        item.product_id,
+                        item.quantity_changed,
+                        item.movement_type,
+                        item.timestamp,
+                    )
+                )
+            except (ValidationError, ValueError) as e:
+                error = (
+                    str(e.errors(include_url=False))
+                    if isinstance(e, ValidationError)
+                    else str(e)
+                )
+                result.errors.append(MovementItemError(index=index, error=error))
+            index += 1
+            if len(chunk) >= settings.MOVEMENT_FLUSH_SIZE:
+                submit()
+                chunk_start = index
+        if chunk:
+            submit()
+    except WriterBusyError as e:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": "1"},
+            content={
+                "detail": str(e),
+                "accepted": result.accepted,
+                "next_index": chunk_start,
+            },
+        )
+    return result
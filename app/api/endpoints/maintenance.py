@@ -1,10 +1,20 @@
 # app/api/endpoints/maintenance.py
+import datetime
+
 from fastapi import APIRouter, Body, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud import crud_maintenance
-from app.schemas.maintenance import PartitionCreate
+from app.core.alerts import low_stock_alerts
+from app.core.autocomplete import product_autocomplete
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.core.ingest import movement_writer
+from app.core.scheduler import scheduler
+from app.crud import crud_analytics, crud_ledger, crud_maintenance, crud_report
+from app.schemas.analytics import RollupRebuild
+from app.schemas.ledger import SnapshotCreate, SnapshotResult
+from app.schemas.maintenance import PartitionCreate, PartitionMaintenance
 
 # In a real app, you would have a dependency that gets the current superuser
 # from app.api.deps import get_current_active_superuser
@@ -14,9 +24,9 @@ router = APIRouter()
 
 
 @router.post("/partitions/inventory", status_code=201)
-def create_new_inventory_partition(
+async def create_new_inventory_partition(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     partition_in: PartitionCreate = Body(...),
     # ------------------  IMPORTANT SECURITY NOTE ------------------
     # In a real application, you would UNCOMMENT the line below.
@@ -25,12 +35,165 @@ def create_new_inventory_partition(
     # ----------------------------------------------------------------
 ):
     """
-    Create a new partition for the inventory_movement table for a given year.
+    Create a new partition for the inventory_movement table for a given year,
+    or for one month of it (for high-volume years). Rows of that period are
+    moved out of the default partition.
     This is an administrative action and must be protected.
     """
-    result = crud_maintenance.create_inventory_partition(db=db, year=partition_in.year)
+    result = await crud_maintenance.create_inventory_partition(
+        db=db, year=partition_in.year, month=partition_in.month
+    )
 
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["message"])
 
     return result
+
+
+@router.get("/partitions/inventory")
+async def read_inventory_partitions(
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    List the inventory_movement partitions, and what ended up in the default
+    partition (which should be empty).
+    """
+    return {
+        "partitions": await crud_maintenance.get_inventory_partitions(db),
+        "default_partition": await crud_maintenance.get_default_partition_stats(db),
+    }
+
+
+@router.post("/partitions/inventory/maintain")
+async def maintain_inventory_partitions(
+    db: AsyncSession = Depends(deps.get_db),
+    maintenance_in: PartitionMaintenance = Body(default=PartitionMaintenance()),
+):
+    """
+    Run the partition maintenance job now: create the partitions of the
+    coming periods and empty the default partition.
+    """
+    return await crud_maintenance.maintain_inventory_partitions(
+        db,
+        granularity=maintenance_in.granularity
+        or settings.INVENTORY_PARTITION_GRANULARITY,
+        ahead=(
+            maintenance_in.ahead
+            if maintenance_in.ahead is not None
+            else settings.INVENTORY_PARTITIONS_AHEAD
+        ),
+    )
+
+
+@router.get("/cache/stats")
+async def read_cache_stats():
+    """
+    Hit/miss counters and size of the product cache in this process.
+    """
+    return {"products": product_cache.stats()}
+
+
+@router.get("/ingest/stats")
+async def read_ingest_stats():
+    """
+    Buffer depth and counters of the inventory movement writer in this
+    process.
+    """
+    return {"movements": movement_writer.stats()}
+
+
+@router.get("/alerts/stats")
+async def read_alert_stats():
+    """
+    Subscribers and delivery counters of the low stock alert streams in this
+    process.
+    """
+    return {"low_stock": low_stock_alerts.stats()}
+
+
+@router.get("/autocomplete/stats")
+async def read_autocomplete_stats():
+    """
+    Size and refresh counters of the product autocomplete index in this
+    process.
+    """
+    return {"products": product_autocomplete.stats()}
+
+
+@router.post("/ledger/snapshots", response_model=SnapshotResult, status_code=201)
+async def create_stock_snapshot(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    snapshot_in: SnapshotCreate = Body(default=SnapshotCreate()),
+):
+    """
+    Take (or re-take) a stock snapshot of every product. Normally done daily
+    by the scheduler; useful after back-filling movements.
+
+    Only UTC midnights up to now are accepted: new movements only correct
+    the snapshots of those instants.
+    """
+    as_of = snapshot_in.as_of or crud_ledger.latest_snapshot_boundary()
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=datetime.timezone.utc)
+    if as_of != crud_ledger.latest_snapshot_boundary(as_of):
+        raise HTTPException(status_code=422, detail="as_of must be a UTC midnight.")
+    if as_of > crud_ledger.latest_snapshot_boundary():
+        raise HTTPException(status_code=422, detail="as_of must not be in the future.")
+    return await crud_ledger.take_snapshots(db, as_of=as_of)
+
+
+@router.get("/jobs")
+async def read_scheduled_jobs():
+    """
+    Status of the periodic jobs run by this process.
+    """
+    return scheduler.status()
+
+
+@router.post("/reports/pending-orders/rebuild")
+async def rebuild_pending_orders_report(
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Recompute the pending orders report from scratch.
+    """
+    return await crud_report.rebuild_pending_orders_report(db)
+
+
+@router.get("/reports/pending-orders/check")
+async def check_pending_orders_report(
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Compare the pending orders report with the live tables.
+    """
+    return await crud_report.check_pending_orders_report(db)
+
+
+@router.post("/reports/stock-valuation/refresh")
+async def refresh_stock_valuation(
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Refresh the stock valuation views now instead of waiting for the
+    scheduled refresh.
+    """
+    return await crud_report.refresh_stock_valuation(db)
+
+
+@router.post("/analytics/rollup/rebuild")
+async def rebuild_movement_rollup(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    rebuild_in: RollupRebuild,
+):
+    """
+    Recompute the daily movement rollup for a range of days, e.g. after
+    loading movements straight into partitions.
+    """
+    if rebuild_in.end <= rebuild_in.start:
+        raise HTTPException(status_code=422, detail="end must be after start.")
+    return await crud_analytics.rebuild_movement_rollup(
+        db, rebuild_in.start, rebuild_in.end
+    )
@@ -0,0 +1,15 @@
+# app/api/endpoints/metrics.py
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+def read_metrics():
+    """
+    Request, SQL and connection pool metrics in the Prometheus text format.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,67 @@
+# app/api/endpoints/orders.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.crud import crud_order
+from app.schemas.order import Order, OrderCreate, OrderStatusUpdate
+
+router = APIRouter()
+
+
+@router.post("/", response_model=Order, status_code=201)
+async def create_order(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    order_in: OrderCreate,
+):
+    """
+    Place an order, reserving stock for all of its items atomically.
+    Responds with 409 and the shortfall per product if any item can not be
+    fulfilled; nothing is reserved in that case.
+    """
+    try:
+        order = await crud_order.create_order(db=db, order_in=order_in)
+    except crud_order.InsufficientStockError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "shortages": e.shortages},
+        )
+    return order
+
+
+@router.get("/{order_id}", response_model=Order)
+async def read_order(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    order_id: int,
+):
+    """
+    Get order by ID.
+    """
+    order = await crud_order.get_order(db=db, order_id=order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+
+@router.patch("/{order_id}", response_model=Order)
+async def update_order_status(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    order_id: int,
+    status_in: OrderStatusUpdate,
+):
+    """
+    Move an order to a new status (pending -> processing -> completed, or
+    cancelled from either). Cancelling gives the reserved stock back.
+    """
+    try:
+        order = await crud_order.update_order_status(
+            db=db, order_id=order_id, status=status_in.status
+        )
+    except crud_order.InvalidStatusTransitionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
@@ -1,37 +1,199 @@
 # app/api/endpoints/products.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import datetime
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.crud import crud_product
-from app.schemas.product import Product, ProductCreate
+from app.api.etag import IF_NONE_MATCH_HEADER, etag_matches, not_modified, row_etag
+from app.api.payload import bulk_request_body, iter_json_items
+from app.api.responses import TrustedJSONResponse
+from app.core.autocomplete import product_autocomplete
+from app.core.config import settings
+from app.crud import crud_ledger, crud_product, crud_search
+from app.schemas.ledger import StockLevel
+from app.schemas.product import (
+    Product,
+    ProductBulkItemResult,
+    ProductBulkResult,
+    ProductCreate,
+    ProductSearchHit,
+    ReorderPointUpdate,
+)
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Product)
-def create_product(
+async def create_product(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     product_in: ProductCreate,
 ):
     """
     Create new product.
     """
-    product = crud_product.create_product(db=db, product_in=product_in)
+    product = await crud_product.create_product(db=db, product_in=product_in)
     return product
 
 
+@router.post(
+    "/bulk",
+    response_model=ProductBulkResult,
+    openapi_extra=bulk_request_body("ProductCreate"),
+)
+async def bulk_create_products(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    upsert: bool = True,
+):
+    """
+    Create, or upsert on SKU, many products at once.
+
+    Accepts a JSON array of products, or one product per line with
+    `Content-Type: application/x-ndjson`. Items are written in chunks, one
+    transaction per chunk. With `upsert=false`, existing SKUs are reported as
+    errors instead of being updated.
+    """
+    summary = ProductBulkResult()
+    chunk: list[tuple[int, ProductCreate]] = []
+
+    async def flush() -> None:
+        summary.items.extend(
+            await crud_product.bulk_upsert_products(db, chunk, update_existing=upsert)
+        )
+        chunk.clear()
+
+    index = 0
+    async for raw in iter_json_items(request):
+        try:
+            if isinstance(raw, bytes):
+                chunk.append((index, ProductCreate.model_validate_json(raw)))
+            else:
+                chunk.append((index, ProductCreate.model_validate(raw)))
+        except ValidationError as e:
+            summary.items.append(
+                ProductBulkItemResult(
+                    index=index,
+                    sku=raw.get("sku") if isinstance(raw, dict) else None,
+                    status="error",
+                    error=str(e.errors(include_url=False)),
+                )
+            )
+        index += 1
+        if len(chunk) >= settings.BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+
+    summary.items.sort(key=lambda item: item.index)
+    for item in summary.items:
+        if item.status == "created":
+            summary.created += 1
+        elif item.status == "updated":
+            summary.updated += 1
+        else:
+            summary.failed += 1
+    return summary
+
+
+@router.get("/search", response_model=List[ProductSearchHit])
+async def search_products(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    q: str = Query(min_length=1, max_length=200),
+    mode: Literal["search", "prefix"] = "search",
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    """
+    Find products by text.
+
+    - `search`: web-search syntax over SKU, name and description, ranked by
+      relevance. Queries of 3 characters or more also match inside names
+      and SKUs, and tolerate typos in names.
+    - `prefix`: typeahead on the start of product names, ignoring case,
+      in name order.
+    """
+    if mode == "prefix":
+        ids = product_autocomplete.suggest(q, limit)
+        if ids is None:
+            hits = await crud_search.prefix_search_products(db, q, limit=limit)
+        else:
+            hits = await crud_search.get_products_by_ids(db, ids)
+    else:
+        hits = await crud_search.search_products(db, q, limit=limit)
+    return TrustedJSONResponse(hits)
+
+
 @router.get("/{product_id}", response_model=Product)
-def read_product(
+async def read_product(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     product_id: int,
+    if_none_match: str | None = Header(default=None, alias=IF_NONE_MATCH_HEADER),
 ):
     """
     Get product by ID.
+
+    The response carries the product's version as a strong ETag; send it
+    back in `If-None-Match` to get an empty 304 while it is unchanged.
+    """
+    if "min_lsn" in db.info:
+        # The cache may have been filled from a replica lagging behind the
+        # client's writes
+        if if_none_match is not None:
+            version = await crud_product.get_product_version(db, product_id)
+            if version is not None and etag_matches(if_none_match, row_etag(version)):
+                return not_modified(row_etag(version))
+        product = await crud_product.get_product_data(db=db, product_id=product_id)
+    else:
+        product = await crud_product.get_product_cached(db=db, product_id=product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    etag = row_etag(product["version"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return TrustedJSONResponse(product, headers={"ETag": etag})
+
+
+@router.put("/{product_id}/reorder-point", response_model=Product)
+async def update_reorder_point(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    product_id: int,
+    reorder_in: ReorderPointUpdate,
+):
     """
-    product = crud_product.get_product(db=db, product_id=product_id)
+    Set the stock level under which low stock alerts fire for this product.
+    """
+    product = await crud_product.set_reorder_point(
+        db=db, product_id=product_id, reorder_point=reorder_in.reorder_point
+    )
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
+
+
+@router.get("/{product_id}/stock", response_model=StockLevel)
+async def read_product_stock(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    product_id: int,
+    at: datetime.datetime | None = None,
+):
+    """
+    Get the stock of a product at a point in time (default: now), computed
+    from the latest stock snapshot plus the movements recorded since.
+    Timestamps without a timezone are taken as UTC.
+    """
+    if at is None:
+        at = datetime.datetime.now(datetime.timezone.utc)
+    elif at.tzinfo is None:
+        at = at.replace(tzinfo=datetime.timezone.utc)
+    stock = await crud_ledger.get_stock_at(db, product_id=product_id, at=at)
+    if stock is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return stock
@@ -0,0 +1,76 @@
+# app/api/endpoints/reports.py
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.crud import crud_report
+from app.crud.pagination import InvalidCursorError
+from app.schemas.pagination import Page
+from app.schemas.report import (
+    PendingOrdersBySupplier,
+    ProductStockValuation,
+    StockValuationReport,
+)
+
+router = APIRouter()
+
+
+@router.get("/pending-orders", response_model=List[PendingOrdersBySupplier])
+async def read_pending_orders_report(
+    db: AsyncSession = Depends(deps.get_read_db),
+):
+    """
+    Number of distinct pending orders per supplier. Served from an aggregate
+    table that is updated as orders change status, so polling it is cheap.
+    """
+    return await crud_report.get_pending_orders_report(db)
+
+
+@router.get("/stock-valuation", response_model=StockValuationReport)
+async def read_stock_valuation(
+    db: AsyncSession = Depends(deps.get_read_db),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    Stock valuation totals by supplier, one page at a time, with the grand
+    total over all products.
+
+    Figures come from a materialized view refreshed on a schedule (or via
+    POST /maintenance/reports/stock-valuation/refresh), as of `refreshed_at`.
+    """
+    try:
+        suppliers, next_cursor = await crud_report.get_stock_valuation_by_supplier(
+            db, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    totals = await crud_report.get_stock_valuation_totals(db)
+    return StockValuationReport(
+        items=suppliers,
+        next_cursor=next_cursor,
+        total_valuation=totals.total_valuation,
+        refreshed_at=totals.refreshed_at,
+    )
+
+
+@router.get("/stock-valuation/products", response_model=Page[ProductStockValuation])
+async def read_stock_valuation_by_product(
+    db: AsyncSession = Depends(deps.get_read_db),
+    supplier_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    Stock valuation per product, optionally for one supplier, one page at a
+    time. Served from the same materialized view as /stock-valuation.
+    """
+    try:
+        products, next_cursor = await crud_report.get_stock_valuation_by_product(
+            db, supplier_id=supplier_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Page(items=products, next_cursor=next_cursor)
@@ -1,36 +1,112 @@
-from typing import List
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.api.etag import (
+    IF_NONE_MATCH_HEADER,
+    collection_etag,
+    etag_matches,
+    not_modified,
+)
+from app.api.responses import TrustedJSONResponse
 from app.crud import crud_supplier
-from app.schemas.supplier import Supplier, SupplierCreate
+from app.crud.pagination import InvalidCursorError
+from app.schemas.pagination import Page
+from app.schemas.supplier import Supplier, SupplierCreate, SupplierDetail
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Supplier)
-def create_supplier(
+async def create_supplier(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     supplier_in: SupplierCreate,
 ):
     """
     Create new supplier.
     """
-    supplier = crud_supplier.create_supplier(db=db, supplier=supplier_in)
+    supplier = await crud_supplier.create_supplier(db=db, supplier=supplier_in)
     return supplier
 
 
-@router.get("/", response_model=List[Supplier])
-def read_suppliers(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/", response_model=Page[SupplierDetail] | Page[Supplier])
+async def read_suppliers(
+    db: AsyncSession = Depends(deps.get_read_db),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    sort: Literal["id", "name"] = "id",
+    include: Literal["products"] | None = None,
+    if_none_match: str | None = Header(default=None, alias=IF_NONE_MATCH_HEADER),
 ):
     """
-    Retrieve suppliers.
+    Retrieve suppliers, one page at a time.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page,
+    keeping the same `sort`. With `include=products`, each supplier also
+    carries its products, product count and stock value, and `limit` can be
+    at most 250.
+
+    The page's ETag covers the versions of its suppliers (and products); an
+    `If-None-Match` holding it is answered with an empty 304 after reading
+    only those versions.
+    """
+    if include == "products" and limit > crud_supplier.MAX_EXPANDED_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit can be at most {crud_supplier.MAX_EXPANDED_LIMIT} "
+            "with include=products.",
+        )
+    get_page = (
+        crud_supplier.get_suppliers_with_products
+        if include == "products"
+        else crud_supplier.get_suppliers
+    )
+    try:
+        if if_none_match is not None:
+            versions, next_cursor = await crud_supplier.get_supplier_versions(
+                db,
+                cursor=cursor,
+                limit=limit,
+                sort=sort,
+                include_products=include == "products",
+            )
+            etag = collection_etag(versions, next_cursor)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        suppliers, next_cursor = await get_page(
+            db, cursor=cursor, limit=limit, sort=sort
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TrustedJSONResponse(
+        {"items": suppliers, "next_cursor": next_cursor},
+        headers={"ETag": collection_etag(suppliers, next_cursor)},
+    )
+
+
+@router.get("/{supplier_id}", response_model=SupplierDetail)
+async def read_supplier(
+    supplier_id: int,
+    db: AsyncSession = Depends(deps.get_read_db),
+    if_none_match: str | None = Header(default=None, alias=IF_NONE_MATCH_HEADER),
+):
+    """
+    Get a supplier with its products, product count and stock value.
+
+    The ETag covers the versions of the supplier and of its products.
     """
-    suppliers = crud_supplier.get_suppliers(db, skip=skip, limit=limit)
-    return suppliers
+    if if_none_match is not None:
+        versions = await crud_supplier.get_supplier_detail_versions(db, supplier_id)
+        if versions is not None:
+            etag = collection_etag([versions], None)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    supplier = await crud_supplier.get_supplier_detail(db, supplier_id)
+    if supplier is None:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    return TrustedJSONResponse(
+        supplier, headers={"ETag": collection_etag([supplier], None)}
+    )
@@ -0,0 +1,56 @@
+# app/api/etag.py
+"""
+Strong ETags and conditional GETs for read routes.
+
+ETags are derived from the `version` column of products and suppliers,
+which a trigger bumps on every update. A request whose `If-None-Match`
+holds the current ETag is answered with an empty 304 after a version-only
+lookup, without loading or serializing the body.
+
+ETags of collections (a page of suppliers, a supplier with its products)
+hash the ids and versions of every row in the response, plus the next page
+cursor, so they change when a row is updated, added or removed.
+"""
+import hashlib
+import json
+from typing import Any, Sequence
+
+from fastapi import Response
+
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def row_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def collection_etag(items: Sequence[dict[str, Any]], next_cursor: str | None) -> str:
+    """
+    ETag of dicts with an `id` and a `version`, and optionally `products`
+    with the same.
+    """
+    fingerprint = [
+        [
+            item["id"],
+            item["version"],
+            [[p["id"], p["version"]] for p in item.get("products", ())],
+        ]
+        for item in items
+    ]
+    digest = hashlib.sha1(json.dumps([fingerprint, next_cursor]).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison (RFC 9110, 13.1.2)
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,61 @@
+# app/api/payload.py
+"""
+Parsing of request bodies carrying many items at once.
+"""
+import json
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, Request
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def iter_json_items(request: Request) -> AsyncIterator[Any]:
+    """
+    Yields the raw items of a bulk request: either a JSON array, or an NDJSON
+    stream that is parsed line by line as it arrives. NDJSON lines are
+    yielded as bytes, array items as already decoded values.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        pending = b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if pending.strip():
+            yield pending
+        return
+
+    try:
+        payload = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=422, detail="Body must be a JSON array")
+    for item in payload:
+        yield item
+
+
+def bulk_request_body(schema_name: str) -> dict:
+    """
+    OpenAPI request body of an endpoint reading its body with
+    `iter_json_items`: an array of `schema_name`, or NDJSON of it.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": f"#/components/schemas/{schema_name}"},
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": f"#/components/schemas/{schema_name}"}
+                },
+            },
+        }
+    }
@@ -0,0 +1,27 @@
+# app/api/responses.py
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def json_default(value: Any) -> Any:
+    # Rendered like pydantic does in JSON mode, so both paths agree
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TrustedJSONResponse(JSONResponse):
+    """
+    JSON response for data read straight from the database in the shape of
+    the route's response model.
+
+    FastAPI does not validate a returned Response against `response_model`,
+    which then only documents the route. Use it for plain dicts and lists
+    built from selected columns, never for client input.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default)
@@ -0,0 +1,117 @@
+# app/core/alerts.py
+"""
+Fan-out of low stock alerts to subscribers in this process.
+
+The notify_low_stock trigger (migration b6d1f3a8e27c) sends a notification
+on the low_stock channel whenever a committed write moves a product across
+its reorder point, whichever process made the write. Each process keeps one
+LISTEN connection while it has subscribers and copies every alert into their
+queues.
+
+A subscriber that falls `queue_size` alerts behind is disconnected rather
+than silently losing alerts, and so are all subscribers when the listening
+connection drops: clients are expected to reconnect and re-read the current
+low stock products.
+"""
+import asyncio
+import json
+import logging
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+from app.core.config import settings
+from app.db.session import async_engine
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_CHANNEL = "low_stock"
+
+
+class AlertBroadcaster:
+    def __init__(self, channel: str, queue_size: int) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self.delivered = 0
+        self.disconnected_slow = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    async def _listen(self) -> None:
+        async with self._lock:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+            url = async_engine.url.set(drivername="postgresql")
+            self._connection = await asyncpg.connect(
+                url.render_as_string(hide_password=False)
+            )
+            self._connection.add_termination_listener(self._on_termination)
+            await self._connection.add_listener(self.channel, self._on_notification)
+            logger.info(f"Listening for '{self.channel}' notifications.")
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        alert = json.loads(payload)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(alert)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.disconnected_slow += 1
+                self._close_subscriber(queue)
+
+    def _on_termination(self, connection) -> None:
+        if connection is not self._connection:
+            return
+        logger.warning(f"Lost the '{self.channel}' listener connection.")
+        self._connection = None
+        for queue in list(self._subscribers):
+            self._close_subscriber(queue)
+
+    def _close_subscriber(self, queue: asyncio.Queue) -> None:
+        # None tells the subscriber its stream is over
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        Returns a queue receiving every alert from now on, then None once the
+        subscription ends. Call `unsubscribe` when done with it.
+        """
+        await self._listen()
+        # One slot is kept free for the closing None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size + 1)
+        self._subscribers.add(queue)
+        return queue
+
+    async def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Ends all subscriptions and stops listening.
+        """
+        for queue in list(self._subscribers):
+            self._close_subscriber(queue)
+        async with self._lock:
+            connection, self._connection = self._connection, None
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "listening": self._connection is not None,
+            "subscribers": len(self._subscribers),
+            "delivered": self.delivered,
+            "disconnected_slow": self.disconnected_slow,
+        }
+
+
+low_stock_alerts = AlertBroadcaster(
+    LOW_STOCK_CHANNEL, queue_size=settings.ALERT_SUBSCRIBER_QUEUE_SIZE
+)
@@ -0,0 +1,238 @@
+# app/core/autocomplete.py
+"""
+In-memory prefix index of product names, for typeahead.
+
+Every process keeps the names of all products as one sorted list of
+`"<normalized name>\\0<zero-padded id>"` strings. A prefix lookup is a
+binary search followed by a scan of the matches, which takes microseconds
+even with millions of products; the API then reads the few products it
+returns by primary key.
+
+A background task loads every name at startup, then polls the
+product_search_change table, which triggers fill whenever a product is
+created, renamed or deleted (migration d4b8f2a61e97). The log is read from
+the snapshot xmin of the previous poll on, so changes committed out of order
+are not missed, and changes read twice are applied twice harmlessly (see
+`crud_search.get_name_changes`). A process that has not polled for half the
+log's retention reloads everything, since the trim job may have deleted
+changes it has not seen.
+
+Until the first load completes, `suggest` returns None and the API answers
+from the database instead.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Iterable
+
+from app.core.config import settings
+from app.crud import crud_search
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(name: str) -> str:
+    # Case and runs of whitespace do not matter to a typeahead
+    return " ".join(name.casefold().split())
+
+
+def _entry(name: str, product_id: int) -> str:
+    # Names never contain NUL, so entries sort by name first, then id
+    return f"{normalize(name)}\0{product_id:010d}"
+
+
+class PrefixIndex:
+    """
+    Sorted list of (name, product id) entries, searchable by name prefix.
+    """
+
+    # Above this many changes at once (and 1% of the entries), `apply`
+    # rebuilds the list instead of inserting into it one entry at a time
+    REBUILD_THRESHOLD = 1000
+
+    def __init__(self, entries: list[str] | None = None) -> None:
+        self._entries = entries if entries is not None else []
+        self._entries.sort()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, prefix: str, limit: int) -> list[int]:
+        """
+        Ids of the first `limit` products, by name, whose normalized name
+        starts with the normalized `prefix`.
+        """
+        prefix = normalize(prefix)
+        entries = self._entries
+        start = bisect_left(entries, prefix)
+        ids = []
+        for position in range(start, min(start + limit, len(entries))):
+            entry = entries[position]
+            if not entry.startswith(prefix):
+                break
+            ids.append(int(entry[-10:]))
+        return ids
+
+    def apply(
+        self, removed: Iterable[tuple[int, str]], added: Iterable[tuple[int, str]]
+    ) -> None:
+        """
+        Removes the (id, name) pairs in `removed`, then adds those in
+        `added`. Missing entries are not removed and present ones are not
+        added twice, so applying the same changes again changes nothing.
+        """
+        to_remove = {_entry(name, product_id) for product_id, name in removed}
+        to_add = {_entry(name, product_id) for product_id, name in added}
+        entries = self._entries
+        if len(to_remove) + len(to_add) > max(
+            self.REBUILD_THRESHOLD, len(entries) // 100
+        ):
+            # Copying the kept slices once and sorting two sorted runs beats
+            # moving the tail of the list for every change
+            positions = sorted(
+                position
+                for position in map(self._find, to_remove | to_add)
+                if position is not None
+            )
+            kept: list[str] = []
+            start = 0
+            for position in positions:
+                kept.extend(entries[start:position])
+                start = position + 1
+            kept.extend(entries[start:])
+            kept.extend(sorted(to_add))
+            kept.sort()
+            self._entries = kept
+            return
+        for entry in to_remove - to_add:
+            found = self._find(entry)
+            if found is not None:
+                del entries[found]
+        for entry in to_add:
+            position = bisect_left(entries, entry)
+            if position == len(entries) or entries[position] != entry:
+                entries.insert(position, entry)
+
+    def _find(self, entry: str) -> int | None:
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            return position
+        return None
+
+
+class ProductAutocomplete:
+    def __init__(self, *, refresh_interval: float, retention: float) -> None:
+        self.refresh_interval = refresh_interval
+        # Polling less often than this risks missing trimmed changes
+        self.max_poll_gap = retention / 2
+        self.loads = 0
+        self.polls = 0
+        self.failed_polls = 0
+        self.changes_applied = 0
+        self.last_load_ms: float | None = None
+        self.last_poll_ms: float | None = None
+        self._index: PrefixIndex | None = None
+        self._since_xid = 0
+        self._polled_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def suggest(self, prefix: str, limit: int) -> list[int] | None:
+        """
+        Ids of the products whose name starts with `prefix`, by name, or
+        None while the index is not loaded.
+        """
+        if self._index is None:
+            return None
+        return self._index.search(prefix, limit)
+
+    async def _load(self) -> None:
+        started = time.perf_counter()
+        entries: list[str] = []
+        async with AsyncSessionLocal() as db:
+            since_xid = await crud_search.begin_snapshot(db)
+            async for rows in crud_search.stream_product_names(db):
+                entries.extend(_entry(name, product_id) for product_id, name in rows)
+        # Changes from here on are caught up with by the next poll
+        self._index = PrefixIndex(entries)
+        self._since_xid = since_xid
+        self._polled_at = time.monotonic()
+        self.loads += 1
+        self.last_load_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            f"Loaded {len(self._index)} product names for autocomplete "
+            f"in {self.last_load_ms} ms."
+        )
+
+    async def _poll(self, index: PrefixIndex) -> None:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            since_xid = await crud_search.begin_snapshot(db)
+            changes = await crud_search.get_name_changes(db, self._since_xid)
+        removed = [(c.product_id, c.old_name) for c in changes if c.old_name]
+        # Whatever the changes were, the product ends up under its current name
+        added = {(c.product_id, c.name) for c in changes if c.name is not None}
+        index.apply(removed, added)
+        self._since_xid = since_xid
+        self._polled_at = time.monotonic()
+        self.polls += 1
+        self.changes_applied += len(changes)
+        self.last_poll_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if (
+                    self._index is None
+                    or time.monotonic() - self._polled_at > self.max_poll_gap
+                ):
+                    await self._load()
+                else:
+                    await self._poll(self._index)
+            except Exception:
+                self.failed_polls += 1
+                logger.exception("Refreshing the product autocomplete index failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """
+        Starts loading and refreshing the index in the background, unless
+        disabled by a non-positive refresh interval.
+        """
+        if self.refresh_interval <= 0:
+            logger.info("Product autocomplete index is disabled.")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="product-autocomplete")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "entries": len(self._index) if self._index is not None else 0,
+            "loads": self.loads,
+            "polls": self.polls,
+            "failed_polls": self.failed_polls,
+            "changes_applied": self.changes_applied,
+            "last_load_ms": self.last_load_ms,
+            "last_poll_ms": self.last_poll_ms,
+        }
+
+
+product_autocomplete = ProductAutocomplete(
+    refresh_interval=settings.PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS,
+    retention=settings.PRODUCT_SEARCH_CHANGE_RETENTION_SECONDS,
+)
@@ -0,0 +1,300 @@
+# app/core/cache.py
+"""
+Pluggable read-through cache.
+
+Values are JSON-ready dicts so that every backend can store them:
+
+- LRUCache: in-process, bounded in size, with a TTL per entry.
+- RedisCache: shared between processes (needs the optional `redis` package).
+- FakeSharedCache: in-memory stand-in for a shared backend, for tests and
+  local runs. It serializes values like a real network backend would, but
+  lives in one process, so it is not shared between workers.
+
+Writers must call `delete` after their transaction commits. `delete` bumps
+a generation of each key, kept where the values are, and `get_or_load`
+only fills the cache if the generation of its key did not change while it
+was loading, so a read that raced with a write, in any process, can not put
+the old value back.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable
+
+from app.core.config import settings
+
+
+class Cache:
+    """
+    Base class of all cache backends.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every invalidation; the generation of all keys of an
+        # in-process backend, see `get_or_load`
+        self._invalidations = 0
+        # Loaded values not cached because of a concurrent invalidation
+        self.skipped_fills = 0
+
+    async def get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    async def _delete_many(self, keys: list[str]) -> None:
+        raise NotImplementedError
+
+    async def _generation(self, key: str) -> Any:
+        return self._invalidations
+
+    async def _set_if_generation(self, key: str, value: Any, generation: Any) -> bool:
+        """
+        Stores `value` unless `key` was invalidated since `generation` was
+        read, atomically for shared backends. Returns whether it was stored.
+        """
+        if generation != await self._generation(key):
+            return False
+        await self.set(key, value)
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        self._invalidations += 1
+        if keys:
+            await self._delete_many(list(keys))
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any | None]]
+    ) -> Any | None:
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        generation = await self._generation(key)
+        value = await loader()
+        # Misses are not cached, and neither are values that may have been
+        # read before a concurrent write committed
+        if value is not None and not await self._set_if_generation(
+            key, value, generation
+        ):
+            self.skipped_fills += 1
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "skipped_fills": self.skipped_fills,
+        }
+
+
+class LRUCache(Cache):
+    """
+    In-process cache evicting the least recently used entry once `maxsize`
+    entries are stored. Entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _delete_many(self, keys: list[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+        }
+
+
+class FakeSharedCache(Cache):
+    """
+    Stands in for a shared backend: values are stored JSON-encoded, with the
+    generations of their keys, in dicts that every instance of the process
+    with the same `namespace` shares. Once `maxsize` values are stored, the
+    oldest one is evicted.
+    """
+
+    _stores: dict[str, dict[str, tuple[float, str]]] = {}
+    _generations: dict[str, dict[str, int]] = {}
+    # Per namespace, the newest generation dropped from `_generations`: keys
+    # without one of their own are at least that new
+    _floors: dict[str, int] = {}
+
+    def __init__(self, maxsize: int, ttl: float, namespace: str = "default") -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self._store = self._stores.setdefault(namespace, {})
+        self._key_generations = self._generations.setdefault(namespace, {})
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._store.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return json.loads(entry[1])
+
+    async def set(self, key: str, value: Any) -> None:
+        self._store.pop(key, None)
+        self._store[key] = (time.monotonic() + self.ttl, json.dumps(value))
+        while len(self._store) > self.maxsize:
+            del self._store[next(iter(self._store))]
+
+    async def _generation(self, key: str) -> Any:
+        return self._key_generations.get(key, self._floors.get(self.namespace, 0))
+
+    async def _delete_many(self, keys: list[str]) -> None:
+        generations = self._key_generations
+        newest = max(generations.values(), default=self._floors.get(self.namespace, 0))
+        for key in keys:
+            self._store.pop(key, None)
+            generations.pop(key, None)
+            newest += 1
+            generations[key] = newest
+        # Bounded like the values; forgotten generations raise the floor
+        while len(generations) > self.maxsize:
+            oldest = next(iter(generations))
+            self._floors[self.namespace] = generations.pop(oldest)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+        }
+
+
+class RedisCache(Cache):
+    """
+    Cache shared by all processes, stored in Redis with a TTL per key.
+
+    Every key has a generation counter next to it, incremented with the
+    deletion of the value. A fill WATCHes the counter and is dropped by
+    Redis if another process invalidated the key in the meantime.
+    """
+
+    # Outlives any load, so that an invalidation is never forgotten while a
+    # read that started before it is running
+    GENERATION_TTL_SECONDS = 3600
+
+    def __init__(self, url: str, ttl: float, prefix: str = "smart_inventory:") -> None:
+        try:
+            import redis.asyncio as redis  # type: ignore[import-not-found]
+            from redis.exceptions import WatchError  # type: ignore[import-not-found]
+        except ImportError:
+            raise RuntimeError(
+                "CACHE_URL points to Redis but the 'redis' package is not installed."
+            )
+        super().__init__()
+        self._watch_error = WatchError
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._client.set(
+            self.prefix + key, json.dumps(value), px=int(self.ttl * 1000)
+        )
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}generation:{key}"
+
+    async def _generation(self, key: str) -> Any:
+        return await self._client.get(self._generation_key(key))
+
+    async def _set_if_generation(self, key: str, value: Any, generation: Any) -> bool:
+        generation_key = self._generation_key(key)
+        async with self._client.pipeline() as pipe:
+            try:
+                await pipe.watch(generation_key)
+                if await pipe.get(generation_key) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), px=int(self.ttl * 1000))
+                await pipe.execute()
+            except self._watch_error:
+                return False
+        return True
+
+    async def _delete_many(self, keys: list[str]) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(self._generation_key(key))
+                pipe.expire(self._generation_key(key), self.GENERATION_TTL_SECONDS)
+            pipe.delete(*(self.prefix + key for key in keys))
+            await pipe.execute()
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "ttl_seconds": self.ttl}
+
+
+def build_cache(url: str | None, *, maxsize: int, ttl: float) -> Cache:
+    """
+    Picks the backend from a URL: none for the in-process LRU, `memory://`
+    for the fake shared backend, `redis://` or `rediss://` for Redis.
+    """
+    if not url:
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    if url.startswith("memory://"):
+        return FakeSharedCache(maxsize=maxsize, ttl=ttl, namespace=url)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCache(url, ttl=ttl)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+
+product_cache = build_cache(
+    settings.CACHE_URL,
+    maxsize=settings.PRODUCT_CACHE_MAXSIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+
+def product_cache_key(product_id: int) -> str:
+    # Versioned, since entries cached before products had a version lack it
+    return f"product:v2:{product_id}"
+
+
+async def invalidate_products(product_ids: Iterable[int]) -> None:
+    """
+    Drops cached products; call after the transaction that changed them commits.
+    """
+    await product_cache.delete(*(product_cache_key(pid) for pid in set(product_ids)))
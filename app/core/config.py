@@ -1,4 +1,4 @@
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
@@ -11,10 +11,110 @@ class Settings(BaseSettings):
     POSTGRES_HOST: Annotated[str, Field(...)]
     POSTGRES_PORT: Annotated[int, Field(...)]
     DATABASE_URL: Annotated[str, Field(default=None)]  # optional, assembled below
+    # asyncpg URL used by the API; derived from DATABASE_URL unless set
+    ASYNC_DATABASE_URL: Annotated[str, Field(default=None)]
+
+    # Connection pool of each engine, per process: connections kept open,
+    # extra ones opened under load, seconds to wait for a free one before
+    # failing, and age in seconds after which one is replaced (-1 never)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Liveness check of pooled connections on checkout: on every checkout,
+    # only after the connection sat idle for DB_POOL_PRE_PING_IDLE_SECONDS,
+    # or never (dead connections then fail the request that gets them)
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30
+    # Connections each engine opens at startup, with the hot statements
+    # prepared on them (see app/db/warmup.py); default DB_POOL_SIZE, 0 disables
+    DB_POOL_WARMUP_CONNECTIONS: int | None = None
+    # Streaming replica for read-only routes (see deps.get_read_db); any
+    # PostgreSQL URL, the asyncpg driver is used either way
+    READ_REPLICA_URL: str | None = None
 
     APP_HOST: str = "0.0.0.0"
     APP_PORT: int = 8000
 
+    # Production server (python -m app.server). Worker processes (default:
+    # one per CPU), each with its own connection pools, so the database sees
+    # up to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per engine.
+    # Event loop and HTTP parser implementations, seconds an idle keep-alive
+    # connection stays open, pending connections the socket queues, and
+    # seconds in-flight requests get to finish on shutdown before they are
+    # cancelled.
+    SERVER_WORKERS: int | None = None
+    SERVER_LOOP: Literal["auto", "uvloop", "asyncio"] = "uvloop"
+    SERVER_HTTP: Literal["auto", "httptools", "h11"] = "httptools"
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Trust X-Forwarded-* headers from these addresses (comma separated, or *)
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_ACCESS_LOG: bool = True
+
+    # Rows per INSERT ... ON CONFLICT statement (and transaction) for bulk writes
+    BULK_CHUNK_SIZE: int = 1000
+
+    # Product read cache. Without CACHE_URL each process keeps its own LRU.
+    # Set it to redis://... to share one between workers, so that
+    # invalidations reach all of them; memory:// selects an in-process fake
+    # of a shared backend, for tests and local runs, which is not shared.
+    CACHE_URL: str | None = None
+    PRODUCT_CACHE_MAXSIZE: int = 10_000
+    PRODUCT_CACHE_TTL_SECONDS: float = 60.0
+
+    # How often the scheduler checks that today's stock snapshot exists (0 disables)
+    LEDGER_SNAPSHOT_INTERVAL_SECONDS: float = 3600
+    # Buffered writer behind POST /inventory/movements: movements held before
+    # answering 429, and a flush happens at flush size or after the interval
+    MOVEMENT_BUFFER_MAX_PENDING: int = 100_000
+    MOVEMENT_FLUSH_SIZE: int = 5000
+    MOVEMENT_FLUSH_INTERVAL_SECONDS: float = 0.2
+    # Attempts at a batch failing with connection errors, serialization
+    # failures or deadlocks before it is dropped; other errors drop it at once
+    MOVEMENT_FLUSH_MAX_ATTEMPTS: int = 20
+
+    # Low stock alert streams: alerts a subscriber may fall behind before it is
+    # disconnected, and seconds between keep-alive comments on idle streams
+    ALERT_SUBSCRIBER_QUEUE_SIZE: int = 1000
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # inventory_movement partitions: "year" or "month" per partition, how many
+    # periods past the current one to create in advance, and how often to
+    # check (0 disables)
+    INVENTORY_PARTITION_GRANULARITY: Literal["year", "month"] = "year"
+    INVENTORY_PARTITIONS_AHEAD: int = 1
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 3600
+
+    # How often the stock valuation views are refreshed (0 disables)
+    STOCK_VALUATION_REFRESH_INTERVAL_SECONDS: float = 300
+
+    # Product name autocomplete (GET /products/search?mode=prefix): every
+    # process keeps all names in memory and polls for renames every interval
+    # (0 disables the index, the database then answers). Logged name changes
+    # are kept for the retention, and the trim job runs every interval.
+    PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS: float = 1.0
+    PRODUCT_SEARCH_CHANGE_RETENTION_SECONDS: float = 3600
+    PRODUCT_SEARCH_CHANGE_TRIM_INTERVAL_SECONDS: float = 600
+
+    # Rows fetched from the server-side cursor, and encoded, at a time by
+    # exports (GET /export/..., scripts/export.py)
+    EXPORT_CHUNK_SIZE: int = 10_000
+
+    # Order fulfillment worker (python -m app.worker): orders claimed per
+    # batch (and transaction), batches run at once per process, seconds to
+    # wait before polling again once no order is pending, seconds between
+    # throughput log lines, and the port of its Prometheus endpoint (0: none)
+    FULFILLMENT_BATCH_SIZE: int = 200
+    FULFILLMENT_CONCURRENCY: int = 1
+    FULFILLMENT_IDLE_SECONDS: float = 1.0
+    FULFILLMENT_STATS_INTERVAL_SECONDS: float = 10
+    FULFILLMENT_METRICS_PORT: int = 0
+
+    # Requests slower than this are logged with their SQL statements (0 disables)
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000
+
     @validator("DATABASE_URL", pre=True, always=True)
     def assemble_db_connection(cls, v: str | None, values: dict[str, Any]) -> str:
         if v:
@@ -26,6 +126,13 @@ class Settings(BaseSettings):
             f"{values['POSTGRES_DB']}"
         )
 
+    @validator("ASYNC_DATABASE_URL", pre=True, always=True)
+    def assemble_async_db_connection(cls, v: str | None, values: dict[str, Any]) -> str:
+        if v:
+            return v
+        _, _, rest = values["DATABASE_URL"].partition("://")
+        return f"postgresql+asyncpg://{rest}"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,105 @@
+# app/core/export.py
+"""
+Streaming exports of the catalog and the movement history, as CSV or NDJSON.
+
+Exports read through a server-side cursor (see app/crud/crud_export.py) and
+encode one chunk of rows at a time, so memory use does not depend on the
+size of the export. GET /export/... sends the chunks as they are encoded;
+scripts/export.py writes them to a file.
+"""
+import csv
+import datetime
+import enum
+import io
+from typing import AsyncIterator, Callable, Literal, Sequence
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import json_default
+from app.core.config import settings
+from app.crud import crud_export
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_value(value):
+    # Same text as in NDJSON, rather than Python's str()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def encode(
+    chunks: AsyncIterator[Sequence], columns: Sequence[str], export_format: str
+) -> AsyncIterator[bytes]:
+    """
+    Encodes chunks of rows, yielding one block of bytes per chunk. CSV
+    starts with a header line; NDJSON has one object per line.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+        async for rows in chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+    elif export_format == "ndjson":
+        async for rows in chunks:
+            yield b"".join(
+                orjson.dumps(
+                    dict(zip(columns, row)),
+                    default=json_default,
+                    option=orjson.OPT_APPEND_NEWLINE,
+                )
+                for row in rows
+            )
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+
+async def export_products(
+    session_factory: Callable[[], AsyncSession],
+    export_format: ExportFormat,
+    *,
+    chunk_size: int = settings.EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    The whole catalog, by product id.
+    """
+    columns = [column.key for column in crud_export.PRODUCT_EXPORT_COLUMNS]
+    async with session_factory() as db:
+        chunks = crud_export.stream_products(db, chunk_size=chunk_size)
+        async for block in encode(chunks, columns, export_format):
+            yield block
+
+
+async def export_movements(
+    session_factory: Callable[[], AsyncSession],
+    export_format: ExportFormat,
+    *,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    chunk_size: int = settings.EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Inventory movements with `start <= timestamp < end`, reading only the
+    partitions of that range.
+    """
+    columns = [column.key for column in crud_export.MOVEMENT_EXPORT_COLUMNS]
+    async with session_factory() as db:
+        chunks = crud_export.stream_movements(
+            db, start=start, end=end, chunk_size=chunk_size
+        )
+        async for block in encode(chunks, columns, export_format):
+            yield block
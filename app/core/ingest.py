@@ -0,0 +1,231 @@
+# app/core/ingest.py
+"""
+In-process buffered writer for inventory movements.
+
+Requests hand their movements to `movement_writer` and return as soon as
+they are buffered. A background task flushes the buffer whenever it holds
+`flush_size` movements or `flush_interval` seconds have passed, each flush
+being one transaction with one COPY and one stock update (see
+`crud_ledger.ingest_movements`).
+
+The buffer is bounded: once it holds `max_pending` movements, `submit`
+raises WriterBusyError and the API answers 429 until flushes catch up.
+Movements still buffered when the process dies are lost, so clients should
+treat an accepted batch as "will be written", not "written".
+
+A flush failing on a transient error (lost connection, serialization
+failure, deadlock) puts its batch back and is retried with backoff, up to
+`max_attempts` times. A batch failing for any other reason would fail again
+on every retry, so it is dropped, logged and counted instead.
+"""
+import asyncio
+import datetime
+import logging
+import time
+from collections import deque
+from typing import Any, Sequence
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.cache import invalidate_products
+from app.core.config import settings
+from app.crud import crud_ledger
+from app.crud.crud_ledger import Movement
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+# SQLSTATE classes and codes worth retrying: connection exceptions,
+# serialization failures, deadlocks, too many connections and server shutdown
+TRANSIENT_SQLSTATES = ("08", "40001", "40P01", "53300", "57P")
+# Longest pause between two attempts at a failing batch
+MAX_RETRY_DELAY_SECONDS = 5.0
+
+
+class WriterBusyError(Exception):
+    pass
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether `error` may go away by itself, so that retrying makes sense.
+    """
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return True
+        # The driver's exception, whose SQLSTATE the dialect copies over
+        error = error.orig or error
+    sqlstate = getattr(error, "sqlstate", None)
+    return isinstance(sqlstate, str) and sqlstate.startswith(TRANSIENT_SQLSTATES)
+
+
+class MovementWriter:
+    def __init__(
+        self,
+        *,
+        max_pending: int,
+        flush_size: int,
+        flush_interval: float,
+        max_attempts: int,
+    ):
+        self.max_pending = max_pending
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.accepted = 0
+        self.written = 0
+        self.unknown_product = 0
+        self.rejected_busy = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.dropped_batches = 0
+        # Failed attempts in a row at the batch in front of the buffer
+        self.attempts = 0
+        self.last_flush_ms: float | None = None
+        # Taken from the buffer by the flush in progress
+        self.in_flight = 0
+        self._buffer: deque[Movement] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, movements: Sequence[Movement]) -> None:
+        """
+        Buffers all of `movements`, or none of them if there is not enough
+        room left. Movements without a timestamp are dated now.
+        """
+        if self._stopping:
+            raise WriterBusyError("The movement writer is shutting down.")
+        if len(self._buffer) + len(movements) > self.max_pending:
+            self.rejected_busy += len(movements)
+            raise WriterBusyError("The movement buffer is full.")
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self._buffer.extend(
+            (
+                Movement(m.product_id, m.quantity_changed, m.movement_type, now)
+                if m.timestamp is None
+                else m
+            )
+            for m in movements
+        )
+        self.accepted += len(movements)
+        if len(self._buffer) >= self.flush_size:
+            self._wakeup.set()
+
+    async def _flush_once(self) -> None:
+        batch = [
+            self._buffer.popleft()
+            for _ in range(min(self.flush_size, len(self._buffer)))
+        ]
+        started = time.perf_counter()
+        self.in_flight = len(batch)
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await crud_ledger.ingest_movements(db, batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            self.attempts += 1
+            if is_transient_error(e) and self.attempts < self.max_attempts:
+                # Put the batch back in front and retry after a pause; the
+                # buffer filling up meanwhile pushes back on clients
+                self._buffer.extendleft(reversed(batch))
+                raise
+            self.attempts = 0
+            self.dropped += len(batch)
+            self.dropped_batches += 1
+            logger.exception(
+                f"Dropped a batch of {len(batch)} inventory movements, from "
+                f"{batch[0]} to {batch[-1]}."
+            )
+            return
+        finally:
+            self.in_flight = 0
+        self.attempts = 0
+        self.flushes += 1
+        self.written += result["written"]
+        self.unknown_product += result["unknown_product"]
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        if result["unknown_product"]:
+            logger.warning(
+                f"Dropped {result['unknown_product']} movements of unknown products."
+            )
+        await invalidate_products(result["products"])
+
+    async def _run(self) -> None:
+        while True:
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            try:
+                while self._buffer:
+                    await self._flush_once()
+                    if len(self._buffer) < self.flush_size and not self._stopping:
+                        break
+            except Exception:
+                logger.exception("Flushing inventory movements failed")
+                if self._stopping:
+                    logger.error(
+                        f"Lost {len(self._buffer)} buffered inventory movements."
+                    )
+                    self._buffer.clear()
+                else:
+                    await asyncio.sleep(
+                        min(
+                            self.flush_interval * 2 ** (self.attempts - 1),
+                            MAX_RETRY_DELAY_SECONDS,
+                        )
+                    )
+            if self._stopping and not self._buffer:
+                return
+
+    def start(self) -> None:
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="movement-writer")
+
+    async def stop(self) -> None:
+        """
+        Stops accepting movements and waits until the buffered ones are
+        written.
+        """
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "in_flight": self.in_flight,
+            "max_pending": self.max_pending,
+            "accepted": self.accepted,
+            "written": self.written,
+            "unknown_product": self.unknown_product,
+            "rejected_busy": self.rejected_busy,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "dropped_batches": self.dropped_batches,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+movement_writer = MovementWriter(
+    max_pending=settings.MOVEMENT_BUFFER_MAX_PENDING,
+    flush_size=settings.MOVEMENT_FLUSH_SIZE,
+    flush_interval=settings.MOVEMENT_FLUSH_INTERVAL_SECONDS,
+    max_attempts=settings.MOVEMENT_FLUSH_MAX_ATTEMPTS,
+)
@@ -0,0 +1,310 @@
+# app/core/metrics.py
+"""
+Per-request SQL instrumentation, exposed in the Prometheus text format.
+
+`instrument_engine` hooks the cursor execute events of an engine, and
+`MetricsMiddleware` opens a `RequestStats` for every HTTP request. Queries
+run while serving a request are counted against its route template (such as
+`/products/{product_id}`), queries of background jobs against the
+"background" route. Engines created with `TimedAsyncQueuePool` also report
+how long each connection checkout waited on the pool.
+
+Requests slower than SLOW_REQUEST_THRESHOLD_MS are written to the
+`app.slow_requests` log with the statements they ran and their parameters.
+
+When PROMETHEUS_MULTIPROC_DIR is set, as `app.server` does for several
+workers, every process writes its metrics to files in that directory and
+`render_metrics` adds up those of all of them, whichever worker is scraped.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+BACKGROUND_ROUTE = "background"
+# Requests that matched no route share one label, so that scanners probing
+# random paths can not blow up the number of series
+UNMATCHED_ROUTE = "unmatched"
+
+# Bounds what a slow request log entry holds, and what every request keeps
+# in memory while it runs
+MAX_LOGGED_STATEMENTS = 50
+MAX_LOGGED_PARAMS_LENGTH = 500
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, until its response body is sent.",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time per request spent executing SQL statements.",
+    ["route"],
+)
+REQUEST_ROWS = Histogram(
+    "http_request_db_rows",
+    "Rows returned or affected by the SQL statements of a request.",
+    ["route"],
+    buckets=(0, 1, 10, 100, 1000, 10_000, 100_000, 1_000_000),
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time to execute one SQL statement.",
+    ["route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening one.",
+    ["route"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Connections of the API's pools, by state.",
+    ["pool", "state"],
+    # Summed over the live worker processes
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class RequestStats:
+    scope: dict[str, Any]
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    pool_wait_seconds: float = 0.0
+    # (seconds, statement, parameters), kept only while slow requests are logged
+    statements: list[tuple[float, str, Any]] = field(default_factory=list)
+
+    @property
+    def route(self) -> str:
+        # FastAPI stores the matched route in the scope once routing is done
+        route = self.scope.get("route")
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def _current_route() -> tuple[RequestStats | None, str]:
+    stats = _request_stats.get()
+    return stats, stats.route if stats is not None else BACKGROUND_ROUTE
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def record_query(statement: str, parameters: Any, seconds: float, rows: int) -> None:
+    """
+    Counts a statement against the current request; for statements sent to
+    the driver directly (COPY), which bypass the engine's events.
+    """
+    stats, route = _current_route()
+    QUERY_DURATION.labels(route).observe(seconds)
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += seconds
+    stats.rows += rows
+    if (
+        settings.SLOW_REQUEST_THRESHOLD_MS
+        and len(stats.statements) < MAX_LOGGED_STATEMENTS
+    ):
+        stats.statements.append((seconds, statement, parameters))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    # -1 for server-side cursors, whose rows are only fetched later
+    record_query(statement, parameters, elapsed, max(cursor.rowcount, 0))
+
+
+def _handle_error(exception_context) -> None:
+    # after_cursor_execute does not run for failed statements
+    started = exception_context.connection and exception_context.connection.info.get(
+        "query_started"
+    )
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Records the statements executed by `engine` (the `sync_engine` of an
+    async engine) and reports its pool's connections under `name`.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    if isinstance(engine.pool, AsyncAdaptedQueuePool):
+        _pooled_engines[name] = engine
+        event.listen(engine.pool, "checkout", lambda *args: update_pool_gauges())
+
+
+# Engines whose pools are reported, by name
+_pooled_engines: dict[str, Engine] = {}
+
+
+def update_pool_gauges() -> None:
+    """
+    Sets the pool gauges from the pools of this process. Done on every
+    checkout, at the end of every request and when scraped rather than
+    computed when scraped, since in multiprocess mode the scraped worker
+    only reads what the others wrote.
+    """
+    for name, engine in _pooled_engines.items():
+        # Disposing of an engine replaces its pool
+        pool = engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            POOL_CONNECTIONS.labels(name, "checked_out").set(pool.checkedout())
+            POOL_CONNECTIONS.labels(name, "idle").set(pool.checkedin())
+            POOL_CONNECTIONS.labels(name, "overflow").set(max(pool.overflow(), 0))
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default pool of async engines, timing every connection checkout.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            stats, route = _current_route()
+            POOL_CHECKOUT_WAIT.labels(route).observe(elapsed)
+            if stats is not None:
+                stats.pool_wait_seconds += elapsed
+
+
+# Pools log under their class's module, which would otherwise make this one
+# log every dispose at the app's level instead of SQLAlchemy's
+logging.getLogger(f"{__name__}.{TimedAsyncQueuePool.__name__}").setLevel(
+    logging.WARNING
+)
+
+
+def _log_slow_request(
+    method: str, path: str, status: int, elapsed: float, stats: RequestStats
+) -> None:
+    lines = [
+        f"Slow request: {method} {path} ({stats.route}) -> {status} in "
+        f"{elapsed * 1000:.1f} ms; {stats.queries} queries, "
+        f"{stats.db_seconds * 1000:.1f} ms in the database, "
+        f"{stats.pool_wait_seconds * 1000:.1f} ms waiting for connections"
+    ]
+    for seconds, statement, parameters in stats.statements:
+        params = repr(parameters)
+        if len(params) > MAX_LOGGED_PARAMS_LENGTH:
+            params = params[:MAX_LOGGED_PARAMS_LENGTH] + "..."
+        lines.append(f"  [{seconds * 1000:.1f} ms] {' '.join(statement.split())}")
+        lines.append(f"    params: {params}")
+    if stats.queries > len(stats.statements):
+        lines.append(f"  ... {stats.queries - len(stats.statements)} more")
+    slow_request_logger.warning("\n".join(lines))
+
+
+# Event streams and exports are slow by design, and left out of the slow
+# request log
+STREAMED_CONTENT_TYPES = (b"text/event-stream", b"text/csv", b"application/x-ndjson")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing requests and the SQL they run.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status = 500
+        streamed = False
+
+        async def send_with_status(message) -> None:
+            nonlocal status, streamed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streamed = any(
+                    name == b"content-type" and value.startswith(STREAMED_CONTENT_TYPES)
+                    for name, value in message.get("headers", [])
+                )
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = stats.route
+            REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(
+                elapsed
+            )
+            REQUEST_QUERIES.labels(route).observe(stats.queries)
+            REQUEST_DB_TIME.labels(route).observe(stats.db_seconds)
+            REQUEST_ROWS.labels(route).observe(stats.rows)
+            update_pool_gauges()
+            threshold = settings.SLOW_REQUEST_THRESHOLD_MS
+            if threshold and elapsed * 1000 >= threshold and not streamed:
+                _log_slow_request(
+                    scope["method"], scope["path"], status, elapsed, stats
+                )
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    The current metrics in the Prometheus text format, and its content type.
+    """
+    update_pool_gauges()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drops the live gauges of this process from the multiprocess metrics;
+    call on shutdown.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,89 @@
+# app/core/scheduler.py
+"""
+Minimal in-process scheduler for periodic maintenance jobs.
+
+Jobs run as asyncio tasks on the application's event loop, started and
+stopped by the lifespan handler in app/main.py. A failing run is logged and
+retried at the next interval.
+"""
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    interval_seconds: float
+    func: Callable[[], Awaitable[Any]]
+    runs: int = 0
+    failures: int = 0
+    last_run_at: datetime.datetime | None = None
+    last_error: str | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self.jobs: dict[str, Job] = {}
+
+    def add_job(
+        self, name: str, interval_seconds: float, func: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """
+        Registers `func` to run every `interval_seconds`, starting right away.
+        A non-positive interval disables the job.
+        """
+        if interval_seconds <= 0:
+            logger.info(f"Scheduled job '{name}' is disabled.")
+            return
+        self.jobs[name] = Job(name=name, interval_seconds=interval_seconds, func=func)
+
+    async def _run_forever(self, job: Job) -> None:
+        while True:
+            try:
+                await job.func()
+                job.last_error = None
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e)
+                logger.exception(f"Scheduled job '{job.name}' failed")
+            job.runs += 1
+            job.last_run_at = datetime.datetime.now(datetime.timezone.utc)
+            await asyncio.sleep(job.interval_seconds)
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            if job.task is None or job.task.done():
+                job.task = asyncio.create_task(
+                    self._run_forever(job), name=f"job:{job.name}"
+                )
+
+    async def stop(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            job.task = None
+
+    def status(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": job.name,
+                "interval_seconds": job.interval_seconds,
+                "running": job.task is not None and not job.task.done(),
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_run_at": job.last_run_at,
+                "last_error": job.last_error,
+            }
+            for job in self.jobs.values()
+        ]
+
+
+scheduler = Scheduler()
@@ -0,0 +1,199 @@
+# app/crud/crud_analytics.py
+"""
+Sales velocity and days of cover.
+
+Both are computed from movement_daily_rollup, which holds one row per
+product, day and movement type, rather than from inventory_movement. The
+rollup rows of the window and the stock of every product are fetched as
+arrays, and all the arithmetic is vectorized with NumPy.
+"""
+import datetime
+import logging
+from typing import cast
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.copy import fetch_arrays
+
+logger = logging.getLogger(__name__)
+
+# Returns cancel out sales: net units sold is minus the sum of both
+SALES_SQL = """
+    SELECT product_id, day - $1::date AS day_index, quantity
+    FROM movement_daily_rollup
+    WHERE day >= $1::date AND day <= $2::date
+      AND movement_type IN ('sale', 'return')
+"""
+# Sorted in NumPy, which is cheaper than an index scan of the whole table
+STOCK_SQL = "SELECT id, quantity_in_stock FROM product"
+
+
+def compute_velocity(
+    product_ids: np.ndarray,
+    stock: np.ndarray,
+    sales_product_ids: np.ndarray,
+    sales_day_index: np.ndarray,
+    sales_quantity: np.ndarray,
+    *,
+    window: int,
+    short_window: int,
+) -> dict[str, np.ndarray]:
+    """
+    Average daily units sold over the last `window` and `short_window` days,
+    their ratio, and the days the current stock lasts at the short-window
+    rate (inf if nothing sells).
+
+    `product_ids` must be sorted; the sales arrays hold the rollup rows, with
+    day indexes counted from the first day of the window.
+    """
+    rows = np.searchsorted(product_ids, sales_product_ids)
+    # Drop rollup rows of products missing from `product_ids`
+    known = rows < len(product_ids)
+    known[known] = product_ids[rows[known]] == sales_product_ids[known]
+    rows = rows[known]
+    sold = -sales_quantity[known].astype(np.float64)
+    recent = sales_day_index[known] >= window - short_window
+    # Net units sold per product, summing all its rollup rows in the window
+    average = np.bincount(rows, weights=sold, minlength=len(product_ids)) / window
+    short_average = (
+        np.bincount(rows[recent], weights=sold[recent], minlength=len(product_ids))
+        / short_window
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = np.where(average > 0, short_average / average, np.nan)
+        days_of_cover = np.where(
+            short_average > 0, np.maximum(stock, 0) / short_average, np.inf
+        )
+    return {
+        "average": average,
+        "short_average": short_average,
+        "trend": trend,
+        "days_of_cover": days_of_cover,
+    }
+
+
+def _optional(value: float, digits: int = 3) -> float | None:
+    return None if not np.isfinite(value) else round(float(value), digits)
+
+
+async def get_velocity(
+    db: AsyncSession,
+    *,
+    as_of: datetime.date,
+    window: int = 28,
+    short_window: int = 7,
+    product_ids: list[int] | None = None,
+    sort: str = "days_of_cover",
+    limit: int = 100,
+) -> dict:
+    """
+    Sales velocity and days of cover of every product over the `window` days
+    ending on `as_of`, returning the `limit` most urgent (lowest days of
+    cover) or fastest selling products, or just `product_ids`.
+
+    Must be called on a fresh session: products and sales are read in one
+    REPEATABLE READ transaction, so both come from the same snapshot.
+    """
+    first_day = as_of - datetime.timedelta(days=window - 1)
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    products = await fetch_arrays(db, STOCK_SQL, [("id", "i4"), ("stock", "i4")])
+    order = np.argsort(products["id"])
+    products = {name: values[order] for name, values in products.items()}
+    sales = await fetch_arrays(
+        db,
+        SALES_SQL,
+        [("product_id", "i4"), ("day_index", "i4"), ("quantity", "i8")],
+        first_day,
+        as_of,
+    )
+    metrics = compute_velocity(
+        products["id"],
+        products["stock"],
+        sales["product_id"],
+        sales["day_index"],
+        sales["quantity"],
+        window=window,
+        short_window=short_window,
+    )
+
+    if product_ids:
+        wanted = np.unique(np.asarray(product_ids, dtype=np.int32))
+        positions = np.searchsorted(products["id"], wanted)
+        positions = positions[positions < len(products["id"])]
+        selected = positions[np.isin(products["id"][positions], wanted)]
+    elif sort == "velocity":
+        # Fastest first, ties by product id
+        selected = np.lexsort((products["id"], -metrics["short_average"]))[:limit]
+    else:
+        selected = np.lexsort((products["id"], metrics["days_of_cover"]))[:limit]
+
+    items = [
+        {
+            "product_id": int(products["id"][i]),
+            "quantity_in_stock": int(products["stock"][i]),
+            "avg_daily_sales": round(float(metrics["average"][i]), 3),
+            "avg_daily_sales_short": round(float(metrics["short_average"][i]), 3),
+            "trend": _optional(metrics["trend"][i]),
+            "days_of_cover": _optional(metrics["days_of_cover"][i], 1),
+            "stockout_date": (
+                as_of + datetime.timedelta(days=int(metrics["days_of_cover"][i]))
+                if np.isfinite(metrics["days_of_cover"][i])
+                else None
+            ),
+        }
+        for i in selected
+    ]
+    return {
+        "as_of": as_of,
+        "window_days": window,
+        "short_window_days": short_window,
+        "products": len(products["id"]),
+        "items": items,
+    }
+
+
+async def rebuild_movement_rollup(
+    db: AsyncSession, start: datetime.date, end: datetime.date
+) -> dict:
+    """
+    Recomputes the rollup of the days in [start, end) from inventory_movement.
+    The timestamp bounds are constants, so only the partitions of those days
+    are read. The table lock makes concurrent movement inserts wait, so none
+    of them is lost or counted twice.
+    """
+    bounds = {
+        "start": start,
+        "end": end,
+        "start_ts": datetime.datetime.combine(
+            start, datetime.time(), datetime.timezone.utc
+        ),
+        "end_ts": datetime.datetime.combine(
+            end, datetime.time(), datetime.timezone.utc
+        ),
+    }
+    await db.execute(text("LOCK TABLE movement_daily_rollup IN EXCLUSIVE MODE"))
+    await db.execute(
+        text("DELETE FROM movement_daily_rollup WHERE day >= :start AND day < :end"),
+        bounds,
+    )
+    result = await db.execute(
+        text(
+            """
+            INSERT INTO movement_daily_rollup
+                (day, product_id, movement_type, quantity, movement_count)
+            SELECT (timestamp AT TIME ZONE 'UTC')::date, product_id, movement_type,
+                   SUM(quantity_changed), COUNT(*)
+            FROM inventory_movement
+            WHERE timestamp >= :start_ts AND timestamp < :end_ts
+            GROUP BY 1, 2, 3
+            """
+        ),
+        bounds,
+    )
+    await db.commit()
+    rows = cast(CursorResult, result).rowcount
+    logger.info(f"Rebuilt movement rollup from {start} to {end}: {rows} rows.")
+    return {"status": "success", "start": start, "end": end, "rows": rows}
@@ -0,0 +1,74 @@
+"""
+Server-side cursors over whole tables, for exports (app/core/export.py).
+
+Rows are fetched `chunk_size` at a time from one cursor in one transaction,
+so an export is a consistent snapshot whatever its size, and holds no more
+than one chunk in memory.
+"""
+
+import datetime
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.inventory_movement import InventoryMovement
+from app.models.product import Product
+
+PRODUCT_EXPORT_COLUMNS = (
+    Product.id,
+    Product.sku,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.quantity_in_stock,
+    Product.reorder_point,
+    Product.supplier_id,
+)
+
+MOVEMENT_EXPORT_COLUMNS = (
+    InventoryMovement.id,
+    InventoryMovement.product_id,
+    InventoryMovement.quantity_changed,
+    InventoryMovement.movement_type,
+    InventoryMovement.timestamp,
+)
+
+
+async def _stream(
+    db: AsyncSession, query: Select, chunk_size: int
+) -> AsyncIterator[Sequence]:
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for rows in result.partitions():
+        yield rows
+
+
+def stream_products(db: AsyncSession, *, chunk_size: int) -> AsyncIterator[Sequence]:
+    """
+    Every product, by id, `chunk_size` rows at a time.
+    """
+    return _stream(db, select(*PRODUCT_EXPORT_COLUMNS).order_by(Product.id), chunk_size)
+
+
+def stream_movements(
+    db: AsyncSession,
+    *,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    chunk_size: int,
+) -> AsyncIterator[Sequence]:
+    """
+    Inventory movements with `start <= timestamp < end` (either bound may be
+    left open), `chunk_size` rows at a time.
+
+    The bounds are on the partition key, so only the partitions overlapping
+    the range are scanned. Rows come in storage order, which is roughly the
+    order they were recorded in: sorting them would make PostgreSQL sort the
+    whole range before sending the first row.
+    """
+    query = select(*MOVEMENT_EXPORT_COLUMNS)
+    if start is not None:
+        query = query.where(InventoryMovement.timestamp >= start)
+    if end is not None:
+        query = query.where(InventoryMovement.timestamp < end)
+    return _stream(db, query, chunk_size)
@@ -0,0 +1,382 @@
+# app/crud/crud_ledger.py
+"""
+Stock ledger.
+
+The inventory_movement table is the ledger: the stock of a product at any
+instant is the sum of its movements up to that instant, and
+`Product.quantity_in_stock` caches the running total. Writes go through
+`record_movements`, which keeps both in step in one transaction.
+
+A trigger folds every insert into the daily movement_daily_rollup table.
+Writers must lock the product rows (by updating their stock) before
+inserting movements, so that they take row locks in the same order.
+
+Periodic snapshots in stock_snapshot store that running total per product,
+so a point-in-time query only has to add up the movements since the last
+snapshot instead of the whole history.
+"""
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence, cast
+
+from sqlalchemy import text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import record_query
+from app.db.session import driver_connection
+from app.models.inventory_movement import MovementType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Movement:
+    product_id: int
+    quantity_changed: int
+    movement_type: MovementType
+    # None means "now", as seen by the database
+    timestamp: datetime.datetime | None = None
+
+
+INSERT_MOVEMENTS_SQL = text(
+    """
+    INSERT INTO inventory_movement
+        (product_id, quantity_changed, movement_type, timestamp)
+    SELECT m.product_id, m.quantity_changed, m.movement_type,
+           COALESCE(m.timestamp, now())
+    FROM unnest(
+        CAST(:product_id AS INTEGER[]),
+        CAST(:quantity_changed AS INTEGER[]),
+        CAST(CAST(:movement_type AS TEXT[]) AS movementtype[]),
+        CAST(:timestamp AS TIMESTAMPTZ[])
+    ) AS m(product_id, quantity_changed, movement_type, timestamp)
+    """
+)
+
+# Movements dated at or before an existing snapshot (late arrivals) must be
+# folded into that snapshot, or point-in-time queries would miss them
+CORRECT_SNAPSHOTS_SQL = text(
+    """
+    UPDATE stock_snapshot s
+    SET quantity = s.quantity + d.delta
+    FROM (
+        SELECT s2.product_id, s2.taken_at, SUM(m.quantity_changed) AS delta
+        FROM unnest(
+            CAST(:product_id AS INTEGER[]),
+            CAST(:quantity_changed AS INTEGER[]),
+            CAST(:timestamp AS TIMESTAMPTZ[])
+        ) AS m(product_id, quantity_changed, timestamp)
+        JOIN stock_snapshot s2
+          ON s2.product_id = m.product_id AND s2.taken_at >= m.timestamp
+        GROUP BY s2.product_id, s2.taken_at
+    ) d
+    WHERE s.product_id = d.product_id AND s.taken_at = d.taken_at
+    """
+)
+
+# Rows are locked in id order first, so that concurrent writers touching
+# overlapping products always queue up instead of deadlocking
+APPLY_STOCK_DELTAS_SQL = text(
+    """
+    WITH delta AS (
+        SELECT product_id, SUM(quantity) AS quantity
+        FROM unnest(CAST(:product_id AS INTEGER[]), CAST(:quantity AS INTEGER[]))
+            AS d(product_id, quantity)
+        GROUP BY product_id
+    ),
+    locked AS (
+        SELECT p.id
+        FROM product p
+        JOIN delta ON delta.product_id = p.id
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE product p
+    SET quantity_in_stock = p.quantity_in_stock + delta.quantity
+    FROM delta, locked
+    WHERE p.id = delta.product_id AND locked.id = p.id
+    RETURNING p.id, p.quantity_in_stock
+    """
+)
+
+
+async def insert_movements(db: AsyncSession, movements: Sequence[Movement]) -> None:
+    """
+    Appends movements to the ledger without touching `quantity_in_stock`; for
+    callers that have already adjusted stock themselves.
+    """
+    if not movements:
+        return
+    params = {
+        "product_id": [m.product_id for m in movements],
+        "quantity_changed": [m.quantity_changed for m in movements],
+        "movement_type": [MovementType(m.movement_type).value for m in movements],
+        "timestamp": [m.timestamp for m in movements],
+    }
+    await db.execute(INSERT_MOVEMENTS_SQL, params)
+    await _correct_snapshots(db, [m for m in movements if m.timestamp is not None])
+
+
+async def _correct_snapshots(db: AsyncSession, backdated: Sequence[Movement]) -> None:
+    if not backdated:
+        return
+    await db.execute(
+        CORRECT_SNAPSHOTS_SQL,
+        {
+            "product_id": [m.product_id for m in backdated],
+            "quantity_changed": [m.quantity_changed for m in backdated],
+            "timestamp": [m.timestamp for m in backdated],
+        },
+    )
+
+
+MOVEMENT_COPY_COLUMNS = ("product_id", "quantity_changed", "movement_type", "timestamp")
+
+
+async def copy_movements(db: AsyncSession, movements: Sequence[Movement]) -> None:
+    """
+    Variant of `insert_movements` for large batches, streaming the rows with
+    COPY in the binary protocol. Every movement must have a timestamp. Does
+    not commit.
+    """
+    if not movements:
+        return
+    connection = await driver_connection(db)
+    started = time.perf_counter()
+    await connection.copy_records_to_table(
+        "inventory_movement",
+        columns=MOVEMENT_COPY_COLUMNS,
+        records=[
+            (
+                m.product_id,
+                m.quantity_changed,
+                MovementType(m.movement_type).value,
+                m.timestamp,
+            )
+            for m in movements
+        ],
+    )
+    record_query(
+        "COPY inventory_movement FROM STDIN",
+        None,
+        time.perf_counter() - started,
+        len(movements),
+    )
+    # Only movements dated before the latest snapshot can affect one
+    boundary = latest_snapshot_boundary()
+    await _correct_snapshots(
+        db, [m for m in movements if m.timestamp and m.timestamp <= boundary]
+    )
+
+
+async def apply_stock_deltas(
+    db: AsyncSession, deltas: Iterable[tuple[int, int]]
+) -> dict[int, int]:
+    """
+    Adds (product_id, quantity) deltas to `quantity_in_stock` in one
+    statement and returns the new stock of every product that exists.
+    """
+    deltas = list(deltas)
+    if not deltas:
+        return {}
+    result = await db.execute(
+        APPLY_STOCK_DELTAS_SQL,
+        {
+            "product_id": [product_id for product_id, _ in deltas],
+            "quantity": [quantity for _, quantity in deltas],
+        },
+    )
+    return {row.id: row.quantity_in_stock for row in result}
+
+
+async def record_movements(
+    db: AsyncSession, movements: Sequence[Movement]
+) -> dict[int, int]:
+    """
+    Appends movements to the ledger and applies them to `quantity_in_stock`.
+    Does not commit. Returns the new stock of every affected product.
+    """
+    # Product rows are locked before the movement rollup rows, as everywhere
+    stock = await apply_stock_deltas(
+        db, ((m.product_id, m.quantity_changed) for m in movements)
+    )
+    await insert_movements(db, movements)
+    return stock
+
+
+async def ingest_movements(db: AsyncSession, movements: Sequence[Movement]) -> dict:
+    """
+    Writes a batch of movements reported by the warehouse and applies them to
+    stock, in one transaction: one COPY, then one set-based stock update.
+    Movements of unknown products are dropped rather than failing the batch.
+    """
+    product_ids = list({m.product_id for m in movements})
+    known = set(
+        (
+            await db.execute(
+                text("SELECT id FROM product WHERE id = ANY(:ids)"),
+                {"ids": product_ids},
+            )
+        ).scalars()
+    )
+    valid = [m for m in movements if m.product_id in known]
+    stock = await apply_stock_deltas(
+        db, ((m.product_id, m.quantity_changed) for m in valid)
+    )
+    await copy_movements(db, valid)
+    await db.commit()
+    return {
+        "written": len(valid),
+        "unknown_product": len(movements) - len(valid),
+        "products": list(stock),
+    }
+
+
+# --- Snapshots ---
+
+FIRST_SNAPSHOT_SQL = text(
+    """
+    INSERT INTO stock_snapshot (product_id, taken_at, quantity)
+    SELECT p.id, :as_of, COALESCE(m.total, 0)
+    FROM product p
+    LEFT JOIN (
+        SELECT product_id, SUM(quantity_changed) AS total
+        FROM inventory_movement
+        WHERE timestamp <= :as_of
+        GROUP BY product_id
+    ) m ON m.product_id = p.id
+    ON CONFLICT (product_id, taken_at) DO UPDATE SET quantity = EXCLUDED.quantity
+    """
+)
+
+# Rolls the previous snapshot forward with the movements in (previous, as_of].
+# Constant time bounds let the planner prune all older partitions. Products
+# missing from the previous snapshot fall back to their full history.
+NEXT_SNAPSHOT_SQL = text(
+    """
+    INSERT INTO stock_snapshot (product_id, taken_at, quantity)
+    SELECT
+        p.id,
+        :as_of,
+        CASE
+            WHEN s.product_id IS NOT NULL THEN s.quantity + COALESCE(d.delta, 0)
+            ELSE (
+                SELECT COALESCE(SUM(im.quantity_changed), 0)
+                FROM inventory_movement im
+                WHERE im.product_id = p.id AND im.timestamp <= :as_of
+            )
+        END
+    FROM product p
+    LEFT JOIN stock_snapshot s ON s.product_id = p.id AND s.taken_at = :previous
+    LEFT JOIN (
+        SELECT product_id, SUM(quantity_changed) AS delta
+        FROM inventory_movement
+        WHERE timestamp > :previous AND timestamp <= :as_of
+        GROUP BY product_id
+    ) d ON d.product_id = p.id
+    ON CONFLICT (product_id, taken_at) DO UPDATE SET quantity = EXCLUDED.quantity
+    """
+)
+
+
+async def take_snapshots(db: AsyncSession, as_of: datetime.datetime) -> dict:
+    """
+    Writes the stock of every product at `as_of` to stock_snapshot. Re-taking
+    an existing snapshot overwrites it.
+    """
+    previous = (
+        await db.execute(
+            text("SELECT max(taken_at) FROM stock_snapshot WHERE taken_at < :as_of"),
+            {"as_of": as_of},
+        )
+    ).scalar()
+    if previous is None:
+        result = cast(
+            CursorResult, await db.execute(FIRST_SNAPSHOT_SQL, {"as_of": as_of})
+        )
+    else:
+        result = cast(
+            CursorResult,
+            await db.execute(NEXT_SNAPSHOT_SQL, {"as_of": as_of, "previous": previous}),
+        )
+    await db.commit()
+    logger.info(f"Took stock snapshot at {as_of} for {result.rowcount} products.")
+    return {
+        "taken_at": as_of,
+        "previous_snapshot": previous,
+        "products": result.rowcount,
+    }
+
+
+def latest_snapshot_boundary(now: datetime.datetime | None = None) -> datetime.datetime:
+    """
+    The most recent UTC midnight; daily snapshots are taken at these instants.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(datetime.timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+async def take_daily_snapshot(db: AsyncSession) -> dict | None:
+    """
+    Takes the snapshot for the latest UTC midnight unless it already exists.
+    """
+    as_of = latest_snapshot_boundary()
+    exists = (
+        await db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM stock_snapshot WHERE taken_at = :as_of)"
+            ),
+            {"as_of": as_of},
+        )
+    ).scalar()
+    if exists:
+        return None
+    return await take_snapshots(db, as_of)
+
+
+STOCK_AT_SQL = text(
+    """
+    WITH snapshot AS (
+        SELECT taken_at, quantity
+        FROM stock_snapshot
+        WHERE product_id = :product_id AND taken_at <= :at
+        ORDER BY taken_at DESC
+        LIMIT 1
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM product WHERE id = :product_id) AS product_exists,
+        (SELECT taken_at FROM snapshot) AS snapshot_taken_at,
+        COALESCE((SELECT quantity FROM snapshot), 0) + COALESCE((
+            SELECT SUM(quantity_changed)
+            FROM inventory_movement
+            WHERE product_id = :product_id
+              AND timestamp <= :at
+              AND timestamp > COALESCE(
+                  (SELECT taken_at FROM snapshot), '-infinity'::timestamptz
+              )
+        ), 0) AS quantity
+    """
+)
+
+
+async def get_stock_at(
+    db: AsyncSession, product_id: int, at: datetime.datetime
+) -> dict | None:
+    """
+    Stock of a product at `at`: its latest snapshot at or before `at`, plus
+    the movements since. Returns None if the product does not exist.
+    """
+    row = (await db.execute(STOCK_AT_SQL, {"product_id": product_id, "at": at})).one()
+    if not row.product_exists:
+        return None
+    return {
+        "product_id": product_id,
+        "at": at,
+        "quantity_in_stock": row.quantity,
+        "snapshot_taken_at": row.snapshot_taken_at,
+    }
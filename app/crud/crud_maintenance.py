@@ -1,48 +1,335 @@
 # app/crud/crud_maintenance.py
+"""
+Partition management for inventory_movement.
+
+Movements are range partitioned on `timestamp`, yearly or monthly. Rows with
+no matching partition land in the DEFAULT partition, which should stay
+empty: `maintain_inventory_partitions` pre-creates partitions ahead of time,
+logs a warning when rows show up in the default partition, and moves them
+into proper partitions.
+
+New partitions are created as standalone tables and then attached, which
+does not block inserts into the other partitions the way
+`CREATE TABLE ... PARTITION OF` does. Attaching builds the parent's indexes
+on them, including the BRIN index on `timestamp`.
+"""
+import datetime
 import logging
+import re
+from typing import cast
 
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def create_inventory_partition(db: Session, year: int) -> dict:
+INVENTORY_DEFAULT_PARTITION = "inventory_movement_default"
+
+
+def inventory_partition_name(year: int, month: int | None = None) -> str:
+    """
+    Returns the name of the yearly inventory_movement partition for `year`,
+    or of the monthly one if `month` is given.
+    """
+    if month is None:
+        return f"inventory_movement_y{year}"
+    return f"inventory_movement_y{year}m{month:02d}"
+
+
+def inventory_partition_bounds(
+    year: int, month: int | None = None
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """
+    Returns the [start, end) range, in UTC, of a yearly or monthly partition.
+    """
+    utc = datetime.timezone.utc
+    if month is None:
+        return datetime.datetime(year, 1, 1, tzinfo=utc), datetime.datetime(
+            year + 1, 1, 1, tzinfo=utc
+        )
+    start = datetime.datetime(year, month, 1, tzinfo=utc)
+    if month == 12:
+        return start, datetime.datetime(year + 1, 1, 1, tzinfo=utc)
+    return start, datetime.datetime(year, month + 1, 1, tzinfo=utc)
+
+
+def upcoming_periods(
+    today: datetime.date, granularity: str, ahead: int
+) -> list[tuple[int, int | None]]:
+    """
+    The (year, month) of the current period and the `ahead` following ones;
+    month is None for yearly granularity.
+    """
+    if granularity == "year":
+        return [(today.year + i, None) for i in range(ahead + 1)]
+    periods: list[tuple[int, int | None]] = []
+    for i in range(ahead + 1):
+        year, month = divmod(today.month - 1 + i, 12)
+        periods.append((today.year + year, month + 1))
+    return periods
+
+
+# --- Partition lifecycle ---
+
+PARTITIONS_SQL = text(
+    """
+    SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'inventory_movement'::regclass
+    ORDER BY c.relname
     """
-    Creates a new partition for the inventory_movement table for a specific year.
-    This function is idempotent due to the 'IF NOT EXISTS' clause.
+)
+
+_RANGE_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+async def get_inventory_partitions(db: AsyncSession) -> list[dict]:
     """
-    parent_table = "inventory_movement"
-    partition_table_name = f"{parent_table}_y{year}"
+    Lists the partitions of inventory_movement with their [start, end) range;
+    both are None for the default partition.
+    """
+    partitions = []
+    for row in await db.execute(PARTITIONS_SQL):
+        match = _RANGE_BOUND.search(row.bound)
+        start, end = (
+            (
+                datetime.datetime.fromisoformat(match.group(1)),
+                datetime.datetime.fromisoformat(match.group(2)),
+            )
+            if match
+            else (None, None)
+        )
+        partitions.append(
+            {
+                "name": row.name,
+                "start": start,
+                "end": end,
+                "is_default": row.bound == "DEFAULT",
+            }
+        )
+    return sorted(partitions, key=lambda p: (p["is_default"], p["start"] or 0))
+
 
-    start_date = f"{year}-01-01 00:00:00+00"
-    end_date = f"{year + 1}-01-01 00:00:00+00"
+def _overlapping(
+    partitions: list[dict], start: datetime.datetime, end: datetime.datetime
+) -> list[str]:
+    return [
+        p["name"]
+        for p in partitions
+        if p["start"] is not None and p["start"] < end and start < p["end"]
+    ]
 
-    # IMPORTANT: Use 'IF NOT EXISTS' to make this operation safe to re-run (idempotent)
-    sql_command = text(
-        f"""
-        CREATE TABLE IF NOT EXISTS {partition_table_name}
-        PARTITION OF {parent_table}
-        FOR VALUES FROM ('{start_date}') TO ('{end_date}');
-        """
+
+async def _attach_inventory_partition(
+    db: AsyncSession, name: str, start: datetime.datetime, end: datetime.datetime
+) -> int:
+    """
+    Creates `name` as a standalone table and attaches it for [start, end),
+    first moving any rows of that range out of the default partition. Does
+    not commit. Returns the number of rows moved.
+    """
+    bounds = {"start": start, "end": end}
+    await db.execute(
+        text(
+            f"CREATE TABLE {name} "
+            "(LIKE inventory_movement INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    # Matches the partition constraint, so attaching needs no validation scan
+    await db.execute(
+        text(
+            f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK "
+            f"(timestamp >= '{start.isoformat()}' AND timestamp < '{end.isoformat()}')"
+        )
     )
 
-    try:
-        db.execute(sql_command)
-        db.commit()
-        logger.info(
-            f"Successfully created or verified existence of partition: {partition_table_name}"
+    moved = 0
+    has_default = (
+        await db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": INVENTORY_DEFAULT_PARTITION},
+        )
+    ).scalar()
+    if has_default:
+        # Attaching scans the default partition for rows of the new range and
+        # fails if it finds any, so move them first; the lock keeps new ones
+        # from arriving in between
+        await db.execute(
+            text(f"LOCK TABLE {INVENTORY_DEFAULT_PARTITION} IN EXCLUSIVE MODE")
         )
+        result = await db.execute(
+            text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {INVENTORY_DEFAULT_PARTITION}
+                    WHERE timestamp >= :start AND timestamp < :end
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ),
+            bounds,
+        )
+        moved = cast(CursorResult, result).rowcount
+
+    await db.execute(
+        text(
+            f"ALTER TABLE inventory_movement ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    await db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+    return moved
+
+
+async def create_inventory_partition(
+    db: AsyncSession, year: int, month: int | None = None
+) -> dict:
+    """
+    Creates the partition of inventory_movement for a year, or for one month
+    of it, moving matching rows out of the default partition. Creating a
+    partition that already exists is a no-op.
+    """
+    name = inventory_partition_name(year, month)
+    start, end = inventory_partition_bounds(year, month)
+    overlapping = _overlapping(await get_inventory_partitions(db), start, end)
+    if overlapping == [name]:
         return {
             "status": "success",
-            "message": f"Partition '{partition_table_name}' created or already exists.",
+            "message": f"Partition '{name}' already exists.",
+            "moved_rows": 0,
         }
+    if overlapping:
+        return {
+            "status": "error",
+            "message": (f"Partition '{name}' would overlap {', '.join(overlapping)}."),
+        }
+    try:
+        moved = await _attach_inventory_partition(db, name, start, end)
+        await db.commit()
     except SQLAlchemyError as e:
-        logger.error(f"Failed to create partition {partition_table_name}: {e}")
-        db.rollback()
+        logger.error(f"Failed to create partition {name}: {e}")
+        await db.rollback()
         return {
             "status": "error",
             "message": f"Could not create partition. Reason: {e}",
         }
+    logger.info(f"Created partition {name}; moved {moved} rows from the default.")
+    return {
+        "status": "success",
+        "message": f"Partition '{name}' created.",
+        "moved_rows": moved,
+    }
+
+
+async def get_default_partition_stats(db: AsyncSession) -> dict:
+    result = await db.execute(
+        text(
+            f"""
+            SELECT count(*) AS rows, min(timestamp) AS oldest, max(timestamp) AS newest
+            FROM {INVENTORY_DEFAULT_PARTITION}
+            """
+        )
+    )
+    return dict(result.one()._mapping)
+
+
+def _missing_periods(
+    partitions: list[dict], year: int, month: int | None
+) -> list[tuple[int, int | None]]:
+    """
+    The periods to create so that (year, month) is fully covered: the period
+    itself if nothing overlaps it, the months not yet covered if it is a year
+    that already has monthly partitions, nothing otherwise.
+    """
+    if not _overlapping(partitions, *inventory_partition_bounds(year, month)):
+        return [(year, month)]
+    if month is not None:
+        return []
+    return [
+        (year, m)
+        for m in range(1, 13)
+        if not _overlapping(partitions, *inventory_partition_bounds(year, m))
+    ]
+
+
+async def maintain_inventory_partitions(
+    db: AsyncSession,
+    *,
+    granularity: str,
+    ahead: int,
+    today: datetime.date | None = None,
+) -> dict:
+    """
+    Makes sure partitions exist for the current period and the `ahead`
+    following ones, and empties the default partition into partitions for
+    the periods its rows belong to.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    periods = upcoming_periods(today, granularity, ahead)
+
+    default = await get_default_partition_stats(db)
+    if default["rows"]:
+        logger.warning(
+            f"{default['rows']} inventory movements between {default['oldest']} "
+            f"and {default['newest']} are in the default partition."
+        )
+        found = await db.execute(
+            text(
+                f"""
+                SELECT DISTINCT
+                    extract(year FROM timestamp AT TIME ZONE 'UTC')::int AS year,
+                    extract(month FROM timestamp AT TIME ZONE 'UTC')::int AS month
+                FROM {INVENTORY_DEFAULT_PARTITION}
+                ORDER BY 1, 2
+                """
+            )
+        )
+        for row in found:
+            period = (row.year, None if granularity == "year" else row.month)
+            if period not in periods:
+                periods.append(period)
+
+    partitions = await get_inventory_partitions(db)
+    created, errors, moved = [], [], 0
+    for period in periods:
+        for year, month in _missing_periods(partitions, *period):
+            outcome = await create_inventory_partition(db, year, month)
+            if outcome["status"] == "error":
+                logger.error(outcome["message"])
+                errors.append(outcome["message"])
+                continue
+            created.append(inventory_partition_name(year, month))
+            moved += outcome["moved_rows"]
+            partitions = await get_inventory_partitions(db)
+    return {
+        "created": created,
+        "moved_rows": moved,
+        "default_rows_found": default["rows"],
+        "errors": errors,
+    }
+
+
+async def create_inventory_partitions_between(
+    db: AsyncSession,
+    first: datetime.date,
+    last: datetime.date,
+    *,
+    granularity: str,
+) -> dict:
+    """
+    Makes sure partitions cover every period from the one holding `first` to
+    the one holding `last`, e.g. before loading historical movements.
+    """
+    if granularity == "year":
+        ahead = last.year - first.year
+    else:
+        ahead = (last.year - first.year) * 12 + last.month - first.month
+    return await maintain_inventory_partitions(
+        db, granularity=granularity, ahead=ahead, today=first
+    )
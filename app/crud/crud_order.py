@@ -0,0 +1,244 @@
+# app/crud/crud_order.py
+from collections import Counter
+from typing import Sequence, cast
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import invalidate_products
+from app.crud import crud_report
+from app.crud.crud_ledger import Movement, insert_movements, record_movements
+from app.models.inventory_movement import MovementType
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderCreate
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, shortages: list[dict]) -> None:
+        super().__init__("Insufficient stock")
+        self.shortages = shortages
+
+
+class InvalidStatusTransitionError(Exception):
+    pass
+
+
+# Status changes an order may go through
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.PROCESSING, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+}
+
+
+# Reserves stock for every product of an order in one statement. Rows are
+# locked in id order, so concurrent checkouts on the same SKUs queue up
+# rather than deadlock, and the stock check and decrement happen on the
+# locked row, so stock can never be oversold.
+RESERVE_STOCK_SQL = text(
+    """
+    WITH requested AS (
+        SELECT product_id, SUM(quantity) AS quantity
+        FROM unnest(CAST(:product_id AS INTEGER[]), CAST(:quantity AS INTEGER[]))
+            AS r(product_id, quantity)
+        GROUP BY product_id
+    ),
+    locked AS (
+        SELECT p.id
+        FROM product p
+        JOIN requested ON requested.product_id = p.id
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE product p
+    SET quantity_in_stock = p.quantity_in_stock - requested.quantity
+    FROM requested, locked
+    WHERE p.id = requested.product_id
+      AND locked.id = p.id
+      AND p.quantity_in_stock >= requested.quantity
+    RETURNING p.id
+    """
+)
+
+
+async def _find_shortages(db: AsyncSession, requested: Counter) -> list[dict]:
+    result = await db.execute(
+        text("SELECT id, quantity_in_stock FROM product WHERE id = ANY(:ids)"),
+        {"ids": list(requested)},
+    )
+    available = {row.id: row.quantity_in_stock for row in result}
+    return [
+        {
+            "product_id": product_id,
+            "requested": quantity,
+            # None means the product does not exist
+            "available": available.get(product_id),
+        }
+        for product_id, quantity in sorted(requested.items())
+        if available.get(product_id) is None or available[product_id] < quantity
+    ]
+
+
+async def create_order(db: AsyncSession, *, order_in: OrderCreate) -> Order:
+    """
+    Places an order: reserves stock for all items, then writes the order, its
+    items and one SALE movement per item, all in one transaction. Raises
+    InsufficientStockError, without writing anything, if any product lacks
+    stock.
+    """
+    requested: Counter = Counter()
+    for item in order_in.items:
+        requested[item.product_id] += item.quantity
+
+    reserved = await db.execute(
+        RESERVE_STOCK_SQL,
+        {"product_id": list(requested), "quantity": list(requested.values())},
+    )
+    if len(reserved.all()) < len(requested):
+        await db.rollback()
+        raise InsufficientStockError(await _find_shortages(db, requested))
+
+    db_order = Order(
+        customer_name=order_in.customer_name,
+        status=OrderStatus.PENDING,
+        items=[
+            OrderItem(product_id=item.product_id, quantity=item.quantity)
+            for item in order_in.items
+        ],
+    )
+    db.add(db_order)
+    await db.flush()
+    await insert_movements(
+        db,
+        [
+            Movement(item.product_id, -item.quantity, MovementType.SALE)
+            for item in order_in.items
+        ],
+    )
+    await crud_report.apply_order_status_change(
+        db, [cast(int, db_order.id)], None, OrderStatus.PENDING
+    )
+    await db.commit()
+    await invalidate_products(requested)
+    return db_order
+
+
+async def get_order(db: AsyncSession, order_id: int) -> Order | None:
+    result = await db.execute(
+        select(Order).where(Order.id == order_id).options(selectinload(Order.items))
+    )
+    return result.scalars().first()
+
+
+async def transition_orders(
+    db: AsyncSession,
+    order_ids: Sequence[int],
+    from_status: OrderStatus,
+    to_status: OrderStatus,
+) -> tuple[list[int], set[int]]:
+    """
+    Moves the given orders that are still in `from_status` to `to_status`,
+    in one statement, and applies the side effects: the pending orders
+    report is adjusted, and cancelled orders give their stock back. Does not
+    commit.
+
+    Returns the IDs of the orders that moved, and of the products whose
+    stock changed.
+    """
+    if to_status not in ORDER_TRANSITIONS.get(from_status, set()):
+        raise InvalidStatusTransitionError(
+            f"Orders can not go from {from_status.value} to {to_status.value}."
+        )
+    result = await db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status == from_status)
+        .values(status=to_status)
+        .returning(Order.id)
+    )
+    moved = list(result.scalars())
+    await crud_report.apply_order_status_change(db, moved, from_status, to_status)
+
+    restocked: dict[int, int] = {}
+    if moved and to_status == OrderStatus.CANCELLED:
+        items = await db.execute(
+            select(OrderItem.product_id, OrderItem.quantity).where(
+                OrderItem.order_id.in_(moved)
+            )
+        )
+        restocked = await record_movements(
+            db,
+            [
+                Movement(item.product_id, item.quantity, MovementType.RETURN)
+                for item in items
+            ],
+        )
+    return moved, set(restocked)
+
+
+async def update_order_status(
+    db: AsyncSession, order_id: int, status: OrderStatus
+) -> Order | None:
+    """
+    Changes the status of one order. Returns None if it does not exist, and
+    raises InvalidStatusTransitionError if the change is not allowed.
+    """
+    order = await get_order(db, order_id)
+    if order is None:
+        return None
+    moved, restocked = await transition_orders(db, [order_id], order.status, status)
+    if not moved:
+        # Another request changed the order since it was read
+        await db.rollback()
+        raise InvalidStatusTransitionError("The order status changed concurrently.")
+    await db.commit()
+    await invalidate_products(restocked)
+    return order
+
+
+# Moves up to :limit pending orders, oldest first, to processing. Orders
+# locked by another worker's batch are skipped rather than waited for, so
+# workers neither block each other nor claim the same order. The row locks
+# last until the batch commits; if a worker dies, its transaction rolls
+# back and the orders are pending again for the others.
+CLAIM_PENDING_ORDERS_SQL = text(
+    """
+    WITH claimed AS (
+        SELECT id
+        FROM "order"
+        WHERE status = 'PENDING'
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE "order" o
+    SET status = 'PROCESSING'
+    FROM claimed
+    WHERE o.id = claimed.id
+    RETURNING o.id
+    """
+)
+
+
+async def fulfill_pending_orders(db: AsyncSession, *, limit: int) -> list[int]:
+    """
+    Claims a batch of at most `limit` pending orders and takes them through
+    processing to completed, in one transaction and a fixed number of
+    set-based statements whatever the batch size. Returns the IDs of the
+    completed orders, an empty list when there was nothing to claim.
+
+    Stock was reserved, and the SALE movements written, when the orders were
+    placed (see `create_order`), so completing them changes neither.
+    """
+    result = await db.execute(CLAIM_PENDING_ORDERS_SQL, {"limit": limit})
+    claimed = list(result.scalars())
+    if not claimed:
+        await db.rollback()
+        return []
+    await crud_report.apply_order_status_change(
+        db, claimed, OrderStatus.PENDING, OrderStatus.PROCESSING
+    )
+    completed, _ = await transition_orders(
+        db, claimed, OrderStatus.PROCESSING, OrderStatus.COMPLETED
+    )
+    await db.commit()
+    return completed
@@ -1,20 +1,306 @@
-from sqlalchemy.orm import Session
+import logging
+from typing import Iterable, cast
 
+from sqlalchemy import Integer, any_, bindparam, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_products, product_cache, product_cache_key
+from app.crud.crud_ledger import Movement, insert_movements
+from app.crud.pagination import paginate
+from app.db.session import AsyncSessionLocal, replica_engine
+from app.models.inventory_movement import MovementType
 from app.models.product import Product
-from app.schemas.product import ProductCreate
+from app.schemas.product import ProductBulkItemResult, ProductCreate
+
+logger = logging.getLogger(__name__)
 
+# Multi-row upsert with a fixed shape: rows are passed as one array per
+# column, so the statement text never changes and is prepared only once,
+# however many rows a chunk holds. xmax is 0 only for rows inserted by it.
+# Stock is only taken from the payload for new products; existing stock is
+# left alone.
+_BULK_INSERT_SQL = """
+    INSERT INTO product
+        (sku, name, description, price, quantity_in_stock, reorder_point)
+    SELECT * FROM unnest(
+        CAST(:sku AS VARCHAR[]),
+        CAST(:name AS VARCHAR[]),
+        CAST(:description AS VARCHAR[]),
+        CAST(:price AS NUMERIC[]),
+        CAST(:quantity_in_stock AS INTEGER[]),
+        CAST(:reorder_point AS INTEGER[])
+    )
+    ON CONFLICT (sku) DO {conflict_action}
+    RETURNING id, sku, (xmax = 0) AS inserted
+"""
+BULK_UPSERT_SQL = text(
+    _BULK_INSERT_SQL.format(
+        conflict_action="UPDATE SET name = EXCLUDED.name, "
+        "description = EXCLUDED.description, price = EXCLUDED.price, "
+        "reorder_point = EXCLUDED.reorder_point"
+    )
+)
+BULK_INSERT_SQL = text(_BULK_INSERT_SQL.format(conflict_action="NOTHING"))
 
-def create_product(db: Session, *, product_in: ProductCreate) -> Product:
+
+async def create_product(db: AsyncSession, *, product_in: ProductCreate) -> Product:
     db_product = Product(**product_in.dict())
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.flush()
+    # The opening stock enters the ledger like any other restock
+    if product_in.quantity_in_stock:
+        await insert_movements(
+            db,
+            [
+                Movement(
+                    cast(int, db_product.id),
+                    product_in.quantity_in_stock,
+                    MovementType.RESTOCK,
+                )
+            ],
+        )
+    await db.commit()
+    await db.refresh(db_product)
+    await invalidate_products([cast(int, db_product.id)])
     return db_product
 
 
-def get_product(db: Session, product_id: int) -> Product | None:
-    return db.query(Product).filter(Product.id == product_id).first()
+def _bulk_params(rows: list[dict]) -> dict[str, list]:
+    return {
+        column: [row[column] for row in rows]
+        for column in (
+            "sku",
+            "name",
+            "description",
+            "price",
+            "quantity_in_stock",
+            "reorder_point",
+        )
+    }
+
+
+async def bulk_upsert_products(
+    db: AsyncSession,
+    items: list[tuple[int, ProductCreate]],
+    *,
+    update_existing: bool = True,
+) -> list[ProductBulkItemResult]:
+    """
+    Inserts or upserts one chunk of products on `sku` in a single transaction,
+    using one multi-row INSERT ... ON CONFLICT ... RETURNING statement.
+
+    `items` are (request index, product) pairs. If the statement fails as a
+    whole, the chunk is retried row by row inside savepoints so that only the
+    offending rows are reported as errors.
+    """
+    results: dict[int, ProductBulkItemResult] = {}
+
+    # A statement cannot upsert the same SKU twice, so the last one wins
+    latest: dict[str, tuple[int, ProductCreate]] = {}
+    for index, product_in in items:
+        if product_in.sku in latest:
+            earlier = latest[product_in.sku][0]
+            results[earlier] = ProductBulkItemResult(
+                index=earlier,
+                sku=product_in.sku,
+                status="error",
+                error=f"Duplicate SKU in request, superseded by item {index}.",
+            )
+        latest[product_in.sku] = (index, product_in)
+    index_by_sku = {sku: index for sku, (index, _) in latest.items()}
+
+    async def record(returned_rows) -> None:
+        opening_stock = []
+        for row in returned_rows:
+            index = index_by_sku[row.sku]
+            results[index] = ProductBulkItemResult(
+                index=index,
+                sku=row.sku,
+                id=row.id,
+                status="created" if row.inserted else "updated",
+            )
+            quantity = latest[row.sku][1].quantity_in_stock
+            if row.inserted and quantity:
+                opening_stock.append(Movement(row.id, quantity, MovementType.RESTOCK))
+        await insert_movements(db, opening_stock)
+
+    statement = BULK_UPSERT_SQL if update_existing else BULK_INSERT_SQL
+    rows = [product_in.dict() for _, product_in in latest.values()]
+    try:
+        result = await db.execute(statement, _bulk_params(rows))
+        await record(result.all())
+        await db.commit()
+        await invalidate_products(r.id for r in results.values() if r.id)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.warning(
+            "Bulk product chunk failed, retrying row by row: "
+            f"{getattr(e, 'orig', None) or e}"
+        )
+        results = {i: r for i, r in results.items() if r.status == "error"}
+        for row in rows:
+            try:
+                async with db.begin_nested():
+                    result = await db.execute(statement, _bulk_params([row]))
+                    await record(result.all())
+            except SQLAlchemyError as row_error:
+                index = index_by_sku[row["sku"]]
+                results[index] = ProductBulkItemResult(
+                    index=index,
+                    sku=row["sku"],
+                    status="error",
+                    error=str(getattr(row_error, "orig", None) or row_error)
+                    .strip()
+                    .splitlines()[0],
+                )
+        await db.commit()
+        await invalidate_products(r.id for r in results.values() if r.id)
+
+    # Rows skipped by ON CONFLICT DO NOTHING are not returned
+    for sku, (index, _) in latest.items():
+        results.setdefault(
+            index,
+            ProductBulkItemResult(
+                index=index,
+                sku=sku,
+                status="error",
+                error="A product with this SKU already exists.",
+            ),
+        )
+    return [results[index] for index in sorted(results)]
+
+
+async def get_product(db: AsyncSession, product_id: int) -> Product | None:
+    # Primary key lookup: served from the session's identity map when the
+    # product is already loaded, and without LIMIT or statement building
+    # otherwise
+    return await db.get(Product, product_id)
+
+
+# Hot lookups are built once: executing a prebuilt statement skips its
+# construction and the computation of its compiled-cache key. Batches of
+# ids are passed as one array with = ANY(:ids), so the statement is the same
+# (and prepared once per connection) whatever the number of ids, where IN
+# renders one parameter per id.
+IDS = bindparam("ids", type_=ARRAY(Integer))
+GET_PRODUCTS = select(Product).where(Product.id == any_(IDS))
+
+
+async def get_products(db: AsyncSession, ids: Iterable[int]) -> list[Product]:
+    """
+    The products with the given ids, in one query, in no particular order.
+    Unknown ids are left out.
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    result = await db.execute(GET_PRODUCTS, {"ids": ids})
+    return list(result.scalars())
+
+
+# Columns of the Product schema, in its field order
+PRODUCT_COLUMNS = (
+    Product.sku,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.quantity_in_stock,
+    Product.reorder_point,
+    Product.id,
+    Product.version,
+)
+
+GET_PRODUCT_DATA = select(*PRODUCT_COLUMNS).where(
+    Product.id == bindparam("product_id", type_=Integer)
+)
+GET_PRODUCT_VERSION = select(Product.version).where(
+    Product.id == bindparam("product_id", type_=Integer)
+)
+
+
+async def get_product_data(db: AsyncSession, product_id: int) -> dict | None:
+    """
+    The product as a JSON-ready dict shaped like the Product schema, read as
+    a row rather than an ORM object.
+    """
+    result = await db.execute(GET_PRODUCT_DATA, {"product_id": product_id})
+    row = result.first()
+    if row is None:
+        return None
+    # Serialized as pydantic would, so cache backends can store it as JSON
+    return {**row._asdict(), "price": str(row.price)}
+
+
+async def get_product_version(db: AsyncSession, product_id: int) -> int | None:
+    version: int | None = await db.scalar(
+        GET_PRODUCT_VERSION, {"product_id": product_id}
+    )
+    return version
+
+
+async def get_product_cached(db: AsyncSession, product_id: int) -> dict | None:
+    """
+    Read-through cached variant of `get_product_data`.
+
+    Misses are always loaded from the primary: a lagging replica could
+    return a row older than the last invalidation, and it would be cached.
+    """
+    if replica_engine is None or db.bind is not replica_engine:
+        return await product_cache.get_or_load(
+            product_cache_key(product_id), lambda: get_product_data(db, product_id)
+        )
+
+    async def load_from_primary() -> dict | None:
+        async with AsyncSessionLocal() as primary:
+            return await get_product_data(primary, product_id)
+
+    return await product_cache.get_or_load(
+        product_cache_key(product_id), load_from_primary
+    )
+
+
+async def set_reorder_point(
+    db: AsyncSession, product_id: int, reorder_point: int
+) -> Product | None:
+    product = await db.scalar(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(reorder_point=reorder_point)
+        .returning(Product)
+    )
+    if product is None:
+        return None
+    await db.commit()
+    await invalidate_products([product_id])
+    return product
+
+
+# Matches the predicate of the ix_product_below_reorder_point partial index
+BELOW_REORDER_POINT = Product.quantity_in_stock < Product.reorder_point
 
 
-def get_low_stock_products(db: Session, threshold: int):
-    return db.query(Product).filter(Product.quantity_in_stock < threshold).all()
+async def get_low_stock_products(
+    db: AsyncSession,
+    threshold: int | None = None,
+    *,
+    cursor: str | None = None,
+    limit: int = 100,
+):
+    """
+    Products below their own reorder point, read from the partial index that
+    only holds those, one page at a time. A `threshold` applies one global
+    limit instead, which scans the whole table.
+    """
+    if threshold is None:
+        condition = BELOW_REORDER_POINT
+    else:
+        condition = Product.quantity_in_stock < threshold
+    return await paginate(
+        db,
+        select(Product).where(condition),
+        keys=(Product.id,),
+        cursor=cursor,
+        limit=limit,
+    )
@@ -1,24 +1,243 @@
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+import logging
+import time
+from typing import Sequence, cast
 
-from app.models import Order, OrderItem, Product, Supplier
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.pagination import paginate
+from app.models import (
+    Order,
+    OrderItem,
+    Product,
+    Supplier,
+    SupplierPendingOrders,
+    stock_valuation,
+    supplier_stock_valuation,
+)
+from app.models.order import OrderStatus
 
-def get_pending_orders_summary(db: Session):
+logger = logging.getLogger(__name__)
+
+
+async def get_pending_orders_summary(db: AsyncSession):
     """
-    Generates a report of pending orders grouped by supplier.
+    Generates a report of pending orders grouped by supplier, from the live
+    tables. Every call joins the whole order history; the API serves the
+    incrementally maintained `get_pending_orders_report` instead.
     """
-    results = (
-        db.query(
+    result = await db.execute(
+        select(
+            Supplier.id.label("supplier_id"),
             Supplier.name.label("supplier_name"),
-            func.count(Order.id).label("pending_orders_count"),
+            # An order with several items from one supplier counts once
+            func.count(func.distinct(Order.id)).label("pending_orders_count"),
         )
         # Start with Supplier and join "outwards"
         .join(Supplier.products)  # Joins Supplier to Product using the relationship
         .join(Product.order_items)  # Joins Product to OrderItem
         .join(OrderItem.order)  # Joins OrderItem to Order
-        .filter(Order.status == "pending")
-        .group_by(Supplier.name)
-        .all()
+        .where(Order.status == OrderStatus.PENDING)
+        .group_by(Supplier.id, Supplier.name)
+    )
+    return result.all()
+
+
+# Adds `sign` to the count of every supplier with products in the given
+# orders, once per order. Suppliers are updated in id order so that
+# concurrent transactions can not deadlock on the counter rows.
+ADJUST_PENDING_ORDERS_SQL = text(
+    """
+    INSERT INTO supplier_pending_orders (supplier_id, pending_orders_count)
+    SELECT p.supplier_id, :sign * COUNT(DISTINCT oi.order_id)
+    FROM order_items oi
+    JOIN product p ON p.id = oi.product_id
+    WHERE oi.order_id = ANY(:order_ids) AND p.supplier_id IS NOT NULL
+    GROUP BY p.supplier_id
+    ORDER BY p.supplier_id
+    ON CONFLICT (supplier_id) DO UPDATE
+    SET pending_orders_count =
+            supplier_pending_orders.pending_orders_count
+            + EXCLUDED.pending_orders_count,
+        updated_at = now()
+    """
+)
+
+
+async def apply_order_status_change(
+    db: AsyncSession,
+    order_ids: Sequence[int],
+    old_status: OrderStatus | None,
+    new_status: OrderStatus,
+) -> None:
+    """
+    Keeps supplier_pending_orders in step with orders moving from
+    `old_status` (None for new orders) to `new_status`. Must run in the
+    transaction that changes the orders, after their items are written.
+    """
+    if not order_ids or old_status == new_status:
+        return
+    if new_status == OrderStatus.PENDING:
+        sign = 1
+    elif old_status == OrderStatus.PENDING:
+        sign = -1
+    else:
+        return
+    await db.execute(
+        ADJUST_PENDING_ORDERS_SQL, {"order_ids": list(order_ids), "sign": sign}
+    )
+
+
+async def get_pending_orders_report(db: AsyncSession):
+    result = await db.execute(
+        select(
+            Supplier.id.label("supplier_id"),
+            Supplier.name.label("supplier_name"),
+            SupplierPendingOrders.pending_orders_count,
+            SupplierPendingOrders.updated_at,
+        )
+        .join(Supplier, Supplier.id == SupplierPendingOrders.supplier_id)
+        .where(SupplierPendingOrders.pending_orders_count > 0)
+        .order_by(SupplierPendingOrders.pending_orders_count.desc(), Supplier.id)
+    )
+    return result.all()
+
+
+async def rebuild_pending_orders_report(db: AsyncSession) -> dict:
+    """
+    Recomputes supplier_pending_orders from the live tables. The table lock
+    makes concurrent status changes wait, so none of them is lost or counted
+    twice.
+    """
+    await db.execute(text("LOCK TABLE supplier_pending_orders IN EXCLUSIVE MODE"))
+    await db.execute(text("DELETE FROM supplier_pending_orders"))
+    result = await db.execute(
+        text(
+            """
+            INSERT INTO supplier_pending_orders (supplier_id, pending_orders_count)
+            SELECT p.supplier_id, COUNT(DISTINCT o.id)
+            FROM "order" o
+            JOIN order_items oi ON oi.order_id = o.id
+            JOIN product p ON p.id = oi.product_id
+            WHERE o.status = 'PENDING' AND p.supplier_id IS NOT NULL
+            GROUP BY p.supplier_id
+            """
+        )
+    )
+    await db.commit()
+    suppliers = cast(CursorResult, result).rowcount
+    logger.info(f"Rebuilt pending orders report for {suppliers} suppliers.")
+    return {"status": "success", "suppliers": suppliers}
+
+
+async def check_pending_orders_report(db: AsyncSession) -> dict:
+    """
+    Compares supplier_pending_orders with the live join and lists every
+    supplier whose counts differ. Both are read by one statement, so from
+    one snapshot: status changes committing meanwhile are not mismatches.
+    """
+    live = (
+        select(
+            Product.supplier_id,
+            # An order with several items from one supplier counts once
+            func.count(func.distinct(Order.id)).label("pending_orders_count"),
+        )
+        .join(Product.order_items)
+        .join(OrderItem.order)
+        .where(Order.status == OrderStatus.PENDING, Product.supplier_id.isnot(None))
+        .group_by(Product.supplier_id)
+        .subquery()
+    )
+    stored = SupplierPendingOrders
+    supplier_id = func.coalesce(live.c.supplier_id, stored.supplier_id)
+    expected = func.coalesce(live.c.pending_orders_count, 0)
+    actual = func.coalesce(stored.pending_orders_count, 0)
+    result = await db.execute(
+        select(
+            supplier_id.label("supplier_id"),
+            expected.label("expected"),
+            actual.label("actual"),
+        )
+        .select_from(live)
+        .join(stored, live.c.supplier_id == stored.supplier_id, full=True)
+        .where(expected != actual)
+        .order_by(supplier_id)
+    )
+    mismatches = [row._asdict() for row in result]
+    return {"consistent": not mismatches, "mismatches": mismatches}
+
+
+# --- Stock valuation ---
+#
+# Served from materialized views so that valuation queries never scan the
+# product table that checkouts are updating. The supplier totals are
+# computed from the per-product view, and both are refreshed in one
+# transaction, so they always agree with each other.
+
+
+async def refresh_stock_valuation(db: AsyncSession) -> dict:
+    """
+    Refreshes the stock valuation views. CONCURRENTLY lets readers keep
+    querying the previous contents while the new ones are computed.
+    """
+    started = time.perf_counter()
+    await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY vw_stock_valuation"))
+    await db.execute(
+        text("REFRESH MATERIALIZED VIEW CONCURRENTLY vw_supplier_stock_valuation")
+    )
+    await db.commit()
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Refreshed stock valuation in {duration_ms} ms.")
+    return {"status": "success", "duration_ms": duration_ms}
+
+
+async def get_stock_valuation_totals(db: AsyncSession):
+    """
+    Grand total over all products, including those without a supplier, and
+    the time of the last refresh.
+    """
+    result = await db.execute(
+        select(
+            select(func.coalesce(func.sum(stock_valuation.c.valuation), 0))
+            .scalar_subquery()
+            .label("total_valuation"),
+            select(func.max(supplier_stock_valuation.c.refreshed_at))
+            .scalar_subquery()
+            .label("refreshed_at"),
+        )
+    )
+    return result.one()
+
+
+async def get_stock_valuation_by_supplier(
+    db: AsyncSession, *, cursor: str | None = None, limit: int = 100
+):
+    return await paginate(
+        db,
+        select(supplier_stock_valuation),
+        keys=(supplier_stock_valuation.c.supplier_id,),
+        cursor=cursor,
+        limit=limit,
+        scalars=False,
+    )
+
+
+async def get_stock_valuation_by_product(
+    db: AsyncSession,
+    *,
+    supplier_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+):
+    stmt = select(stock_valuation)
+    if supplier_id is not None:
+        stmt = stmt.where(stock_valuation.c.supplier_id == supplier_id)
+    return await paginate(
+        db,
+        stmt,
+        keys=(stock_valuation.c.id,),
+        cursor=cursor,
+        limit=limit,
+        scalars=False,
     )
-    return results
@@ -0,0 +1,194 @@
+"""
+Product search: ranked full-text and trigram matching in PostgreSQL, and the
+queries behind the in-memory autocomplete index (app/core/autocomplete.py).
+"""
+
+from typing import AsyncIterator, Sequence, cast
+
+from sqlalchemy import any_, func, select, text
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.crud_product import IDS, PRODUCT_COLUMNS
+from app.models.product import Product
+
+# Shorter queries have no trigram to look up, so substring and fuzzy matching
+# would read the whole trigram index; they only get full-text matches
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# Matches on the stored full-text document (ix_product_search_document) or,
+# for long enough queries, on substrings of name or SKU and on words similar
+# to the query (ix_product_name_trgm, ix_product_sku_trgm). The planner ORs the
+# bitmap scans of the indexes together. Both text search configurations are
+# queried since SKUs are indexed unstemmed.
+# Full-text matches score above 1 and come first. Trigram similarity, which
+# is costly to compute for thousands of rows, only scores the rest.
+_SEARCH_SQL = """
+    SELECT product.sku, product.name, product.description, product.price,
+           product.quantity_in_stock, product.reorder_point, product.id,
+           product.version,
+           CASE WHEN product.search_document @@ {tsquery}
+                THEN 1 + ts_rank(product.search_document, {tsquery})
+                ELSE greatest(word_similarity(:q, product.name),
+                              similarity(:q, product.sku))
+           END AS score
+    FROM product
+    WHERE product.search_document @@ {tsquery}{trigram_conditions}
+    ORDER BY score DESC, product.id
+    LIMIT :limit
+"""
+_TSQUERY = (
+    "(websearch_to_tsquery('simple'::regconfig, :q) || "
+    "websearch_to_tsquery('english'::regconfig, :q))"
+)
+_TRIGRAM_CONDITIONS = """
+       OR product.name ILIKE :pattern
+       OR product.sku ILIKE :pattern
+       OR :q <% product.name"""
+SEARCH_SQL = text(_SEARCH_SQL.format(tsquery=_TSQUERY, trigram_conditions=""))
+SEARCH_TRIGRAM_SQL = text(
+    _SEARCH_SQL.format(
+        tsquery=_TSQUERY,
+        trigram_conditions=_TRIGRAM_CONDITIONS,
+    )
+)
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _as_data(row) -> dict:
+    # Serialized as pydantic would, like crud_product.get_product_data
+    return {**row._asdict(), "price": str(row.price)}
+
+
+async def search_products(db: AsyncSession, q: str, *, limit: int = 20) -> list[dict]:
+    """
+    Products matching `q`, best first, as JSON-ready dicts with a `score`.
+
+    `q` is parsed like a web search box (quoted phrases, `or`, `-word`) and
+    matched against SKU, name and description, names weighing as much as
+    SKUs and more than descriptions. Queries of 3 characters or more also
+    match anywhere inside names and SKUs, and names with a word similar to
+    the query, which catches typos; those matches come after the full-text
+    ones.
+    """
+    q = q.strip()
+    if len(q) >= MIN_TRIGRAM_QUERY_LENGTH:
+        result = await db.execute(
+            SEARCH_TRIGRAM_SQL,
+            {"q": q, "pattern": f"%{escape_like(q)}%", "limit": limit},
+        )
+    else:
+        result = await db.execute(SEARCH_SQL, {"q": q, "limit": limit})
+    return [_as_data(row) for row in result]
+
+
+GET_PRODUCTS_DATA = select(*PRODUCT_COLUMNS).where(Product.id == any_(IDS))
+
+
+async def get_products_by_ids(db: AsyncSession, ids: Sequence[int]) -> list[dict]:
+    """
+    The products with the given ids, in that order, as JSON-ready dicts.
+    Unknown ids are left out.
+    """
+    if not ids:
+        return []
+    result = await db.execute(GET_PRODUCTS_DATA, {"ids": list(ids)})
+    by_id = {row.id: _as_data(row) for row in result}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+async def prefix_search_products(
+    db: AsyncSession, prefix: str, *, limit: int = 20
+) -> list[dict]:
+    """
+    Products whose name starts with `prefix`, ignoring case, by name.
+    Answers autocomplete requests while the in-memory index is not loaded.
+    """
+    result = await db.execute(
+        select(*PRODUCT_COLUMNS)
+        .where(Product.name.ilike(f"{escape_like(prefix)}%", escape="\\"))
+        .order_by(Product.name, Product.id)
+        .limit(limit)
+    )
+    return [_as_data(row) for row in result]
+
+
+# Every transaction with a lower id has ended, and is visible to the snapshot
+SNAPSHOT_XMIN_SQL = text(
+    "SELECT CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS TEXT) AS BIGINT)"
+)
+
+
+async def begin_snapshot(db: AsyncSession) -> int:
+    """
+    Starts a REPEATABLE READ transaction on a fresh session, so that all
+    its queries read one snapshot, and returns the snapshot's xmin.
+
+    Changes logged by transactions with an id of xmin or more may not be
+    visible to the snapshot yet; reading the change log from xmin on later
+    (`get_name_changes`) therefore misses nothing.
+    """
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    xmin: int = await db.scalar(SNAPSHOT_XMIN_SQL)
+    return xmin
+
+
+async def stream_product_names(
+    db: AsyncSession, *, chunk_size: int = 50_000
+) -> AsyncIterator[Sequence]:
+    """
+    (id, name) of every product, `chunk_size` rows at a time, read through a
+    server-side cursor. Rows come roughly in the order of
+    `autocomplete.PrefixIndex`, which then sorts them much faster.
+    """
+    result = await db.stream(
+        select(Product.id, Product.name)
+        # Byte order is code point order; lower() only approximates casefold()
+        .order_by(func.lower(Product.name).collate("C"), Product.id).execution_options(
+            yield_per=chunk_size
+        )
+    )
+    async for rows in result.partitions():
+        yield rows
+
+
+GET_NAME_CHANGES_SQL = text(
+    """
+    SELECT c.product_id, c.old_name, p.name
+    FROM product_search_change c
+    LEFT JOIN product p ON p.id = c.product_id
+    WHERE c.xid >= :since_xid
+    """
+)
+
+
+async def get_name_changes(db: AsyncSession, since_xid: int) -> Sequence:
+    """
+    (product_id, old_name, name) of every product created, renamed or
+    deleted by transactions with an id of `since_xid` or more, with the
+    product's current name (None once deleted). A product appears once per
+    change. Call within `begin_snapshot`.
+
+    Changes seen before are returned again while their transaction id is
+    not below the snapshot xmin, so they must be applied idempotently.
+    """
+    result = await db.execute(GET_NAME_CHANGES_SQL, {"since_xid": since_xid})
+    return result.all()
+
+
+async def trim_name_changes(db: AsyncSession, older_than_seconds: float) -> dict:
+    """
+    Deletes product_search_change rows older than `older_than_seconds`.
+    """
+    result = await db.execute(
+        text(
+            "DELETE FROM product_search_change "
+            "WHERE changed_at < now() - make_interval(secs => :seconds)"
+        ),
+        {"seconds": older_than_seconds},
+    )
+    await db.commit()
+    return {"deleted": cast(CursorResult, result).rowcount}
@@ -1,20 +1,207 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, any_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_expression
 
+from app.crud.crud_product import IDS, PRODUCT_COLUMNS
+from app.crud.pagination import paginate
+from app.models.product import Product
 from app.models.supplier import Supplier
 from app.schemas.supplier import SupplierCreate, SupplierUpdate
 
 
-def get_supplier(db: Session, supplier_id: int):
-    return db.query(Supplier).filter(Supplier.id == supplier_id).first()
+async def get_supplier(db: AsyncSession, supplier_id: int) -> Supplier | None:
+    # Primary key lookup, served from the identity map when possible
+    return await db.get(Supplier, supplier_id)
 
 
-def get_suppliers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Supplier).offset(skip).limit(limit).all()
+# Orderings available to supplier listings, each backed by an index
+SUPPLIER_SORT_KEYS = {
+    "id": (Supplier.id,),
+    "name": (Supplier.name, Supplier.id),
+}
 
 
-def create_supplier(db: Session, supplier: SupplierCreate):
+# Columns of the Supplier schema, in its field order
+SUPPLIER_COLUMNS = (
+    Supplier.name,
+    Supplier.contact_person,
+    Supplier.email,
+    Supplier.phone,
+    Supplier.id,
+    Supplier.version,
+)
+
+
+async def get_suppliers(
+    db: AsyncSession,
+    *,
+    cursor: str | None = None,
+    limit: int = 100,
+    sort: str = "id",
+) -> tuple[list[dict], str | None]:
+    """
+    One page of suppliers as plain dicts shaped like the Supplier schema,
+    read as rows rather than ORM objects.
+    """
+    rows, next_cursor = await paginate(
+        db,
+        select(*SUPPLIER_COLUMNS),
+        keys=SUPPLIER_SORT_KEYS[sort],
+        cursor=cursor,
+        limit=limit,
+        scalars=False,
+    )
+    return [row._asdict() for row in rows], next_cursor
+
+
+# Per-supplier aggregates, computed by PostgreSQL as correlated subqueries on
+# the ix_product_supplier_id_id index rather than from loaded products
+PRODUCT_COUNT = (
+    select(func.count(Product.id))
+    .where(Product.supplier_id == Supplier.id)
+    .correlate(Supplier)
+    .scalar_subquery()
+)
+STOCK_VALUE = (
+    select(func.coalesce(func.sum(Product.price * Product.quantity_in_stock), 0))
+    .where(Product.supplier_id == Supplier.id)
+    .correlate(Supplier)
+    .scalar_subquery()
+)
+
+# selectinload asks for the products of at most 500 suppliers per query, and
+# paginate reads one supplier more than the page holds, so pages up to this
+# size load in exactly two queries
+MAX_EXPANDED_LIMIT = 250
+
+
+def with_aggregates(stmt: Select) -> Select:
+    """
+    Loads the products of the selected suppliers with one extra IN query,
+    in id order, and fills in their product_count and stock_value in the
+    main one, so walking the result never lazy-loads anything.
+    """
+    return stmt.options(
+        selectinload(Supplier.products),
+        with_expression(Supplier.product_count, PRODUCT_COUNT),
+        with_expression(Supplier.stock_value, STOCK_VALUE),
+    )
+
+
+def supplier_detail_data(supplier: Supplier) -> dict:
+    """
+    A supplier loaded through `with_aggregates` as a dict shaped like the
+    SupplierDetail schema.
+    """
+    return {
+        **{column.key: getattr(supplier, column.key) for column in SUPPLIER_COLUMNS},
+        "product_count": supplier.product_count,
+        "stock_value": supplier.stock_value,
+        "products": [
+            {column.key: getattr(product, column.key) for column in PRODUCT_COLUMNS}
+            for product in supplier.products
+        ],
+    }
+
+
+async def get_supplier_detail(db: AsyncSession, supplier_id: int) -> dict | None:
+    """
+    The supplier with its products and aggregates, in two queries.
+    """
+    result = await db.execute(
+        with_aggregates(select(Supplier).where(Supplier.id == supplier_id))
+    )
+    supplier = result.scalars().first()
+    return None if supplier is None else supplier_detail_data(supplier)
+
+
+async def get_suppliers_with_products(
+    db: AsyncSession,
+    *,
+    cursor: str | None = None,
+    limit: int = 100,
+    sort: str = "id",
+) -> tuple[list[dict], str | None]:
+    """
+    Like `get_suppliers`, with each supplier's products and aggregates, in
+    two queries for pages of up to MAX_EXPANDED_LIMIT suppliers.
+    """
+    suppliers, next_cursor = await paginate(
+        db,
+        with_aggregates(select(Supplier)),
+        keys=SUPPLIER_SORT_KEYS[sort],
+        cursor=cursor,
+        limit=limit,
+    )
+    return [supplier_detail_data(supplier) for supplier in suppliers], next_cursor
+
+
+GET_PRODUCT_VERSIONS = (
+    select(Product.supplier_id, Product.id, Product.version)
+    .where(Product.supplier_id == any_(IDS))
+    .order_by(Product.supplier_id, Product.id)
+)
+
+
+async def _add_product_versions(db: AsyncSession, suppliers: list[dict]) -> None:
+    result = await db.execute(
+        GET_PRODUCT_VERSIONS, {"ids": [supplier["id"] for supplier in suppliers]}
+    )
+    by_supplier: dict[int, list[dict]] = {}
+    for row in result:
+        by_supplier.setdefault(row.supplier_id, []).append(
+            {"id": row.id, "version": row.version}
+        )
+    for supplier in suppliers:
+        supplier["products"] = by_supplier.get(supplier["id"], [])
+
+
+async def get_supplier_versions(
+    db: AsyncSession,
+    *,
+    cursor: str | None = None,
+    limit: int = 100,
+    sort: str = "id",
+    include_products: bool = False,
+) -> tuple[list[dict], str | None]:
+    """
+    The ids and versions of one page of suppliers, and of their products
+    with `include_products`, as read by `get_suppliers` and
+    `get_suppliers_with_products`. Enough to tell whether the page changed.
+    """
+    rows, next_cursor = await paginate(
+        db,
+        select(Supplier.id, Supplier.version, Supplier.name),
+        keys=SUPPLIER_SORT_KEYS[sort],
+        cursor=cursor,
+        limit=limit,
+        scalars=False,
+    )
+    suppliers = [{"id": row.id, "version": row.version} for row in rows]
+    if include_products and suppliers:
+        await _add_product_versions(db, suppliers)
+    return suppliers, next_cursor
+
+
+async def get_supplier_detail_versions(
+    db: AsyncSession, supplier_id: int
+) -> dict | None:
+    """
+    The version of the supplier and the ids and versions of its products.
+    """
+    version = await db.scalar(
+        select(Supplier.version).where(Supplier.id == supplier_id)
+    )
+    if version is None:
+        return None
+    supplier = {"id": supplier_id, "version": version}
+    await _add_product_versions(db, [supplier])
+    return supplier
+
+
+async def create_supplier(db: AsyncSession, supplier: SupplierCreate):
     db_supplier = Supplier(**supplier.dict())
     db.add(db_supplier)
-    db.commit()
-    db.refresh(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
     return db_supplier
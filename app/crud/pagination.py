@@ -0,0 +1,93 @@
+# app/crud/pagination.py
+"""
+Keyset (cursor) pagination shared by list endpoints.
+
+Pages are ordered on a tuple of indexed, non-null columns that ends with a
+unique one (usually the primary key). A page is fetched with
+`WHERE (keys) > (last keys seen)` instead of OFFSET, so the cost of a page
+does not depend on how deep it is. The last keys are handed to the client as
+an opaque cursor.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from typing import Any, Sequence
+
+from sqlalchemy import Column, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+# Mapped attributes, or plain Table columns for views without a mapped class
+Key = InstrumentedAttribute | Column
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _fingerprint(keys: Sequence[Key]) -> str:
+    return ",".join(f"{key.expression.table.name}.{key.key}" for key in keys)
+
+
+def encode_cursor(keys: Sequence[Key], values: Sequence[Any]) -> str:
+    payload = json.dumps([_fingerprint(keys), *values], default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keys: Sequence[Key], cursor: str) -> list[Any]:
+    """
+    Returns the key values stored in `cursor`, converted back to the Python
+    types of their columns. Raises InvalidCursorError if the cursor is
+    malformed or was issued for a different ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        fingerprint, *values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError("Malformed cursor.")
+    if fingerprint != _fingerprint(keys) or len(values) != len(keys):
+        raise InvalidCursorError("Cursor does not match the requested ordering.")
+
+    decoded = []
+    for key, value in zip(keys, values):
+        python_type = key.type.python_type
+        try:
+            if python_type in (datetime.datetime, datetime.date):
+                decoded.append(python_type.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (TypeError, ValueError, decimal.InvalidOperation):
+            raise InvalidCursorError("Malformed cursor.")
+    return decoded
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    *,
+    keys: Sequence[Key],
+    cursor: str | None = None,
+    limit: int = 100,
+    scalars: bool = True,
+) -> tuple[list[Any], str | None]:
+    """
+    Runs `stmt` for one page of at most `limit` items ordered on `keys`.
+
+    Returns the items and the cursor of the next page, which is None on the
+    last page. Set `scalars=False` when `stmt` selects rows rather than a
+    single entity; the rows must then expose the key columns by name.
+    """
+    if cursor:
+        stmt = stmt.where(tuple_(*keys) > tuple_(*decode_cursor(keys, cursor)))
+    # One extra row tells us whether there is a next page
+    result = await db.execute(stmt.order_by(*keys).limit(limit + 1))
+    items = list(result.scalars() if scalars else result.all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(keys, [getattr(last, key.key) for key in keys])
+    return items, next_cursor
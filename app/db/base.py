@@ -1,4 +1,4 @@
-from typing import Any, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from sqlalchemy.orm import as_declarative, declared_attr
 
@@ -14,6 +14,10 @@ class Base:
     __name__: str
     __tablename__: ClassVar[str]
 
+    if TYPE_CHECKING:
+        # The constructor as_declarative installs takes any mapped attribute
+        def __init__(self, **kwargs: Any) -> None: ...
+
     @declared_attr  # type: ignore
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
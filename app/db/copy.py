@@ -0,0 +1,73 @@
+# app/db/copy.py
+"""
+Reads query results straight into NumPy arrays.
+
+`COPY (query) TO STDOUT (FORMAT binary)` sends every row in the same layout
+when all columns are non-null fixed-width values, so the whole result can be
+viewed as one structured array instead of being decoded row by row.
+"""
+import time
+from typing import Any, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import record_query
+from app.db.session import driver_connection
+
+PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+
+def parse_binary_copy(
+    data: bytes, columns: Sequence[tuple[str, str]]
+) -> dict[str, np.ndarray]:
+    """
+    Parses binary COPY output into one array per column. `columns` are
+    (name, dtype) pairs such as ("id", "i4") matching the query's columns.
+    """
+    if not data.startswith(PGCOPY_SIGNATURE):
+        raise ValueError("Not binary COPY output.")
+    # Signature, flags and header extension length, then the extension
+    extension_length = int.from_bytes(data[15:19], "big")
+    # The trailer is a field count of -1
+    body = memoryview(data)[19 + extension_length : -2]
+
+    fields = [("field_count", ">i2")]
+    for name, dtype in columns:
+        fields += [(f"{name}_length", ">i4"), (name, f">{dtype}")]
+    rows = np.frombuffer(body, dtype=np.dtype(fields))
+
+    if len(rows) and (rows["field_count"] != len(columns)).any():
+        raise ValueError("Unexpected number of columns in COPY output.")
+    arrays = {}
+    for name, dtype in columns:
+        # NULLs have a length of -1, and would also shift every later field
+        if len(rows) and (rows[f"{name}_length"] != np.dtype(dtype).itemsize).any():
+            raise ValueError(f"Column {name} is NULL or not of type {dtype}.")
+        arrays[name] = rows[name].astype(dtype)
+    return arrays
+
+
+async def fetch_arrays(
+    db: AsyncSession, query: str, columns: Sequence[tuple[str, str]], *args: Any
+) -> dict[str, np.ndarray]:
+    """
+    Runs `query` (asyncpg syntax, $1 placeholders) on the session's
+    connection and returns its columns as arrays, see `parse_binary_copy`.
+    """
+    connection = await driver_connection(db)
+    chunks: list[bytes] = []
+
+    async def collect(chunk: bytes) -> None:
+        chunks.append(chunk)
+
+    started = time.perf_counter()
+    await connection.copy_from_query(query, *args, output=collect, format="binary")
+    arrays = parse_binary_copy(b"".join(chunks), columns)
+    record_query(
+        query,
+        args,
+        time.perf_counter() - started,
+        len(next(iter(arrays.values()))) if arrays else 0,
+    )
+    return arrays
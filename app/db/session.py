@@ -1,8 +1,115 @@
 # app/db/session.py
-from sqlalchemy import create_engine
+import os
+import time
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import TimedAsyncQueuePool, instrument_engine
+
+
+def pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def ping_idle_connections(engine: Engine, idle_seconds: float) -> None:
+    """
+    Pre-ping for connections that sat in the pool for `idle_seconds` or
+    more, which are the ones a server restart or a firewall is likely to
+    have cut; busy connections skip the extra round trip.
+    """
+
+    @event.listens_for(engine.pool, "checkin")
+    def record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.pool, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool replaces the connection and tries again
+            raise DisconnectionError() from e
+
+
+def configure_engine(engine: Engine) -> None:
+    if settings.DB_POOL_PRE_PING == "idle":
+        ping_idle_connections(engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+# Sync engine, used by scripts/seed.py and Alembic
+engine = create_engine(settings.DATABASE_URL, **pool_options())
+configure_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine, used by the API
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL, poolclass=TimedAsyncQueuePool, **pool_options()
+)
+configure_engine(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "primary")
+# Objects stay loaded after commit, since lazy loading is not possible in async code
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Read replica, when configured; read-only routes get sessions on it
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.READ_REPLICA_URL:
+    replica_engine = create_async_engine(
+        make_url(settings.READ_REPLICA_URL).set(drivername="postgresql+asyncpg"),
+        poolclass=TimedAsyncQueuePool,
+        **pool_options(),
+    )
+    configure_engine(replica_engine.sync_engine)
+    instrument_engine(replica_engine.sync_engine, "replica")
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+async def driver_connection(db: AsyncSession) -> Any:
+    """
+    The asyncpg connection under the session's, for what SQLAlchemy does not
+    expose, such as COPY. What runs on it is part of the session's
+    transaction.
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    if raw_connection.driver_connection is None:
+        raise RuntimeError("The session's connection has been invalidated.")
+    return raw_connection.driver_connection
+
+
+def _reset_pools_after_fork() -> None:
+    # A forked child must not use the sockets it inherited in the parent's
+    # pools, which the parent keeps using. close=False leaves them to the
+    # parent and gives the child fresh, empty pools.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.sync_engine.dispose(close=False)
+
+
+# Covers servers that fork workers after importing the app (gunicorn with
+# --preload, for instance); python -m app.server spawns them instead
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
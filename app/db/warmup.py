@@ -0,0 +1,97 @@
+# app/db/warmup.py
+"""
+Warm start, run by the app's lifespan before a worker takes requests.
+
+Without it, the first requests after a deploy pay for work that is done
+once per process: SQLAlchemy configures the mappers of app/models on the
+first query, pools open connections one request at a time, and every hot
+statement is compiled by SQLAlchemy and prepared by asyncpg on each
+connection the first time it runs there.
+
+`warm_up` configures the mappers, opens DB_POOL_WARMUP_CONNECTIONS
+connections on each engine at the same time, and runs the hot read
+statements on every one of them, leaving them prepared in the pool.
+Failures are logged and do not stop the app; requests then open their
+connections as before.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import configure_mappers
+
+from app import models  # noqa: F401 (registers every mapper)
+from app.core.config import settings
+from app.crud import crud_product, crud_supplier
+from app.db.session import async_engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# The statements behind the busiest read routes. Ids that do not exist keep
+# them cheap; they are compiled and prepared all the same.
+HOT_STATEMENTS: list[Callable[[AsyncSession], Awaitable[Any]]] = [
+    lambda db: crud_product.get_product_data(db, 0),
+    lambda db: crud_product.get_product_version(db, 0),
+    lambda db: crud_supplier.get_suppliers(db, limit=1),
+    lambda db: crud_supplier.get_supplier_versions(db, limit=1),
+    lambda db: crud_supplier.get_supplier_detail(db, 0),
+]
+
+# Bounds the startup delay when the database is slow or unreachable
+WARMUP_TIMEOUT_SECONDS = 30
+
+# Outcome of the last warm-up, None until it has run
+warmup_stats: dict[str, Any] | None = None
+
+
+async def _warm_connection(engine: AsyncEngine, barrier: asyncio.Barrier) -> None:
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection) as db:
+            for statement in HOT_STATEMENTS:
+                await statement(db)
+            await db.rollback()
+        # Held until all are open, so that each task gets its own connection
+        await barrier.wait()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> None:
+    if connections <= 0:
+        return
+    barrier = asyncio.Barrier(connections)
+    # A failure cancels the other tasks, which would wait at the barrier
+    async with asyncio.TaskGroup() as group:
+        for _ in range(connections):
+            group.create_task(_warm_connection(engine, barrier))
+
+
+async def warm_up() -> dict[str, Any]:
+    global warmup_stats
+    started = time.perf_counter()
+    connections = settings.DB_POOL_WARMUP_CONNECTIONS
+    # The pool closes connections beyond its size when they are returned
+    if connections is None or connections > settings.DB_POOL_SIZE:
+        connections = settings.DB_POOL_SIZE
+    stats: dict[str, Any] = {"connections": connections, "error": None}
+
+    configure_mappers()
+    stats["mappers_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    engines = [async_engine]
+    if replica_engine is not None:
+        engines.append(replica_engine)
+    try:
+        async with asyncio.timeout(WARMUP_TIMEOUT_SECONDS):
+            for engine in engines:
+                await warm_pool(engine, connections)
+    except Exception as e:
+        if isinstance(e, ExceptionGroup):
+            e = e.exceptions[0]
+        logger.warning(f"Connection pool warm-up failed: {e!r}")
+        stats["error"] = repr(e)
+
+    stats["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Warm-up done: {stats}")
+    warmup_stats = stats
+    return stats
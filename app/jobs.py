@@ -0,0 +1,94 @@
+# app/jobs.py
+"""
+Periodic maintenance jobs run by app.core.scheduler.
+"""
+import logging
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+from app.crud import crud_ledger, crud_maintenance, crud_report, crud_search
+from app.db.session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+
+async def run_exclusively(
+    name: str, func: Callable[[AsyncSession], Awaitable[Any]]
+) -> Any:
+    """
+    Runs `func` with a fresh session, unless another process is already
+    running the job with the same name. With several app workers, each job
+    then runs once per interval rather than once per worker.
+    """
+    async with async_engine.connect() as lock_connection:
+        acquired = await lock_connection.scalar(
+            text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": name}
+        )
+        if not acquired:
+            logger.debug(f"Job '{name}' is running elsewhere, skipping.")
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                return await func(db)
+        finally:
+            await lock_connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name}
+            )
+            await lock_connection.commit()
+
+
+async def take_daily_stock_snapshot() -> None:
+    await run_exclusively("ledger-snapshot", crud_ledger.take_daily_snapshot)
+
+
+async def maintain_inventory_partitions() -> None:
+    await run_exclusively(
+        "partition-maintenance",
+        lambda db: crud_maintenance.maintain_inventory_partitions(
+            db,
+            granularity=settings.INVENTORY_PARTITION_GRANULARITY,
+            ahead=settings.INVENTORY_PARTITIONS_AHEAD,
+        ),
+    )
+
+
+async def refresh_stock_valuation() -> None:
+    await run_exclusively(
+        "stock-valuation-refresh", crud_report.refresh_stock_valuation
+    )
+
+
+async def trim_product_search_changes() -> None:
+    await run_exclusively(
+        "product-search-change-trim",
+        lambda db: crud_search.trim_name_changes(
+            db, settings.PRODUCT_SEARCH_CHANGE_RETENTION_SECONDS
+        ),
+    )
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    scheduler.add_job(
+        "ledger-snapshot",
+        settings.LEDGER_SNAPSHOT_INTERVAL_SECONDS,
+        take_daily_stock_snapshot,
+    )
+    scheduler.add_job(
+        "partition-maintenance",
+        settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+        maintain_inventory_partitions,
+    )
+    scheduler.add_job(
+        "stock-valuation-refresh",
+        settings.STOCK_VALUATION_REFRESH_INTERVAL_SECONDS,
+        refresh_stock_valuation,
+    )
+    scheduler.add_job(
+        "product-search-change-trim",
+        settings.PRODUCT_SEARCH_CHANGE_TRIM_INTERVAL_SECONDS,
+        trim_product_search_changes,
+    )
@@ -1,16 +1,75 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
-from app.api.endpoints import maintenance, products, suppliers
+from app.api.consistency import ReadYourWritesMiddleware
+from app.api.endpoints import (
+    alerts,
+    analytics,
+    export,
+    health,
+    inventory,
+    maintenance,
+    metrics,
+    orders,
+    products,
+    reports,
+    suppliers,
+)
+from app.core.alerts import low_stock_alerts
+from app.core.autocomplete import product_autocomplete
 from app.core.config import settings
+from app.core.ingest import movement_writer
+from app.core.metrics import MetricsMiddleware, mark_process_dead
+from app.core.scheduler import scheduler
+from app.db.session import async_engine, replica_engine
+from app.db.warmup import warm_up
+from app.jobs import register_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before anything else uses the pools; uvicorn accepts requests once
+    # the startup is over
+    await warm_up()
+    register_jobs(scheduler)
+    scheduler.start()
+    movement_writer.start()
+    product_autocomplete.start()
+    yield
+    await scheduler.stop()
+    await product_autocomplete.stop()
+    # Writes out buffered movements while the engine is still open
+    await movement_writer.stop()
+    # Ends open alert streams, which would otherwise hold up the shutdown
+    await low_stock_alerts.close()
+    # Close pooled asyncpg connections cleanly on shutdown
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    mark_process_dead()
+
 
-app = FastAPI(title="Smart Inventory & Order Management System")
+app = FastAPI(title="Smart Inventory & Order Management System", lifespan=lifespan)
+if settings.READ_REPLICA_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+# Added last so that it runs first, and also times the other middleware
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(products.router, prefix="/products", tags=["Products"])
 app.include_router(suppliers.router, prefix="/suppliers", tags=["Suppliers"])
+app.include_router(orders.router, prefix="/orders", tags=["Orders"])
+app.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
+app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(alerts.router, prefix="/alerts", tags=["Alerts"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(export.router, prefix="/export", tags=["Export"])
 app.include_router(maintenance.router, prefix="/maintenance", tags=["Maintenance"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
 
 
 @app.get("/")
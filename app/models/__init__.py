@@ -1,8 +1,12 @@
 from app.db.base import Base
 
+from .analytics import MovementDailyRollup
 from .inventory_movement import InventoryMovement
 from .order import Order, OrderItem
-from .product import Product
+from .product import Product, ProductSearchChange
+from .report import SupplierPendingOrders, stock_valuation, supplier_stock_valuation
+from .stock_snapshot import StockSnapshot
+
 # Import all models here so that Base has them registered
 # and so that SQLAlchemy can resolve all relationships.
 from .supplier import Supplier
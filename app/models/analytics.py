@@ -0,0 +1,31 @@
+import datetime
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Index, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.inventory_movement import MovementType, movement_type_enum
+
+
+class MovementDailyRollup(Base):
+    """
+    Net quantity and number of inventory movements per product, UTC day and
+    movement type. Maintained by the inventory_movement_rollup trigger (see
+    migration c2a9e5d7f140) as movements are inserted.
+    """
+
+    __tablename__ = "movement_daily_rollup"
+
+    day: Mapped[datetime.date] = mapped_column(Date)
+    product_id: Mapped[int] = mapped_column(ForeignKey("product.id"))
+    movement_type: Mapped[MovementType] = mapped_column(movement_type_enum)
+    quantity: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    movement_count: Mapped[int] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        # The primary key index also covers `quantity`, see the migration
+        PrimaryKeyConstraint(
+            "day", "product_id", "movement_type", postgresql_include=["quantity"]
+        ),
+        Index("ix_movement_daily_rollup_product_id_day", "product_id", "day"),
+    )
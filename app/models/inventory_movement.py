@@ -1,7 +1,7 @@
 import datetime
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -15,6 +15,14 @@ class MovementType(str, enum.Enum):
     ADJUSTMENT = "adjustment"
 
 
+# The database enum (see migration e1791914e43a) stores the lowercase values
+movement_type_enum = Enum(
+    MovementType,
+    name="movementtype",
+    values_callable=lambda enum_cls: [member.value for member in enum_cls],
+)
+
+
 class InventoryMovement(Base):
     __tablename__ = "inventory_movement"
 
@@ -24,8 +32,19 @@ class InventoryMovement(Base):
     )
     quantity_changed: Mapped[int] = mapped_column(nullable=False)
     movement_type: Mapped[MovementType] = mapped_column(
-        Enum(MovementType), nullable=False
+        movement_type_enum, nullable=False
     )
     timestamp: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+    # Serves per-product range scans such as "movements since the last
+    # snapshot"; the BRIN index serves time range scans over all products
+    __table_args__ = (
+        Index("ix_inventory_movement_product_id_timestamp", "product_id", "timestamp"),
+        Index(
+            "ix_inventory_movement_timestamp_brin",
+            "timestamp",
+            postgresql_using="brin",
+        ),
+    )
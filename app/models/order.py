@@ -1,7 +1,7 @@
 # app/models/order.py
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -24,11 +24,19 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     items = relationship("OrderItem", back_populates="order")
 
+    # Fetch server defaults (created_at) with RETURNING on insert, since async
+    # sessions can not lazy-load them afterwards
+    __mapper_args__ = {"eager_defaults": True}
+    # The queue of app/worker.py, see crud_order.fulfill_pending_orders
+    __table_args__ = (
+        Index("ix_order_pending", "id", postgresql_where=text("status = 'PENDING'")),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("order.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("order.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
     quantity: Mapped[int] = mapped_column()
 
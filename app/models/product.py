@@ -1,8 +1,30 @@
-from sqlalchemy import Column, ForeignKey, Integer, Numeric, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base
 
+# Weighted full-text document of a product: SKU and name count more than the
+# description. SKUs are not stemmed.
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, sku), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
 
 class Product(Base):
     id = Column(Integer, primary_key=True, index=True)
@@ -11,6 +33,67 @@ class Product(Base):
     description = Column(String, nullable=True)
     price = Column(Numeric(10, 2), nullable=False)
     quantity_in_stock = Column(Integer, nullable=False, default=0)
+    # Stock level under which the product needs restocking; 0 disables alerts
+    reorder_point = Column(Integer, nullable=False, default=0, server_default="0")
+    # Kept up to date by PostgreSQL; only loaded when accessed
+    search_document = deferred(
+        Column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True), nullable=True)
+    )
+    # Bumped by a trigger on every update, see migration f7c3e9a1d2b4
+    version = Column(
+        BigInteger, nullable=False, server_default="1", server_onupdate=FetchedValue()
+    )
     supplier_id = Column(Integer, ForeignKey("supplier.id"), nullable=True)
     supplier = relationship("Supplier", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
+
+    # Crossing the reorder point also fires the notify_low_stock trigger, see
+    # migration b6d1f3a8e27c. Name changes are logged to ProductSearchChange
+    # by triggers, see migration d4b8f2a61e97.
+    __table_args__ = (
+        Index(
+            "ix_product_below_reorder_point",
+            "id",
+            postgresql_where=text("quantity_in_stock < reorder_point"),
+        ),
+        Index(
+            "ix_product_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_product_sku_trgm",
+            "sku",
+            postgresql_using="gin",
+            postgresql_ops={"sku": "gin_trgm_ops"},
+        ),
+        Index("ix_product_search_document", "search_document", postgresql_using="gin"),
+        Index("ix_product_supplier_id_id", "supplier_id", "id"),
+    )
+    # Fetch the version with RETURNING on insert and update
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class ProductSearchChange(Base):
+    """
+    A product that was created, renamed or deleted, written by triggers on
+    product and read by the autocomplete index (app/core/autocomplete.py).
+    """
+
+    __tablename__ = "product_search_change"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    # Id of the writing transaction (xid8, stored as a bigint)
+    xid = Column(
+        BigInteger,
+        nullable=False,
+        index=True,
+        server_default=text("CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)"),
+    )
+    product_id = Column(Integer, nullable=False)
+    # The name before an update or delete, NULL for new products
+    old_name = Column(String, nullable=True)
+    changed_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
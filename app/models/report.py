@@ -0,0 +1,60 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+)
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class SupplierPendingOrders(Base):
+    """
+    Number of distinct pending orders containing at least one product of the
+    supplier. Maintained incrementally as orders enter and leave PENDING;
+    see app/crud/crud_report.py.
+    """
+
+    __tablename__ = "supplier_pending_orders"
+
+    supplier_id = Column(Integer, ForeignKey("supplier.id"), primary_key=True)
+    pending_orders_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+# Materialized views, created and indexed by migrations. They live in their
+# own MetaData so that Alembic autogenerate does not mistake them for tables.
+views_metadata = MetaData()
+
+stock_valuation = Table(
+    "vw_stock_valuation",
+    views_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String),
+    Column("sku", String),
+    Column("supplier_id", Integer),
+    Column("price", Numeric(10, 2)),
+    Column("quantity_in_stock", Integer),
+    Column("valuation", Numeric),
+)
+
+supplier_stock_valuation = Table(
+    "vw_supplier_stock_valuation",
+    views_metadata,
+    Column("supplier_id", Integer, primary_key=True),
+    Column("supplier_name", String),
+    Column("product_count", Integer),
+    Column("units_in_stock", Integer),
+    Column("total_valuation", Numeric),
+    Column("refreshed_at", DateTime(timezone=True)),
+)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+
+from app.db.base import Base
+
+
+class StockSnapshot(Base):
+    """
+    Stock of a product at `taken_at`, i.e. the sum of all of its inventory
+    movements up to and including that instant.
+    """
+
+    __tablename__ = "stock_snapshot"
+
+    product_id = Column(Integer, ForeignKey("product.id"), primary_key=True)
+    taken_at = Column(DateTime(timezone=True), primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False)
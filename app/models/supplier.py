@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import relationship
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Column, FetchedValue, Index, Integer, String
+from sqlalchemy.orm import Mapped, query_expression, relationship
 
 from app.db.base import Base
 
@@ -10,4 +12,15 @@ class Supplier(Base):
     contact_person = Column(String, nullable=True)
     email = Column(String, unique=True, index=True, nullable=False)
     phone = Column(String, nullable=True)
-    products = relationship("Product", back_populates="supplier")
+    # Bumped by a trigger on every update, see migration f7c3e9a1d2b4
+    version = Column(
+        BigInteger, nullable=False, server_default="1", server_onupdate=FetchedValue()
+    )
+    products = relationship("Product", back_populates="supplier", order_by="Product.id")
+    # Filled in by queries that ask for them, see crud_supplier.with_aggregates
+    product_count: Mapped[int | None] = query_expression()
+    stock_value: Mapped[Decimal | None] = query_expression()
+
+    __table_args__ = (Index("ix_supplier_name_id", "name", "id"),)
+    # Fetch the version with RETURNING on insert and update
+    __mapper_args__ = {"eager_defaults": True}
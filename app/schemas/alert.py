@@ -0,0 +1,15 @@
+import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class LowStockAlert(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    quantity_in_stock: int
+    reorder_point: int
+    # "recovered" once the product is back at or above its reorder point
+    status: Literal["low", "recovered"]
+    at: datetime.datetime
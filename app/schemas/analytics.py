@@ -0,0 +1,33 @@
+import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ProductVelocity(BaseModel):
+    product_id: int
+    quantity_in_stock: int
+    # Net units sold per day (sales minus returns) over the whole window
+    avg_daily_sales: float
+    # Same over the short window
+    avg_daily_sales_short: float
+    # Short over long average: above 1 means sales are speeding up
+    trend: float | None = None
+    # Days the current stock lasts at the short-window rate; null if the
+    # product does not sell
+    days_of_cover: float | None = None
+    stockout_date: datetime.date | None = None
+
+
+class VelocityReport(BaseModel):
+    as_of: datetime.date
+    window_days: int
+    short_window_days: int
+    # Number of products the figures were computed for
+    products: int
+    items: List[ProductVelocity]
+
+
+class RollupRebuild(BaseModel):
+    start: datetime.date = Field(..., description="First day to rebuild")
+    end: datetime.date = Field(..., description="Day after the last one to rebuild")
@@ -0,0 +1,39 @@
+import datetime
+from typing import List
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.models.inventory_movement import MovementType
+
+# Bounds of the integer columns the movements are written to
+INT4_MIN = -(2**31)
+INT4_MAX = 2**31 - 1
+
+
+class MovementCreate(BaseModel):
+    product_id: int = Field(..., ge=1, le=INT4_MAX)
+    # Signed: negative for stock leaving the warehouse
+    quantity_changed: int = Field(
+        ..., ge=INT4_MIN, le=INT4_MAX, description="Must not be zero"
+    )
+    movement_type: MovementType
+    # When the movement happened; defaults to when it is accepted. Taken as
+    # UTC when it has no time zone.
+    timestamp: datetime.datetime | None = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def timestamp_in_utc(cls, value: datetime.datetime | None):
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=datetime.timezone.utc)
+        return value
+
+
+class MovementItemError(BaseModel):
+    index: int
+    error: str
+
+
+class MovementIngestResult(BaseModel):
+    accepted: int = 0
+    errors: List[MovementItemError] = []
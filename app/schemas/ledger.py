@@ -0,0 +1,28 @@
+# app/schemas/ledger.py
+import datetime
+
+from pydantic import BaseModel, Field
+
+
+class StockLevel(BaseModel):
+    product_id: int
+    at: datetime.datetime
+    quantity_in_stock: int
+    # Snapshot the answer was computed from, if any
+    snapshot_taken_at: datetime.datetime | None = None
+
+
+class SnapshotCreate(BaseModel):
+    as_of: datetime.datetime | None = Field(
+        default=None,
+        description=(
+            "UTC midnight to snapshot, not in the future; defaults to the most "
+            "recent one."
+        ),
+    )
+
+
+class SnapshotResult(BaseModel):
+    taken_at: datetime.datetime
+    previous_snapshot: datetime.datetime | None = None
+    products: int
@@ -1,4 +1,6 @@
 # app/schemas/maintenance.py
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -9,3 +11,21 @@ class PartitionCreate(BaseModel):
         le=2050,
         description="The year to create an inventory partition for (e.g., 2026).",
     )
+    month: int | None = Field(
+        default=None,
+        ge=1,
+        le=12,
+        description="Create a monthly partition for this month of `year` instead.",
+    )
+
+
+class PartitionMaintenance(BaseModel):
+    granularity: Literal["year", "month"] | None = Field(
+        default=None, description="Defaults to INVENTORY_PARTITION_GRANULARITY."
+    )
+    ahead: int | None = Field(
+        default=None,
+        ge=0,
+        le=120,
+        description="Defaults to INVENTORY_PARTITIONS_AHEAD.",
+    )
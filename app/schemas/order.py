@@ -1,11 +1,14 @@
+import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.models.order import OrderStatus
 
 
 class OrderItemBase(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(..., gt=0)
 
 
 class OrderItemCreate(OrderItemBase):
@@ -21,4 +24,19 @@ class OrderItem(OrderItemBase):
 
 class OrderCreate(BaseModel):
     customer_name: str
-    items: List[OrderItemCreate]
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+
+
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+
+
+class Order(BaseModel):
+    id: int
+    customer_name: str
+    status: OrderStatus
+    created_at: datetime.datetime
+    items: List[OrderItem]
+
+    class Config:
+        from_attributes = True
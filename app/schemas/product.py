@@ -1,7 +1,8 @@
 # app/schemas/product.py
 from decimal import Decimal
+from typing import List, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # Shared properties
@@ -11,6 +12,8 @@ class ProductBase(BaseModel):
     description: str | None = None
     price: Decimal
     quantity_in_stock: int = 0
+    # Low stock alerts fire when quantity_in_stock drops below this
+    reorder_point: int = Field(default=0, ge=0)
 
 
 # Properties to receive on item creation
@@ -21,6 +24,33 @@ class ProductCreate(ProductBase):
 # Properties to return to client
 class Product(ProductBase):
     id: int
+    # Changes on every update; the ETag of GET /products/{id}
+    version: int
 
     class Config:
         from_attributes = True  # This allows Pydantic to read data from ORM models
+
+
+# A product found by GET /products/search; prefix matches have no score
+class ProductSearchHit(Product):
+    score: float | None = None
+
+
+class ReorderPointUpdate(BaseModel):
+    reorder_point: int = Field(ge=0)
+
+
+# Per-item outcome of a bulk create/upsert request
+class ProductBulkItemResult(BaseModel):
+    index: int
+    sku: str | None = None
+    id: int | None = None
+    status: Literal["created", "updated", "error"]
+    error: str | None = None
+
+
+class ProductBulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    items: List[ProductBulkItemResult] = []
@@ -0,0 +1,48 @@
+# app/schemas/report.py
+import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from app.schemas.pagination import Page
+
+
+class PendingOrdersBySupplier(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    pending_orders_count: int
+    updated_at: datetime.datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SupplierStockValuation(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    product_count: int
+    units_in_stock: int
+    total_valuation: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class ProductStockValuation(BaseModel):
+    id: int
+    name: str
+    sku: str
+    supplier_id: int | None = None
+    price: Decimal
+    quantity_in_stock: int
+    valuation: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class StockValuationReport(Page[SupplierStockValuation]):
+    # Over all products, not only the suppliers on this page
+    total_valuation: Decimal
+    # When the figures were computed; null until the first refresh
+    refreshed_at: datetime.datetime | None = None
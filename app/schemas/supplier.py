@@ -1,5 +1,10 @@
+from decimal import Decimal
+from typing import List
+
 from pydantic import BaseModel, EmailStr
 
+from app.schemas.product import Product
+
 
 class SupplierBase(BaseModel):
     name: str
@@ -18,6 +23,16 @@ class SupplierUpdate(SupplierBase):
 
 class Supplier(SupplierBase):
     id: int
+    # Changes on every update of the supplier itself
+    version: int
 
     class Config:
         from_attributes = True
+
+
+# GET /suppliers/{id}, and GET /suppliers/?include=products
+class SupplierDetail(Supplier):
+    product_count: int
+    # Sum of price * quantity_in_stock over the supplier's products
+    stock_value: Decimal
+    products: List[Product] = []
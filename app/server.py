@@ -0,0 +1,77 @@
+# app/server.py
+"""
+Production server entry point.
+
+    python -m app.server
+
+Runs the app under uvicorn with SERVER_WORKERS processes (one per CPU by
+default), uvloop and httptools, without reloading. Workers are spawned
+rather than forked and import the app themselves, so each opens its own
+connection pools (app/db/session.py also resets the pools of any forked
+process). On SIGTERM or SIGINT, workers stop accepting connections, let
+in-flight requests finish for up to SERVER_GRACEFUL_SHUTDOWN_SECONDS, then
+run the app's shutdown, which flushes buffered movements and closes the
+pools.
+
+With several workers, the product cache must be shared (a Redis CACHE_URL),
+or invalidations would only reach the worker that made the write, and the
+Prometheus metrics of all workers are gathered in PROMETHEUS_MULTIPROC_DIR
+(a fresh temporary directory unless set), so that a scrape of any worker
+reports them all.
+
+For development, `python -m app.main` runs a single reloading process.
+"""
+import glob
+import os
+import sys
+import tempfile
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def prepare_multiprocess_metrics() -> None:
+    """
+    Points the workers at an empty PROMETHEUS_MULTIPROC_DIR; they inherit
+    the environment, and must not add up the files of a previous run.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="smart_inventory_metrics_")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def main() -> None:
+    workers = settings.SERVER_WORKERS or os.cpu_count() or 1
+    if workers > 1:
+        if not (settings.CACHE_URL or "").startswith(("redis://", "rediss://")):
+            sys.exit(
+                f"Refusing to start {workers} workers with a per-process product "
+                "cache, which would serve stale products after writes made by "
+                "other workers. Set CACHE_URL to a Redis URL, or SERVER_WORKERS=1."
+            )
+        prepare_multiprocess_metrics()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.APP_HOST,
+        port=settings.APP_PORT,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        lifespan="on",
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        backlog=settings.SERVER_BACKLOG,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# app/worker.py
+"""
+Order fulfillment worker.
+
+    python -m app.worker [--batch-size 200] [--concurrency 1] [--metrics-port 9101]
+    python -m app.worker --exit-when-idle
+
+Takes pending orders through processing to completed, one batch per
+transaction (see `crud_order.fulfill_pending_orders`). Batches are claimed
+with FOR UPDATE SKIP LOCKED, so any number of workers, in as many
+processes or hosts as needed, share the queue without waiting on each other
+or handling an order twice. Each batch runs on its own connection; size
+DB_POOL_SIZE to at least --concurrency.
+
+Throughput is logged every FULFILLMENT_STATS_INTERVAL_SECONDS and, with a
+metrics port, served in the Prometheus text format along with the SQL
+metrics of app.core.metrics. SIGTERM and SIGINT let running batches commit
+before the worker exits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import time
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+from app.core.config import settings
+from app.crud import crud_order
+from app.db.session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+ORDERS_FULFILLED = Counter(
+    "fulfillment_orders_completed",
+    "Orders taken from pending to completed by this worker.",
+)
+BATCH_DURATION = Histogram(
+    "fulfillment_batch_duration_seconds",
+    "Time to claim and complete one batch of orders, empty claims included.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+BATCH_SIZE = Histogram(
+    "fulfillment_batch_orders",
+    "Orders per claimed batch.",
+    buckets=(1, 10, 50, 100, 200, 500, 1000, 5000),
+)
+
+
+class FulfillmentWorker:
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        concurrency: int,
+        idle_seconds: float,
+        exit_when_idle: bool = False,
+    ) -> None:
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.idle_seconds = idle_seconds
+        self.exit_when_idle = exit_when_idle
+        self.stopping = asyncio.Event()
+        self.orders = 0
+        self.batches = 0
+        self.failures = 0
+        self.started_at = time.monotonic()
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    async def _run_batches(self) -> None:
+        while not self.stopping.is_set():
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    completed = await crud_order.fulfill_pending_orders(
+                        db, limit=self.batch_size
+                    )
+            except Exception:
+                self.failures += 1
+                logger.exception("Fulfillment batch failed; its orders stay pending.")
+                completed = None
+            BATCH_DURATION.observe(time.perf_counter() - started)
+            if completed:
+                self.orders += len(completed)
+                self.batches += 1
+                ORDERS_FULFILLED.inc(len(completed))
+                BATCH_SIZE.observe(len(completed))
+                continue
+            if completed is not None and self.exit_when_idle:
+                return
+            # Nothing pending, or the database is failing: back off
+            try:
+                await asyncio.wait_for(self.stopping.wait(), self.idle_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _log_stats(self, interval: float) -> None:
+        last_orders, last_at = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            rate = (self.orders - last_orders) / (now - last_at)
+            logger.info(
+                f"Fulfilled {self.orders} orders in {self.batches} batches "
+                f"({rate:.0f} orders/s over the last {now - last_at:.0f} s, "
+                f"{self.failures} failed batches)."
+            )
+            last_orders, last_at = self.orders, now
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "orders": self.orders,
+            "batches": self.batches,
+            "failures": self.failures,
+            "seconds": round(elapsed, 3),
+            "orders_per_second": round(self.orders / elapsed, 1) if elapsed else None,
+        }
+
+    async def run(self, stats_interval: float) -> dict:
+        self.started_at = time.monotonic()
+        reporter = None
+        if stats_interval > 0:
+            reporter = asyncio.create_task(self._log_stats(stats_interval))
+        try:
+            await asyncio.gather(
+                *(self._run_batches() for _ in range(self.concurrency))
+            )
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            await async_engine.dispose()
+        return self.stats()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    worker = FulfillmentWorker(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        idle_seconds=settings.FULFILLMENT_IDLE_SECONDS,
+        exit_when_idle=args.exit_when_idle,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    return await worker.run(settings.FULFILLMENT_STATS_INTERVAL_SECONDS)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Fulfill pending orders.")
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.FULFILLMENT_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.FULFILLMENT_CONCURRENCY,
+        help="Batches run at once by this process.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.FULFILLMENT_METRICS_PORT,
+        help="Serve Prometheus metrics on this port (0: do not).",
+    )
+    parser.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="Exit once no order is pending, printing the totals as JSON.",
+    )
+    args = parser.parse_args()
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    stats = asyncio.run(run(args))
+    logger.info(f"Stopped: {stats}")
+    if args.exit_when_idle:
+        print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
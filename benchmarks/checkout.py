@@ -0,0 +1,133 @@
+# benchmarks/checkout.py
+"""
+Concurrent checkout benchmark for POST /orders/.
+
+Creates a handful of "hot" products, then places orders against them from
+many concurrent clients, and reports throughput, latency percentiles and
+whether stock stayed consistent (no overselling, no lost updates).
+
+    python -m benchmarks.checkout --concurrency 200 --orders 5000
+    python -m benchmarks.checkout --base-url http://127.0.0.1:8000
+
+Without --base-url the app is driven in-process through ASGI.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+
+    async with client:
+        run_id = uuid.uuid4().hex[:8]
+        response = await client.post(
+            "/products/bulk",
+            json=[
+                {
+                    "sku": f"BENCH-HOT-{run_id}-{i}",
+                    "name": f"Hot product {i}",
+                    "price": "9.99",
+                    "quantity_in_stock": args.stock,
+                }
+                for i in range(args.skus)
+            ],
+        )
+        response.raise_for_status()
+        product_ids = [item["id"] for item in response.json()["items"]]
+
+        rng = random.Random(args.seed)
+        orders = [
+            [
+                {"product_id": product_id, "quantity": rng.randint(1, 3)}
+                for product_id in rng.sample(
+                    product_ids, rng.randint(1, min(3, len(product_ids)))
+                )
+            ]
+            for _ in range(args.orders)
+        ]
+
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        sold: Counter = Counter()
+        queue: asyncio.Queue = asyncio.Queue()
+        for items in orders:
+            queue.put_nowait(items)
+
+        async def client_loop() -> None:
+            while not queue.empty():
+                items = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post(
+                    "/orders/", json={"customer_name": "bench", "items": items}
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+                if response.status_code == 201:
+                    for item in items:
+                        sold[item["product_id"]] += item["quantity"]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        consistent = True
+        for product_id in product_ids:
+            stock = (await client.get(f"/products/{product_id}/stock")).json()
+            expected = args.stock - sold[product_id]
+            if stock["quantity_in_stock"] != expected or expected < 0:
+                consistent = False
+
+    return {
+        "orders": args.orders,
+        "concurrency": args.concurrency,
+        "hot_skus": args.skus,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(args.orders / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+        },
+        "status_codes": dict(statuses),
+        "stock_consistent": consistent,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent checkouts.")
+    parser.add_argument("--base-url", default=None, help="Running API to target.")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--skus", type=int, default=5, help="Number of hot SKUs.")
+    parser.add_argument("--stock", type=int, default=10_000, help="Stock per SKU.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/crud_lookup.py
+"""
+Python overhead per call of the primary-key and batched product lookups.
+
+    python -m benchmarks.crud_lookup [--calls 5000] [--batch 100]
+
+Compares, against the database in .env:
+
+- built: a select() constructed on every call, as the CRUD layer did
+  before, ending in .first() for single rows and IN (...) for batches.
+- cached: the prebuilt statements of crud_product (GET_PRODUCT_DATA,
+  GET_PRODUCTS with = ANY(:ids)) and Session.get.
+
+`construct` only builds a statement and computes the compiled-cache key
+SQLAlchemy looks it up with, without touching the database. The other
+cases run the lookup; `get_loaded` reads a product already in the
+session's identity map, which Session.get answers without SQL. Times are
+process CPU per call, which leaves out the time PostgreSQL spends.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+
+from app.crud import crud_product
+from app.crud.crud_product import GET_PRODUCT_DATA, PRODUCT_COLUMNS
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.product import Product
+
+
+def cpu_per_call(func: Callable[[], object], calls: int) -> float:
+    started = time.process_time()
+    for _ in range(calls):
+        func()
+    return (time.process_time() - started) / calls * 1e6
+
+
+async def async_cpu_per_call(func: Callable[[], Awaitable], calls: int) -> dict:
+    # Warm up prepared statements and the compiled cache first
+    for _ in range(max(1, calls // 10)):
+        await func()
+    cpu = []
+    for _ in range(calls):
+        started = time.process_time()
+        await func()
+        cpu.append(time.process_time() - started)
+    return {
+        "cpu_us_mean": round(statistics.fmean(cpu) * 1e6, 1),
+        "cpu_us_median": round(statistics.median(cpu) * 1e6, 1),
+    }
+
+
+def compare(built: dict, cached: dict) -> dict:
+    return {
+        "built": built,
+        "cached": cached,
+        "speedup": round(built["cpu_us_mean"] / cached["cpu_us_mean"], 2),
+    }
+
+
+async def run(calls: int, batch: int) -> dict:
+    async with async_engine.connect() as connection:
+        ids = list(
+            (await connection.execute(select(Product.id).limit(batch))).scalars()
+        )
+    if not ids:
+        raise RuntimeError("No products to read; seed the database first.")
+    product_id = ids[0]
+
+    results = {
+        "construct": compare(
+            {
+                "cpu_us_mean": round(
+                    cpu_per_call(
+                        lambda: select(*PRODUCT_COLUMNS)
+                        .where(Product.id == product_id)
+                        ._generate_cache_key(),
+                        calls,
+                    ),
+                    2,
+                )
+            },
+            {
+                "cpu_us_mean": round(
+                    cpu_per_call(GET_PRODUCT_DATA._generate_cache_key, calls), 2
+                )
+            },
+        )
+    }
+
+    async with AsyncSessionLocal() as db:
+
+        async def data_built():
+            result = await db.execute(
+                select(*PRODUCT_COLUMNS).where(Product.id == product_id)
+            )
+            result.first()
+
+        async def get_built():
+            result = await db.execute(select(Product).where(Product.id == product_id))
+            result.scalars().first()
+
+        async def get_unloaded():
+            db.expunge_all()
+            await crud_product.get_product(db, product_id)
+
+        async def many_built():
+            result = await db.execute(select(Product).where(Product.id.in_(ids)))
+            list(result.scalars())
+
+        results["data"] = compare(
+            await async_cpu_per_call(data_built, calls),
+            await async_cpu_per_call(
+                lambda: crud_product.get_product_data(db, product_id), calls
+            ),
+        )
+        results["get"] = compare(
+            await async_cpu_per_call(get_built, calls),
+            await async_cpu_per_call(get_unloaded, calls),
+        )
+        await crud_product.get_product(db, product_id)
+        results["get_loaded"] = compare(
+            await async_cpu_per_call(get_built, calls),
+            await async_cpu_per_call(
+                lambda: crud_product.get_product(db, product_id), calls
+            ),
+        )
+        results[f"many_{len(ids)}"] = compare(
+            await async_cpu_per_call(many_built, calls // 10),
+            await async_cpu_per_call(
+                lambda: crud_product.get_products(db, ids), calls // 10
+            ),
+        )
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=100, help="Ids per batch.")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.calls, args.batch)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/fulfillment.py
+"""
+Scaling of the order fulfillment worker (app/worker.py) with its number of
+processes.
+
+    python -m benchmarks.fulfillment [--orders 20000] [--processes 1 2 4 8]
+
+For every process count, adds --orders pending orders of one item each to
+the database in .env (on top of any already pending), then starts that many
+`python -m app.worker --exit-when-idle` processes and times them until the
+queue is empty. Reports throughput and the speedup over the first process
+count, and fails if the workers completed more or fewer orders than were
+pending, which would mean an order was handled twice or left behind.
+
+The orders are inserted directly, without reserving stock, and the pending
+orders report is rebuilt afterwards; run it against a benchmark database.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+INSERT_ORDERS_SQL = text(
+    """
+    WITH products AS (
+        SELECT array_agg(id) AS ids FROM product
+    ),
+    new_orders AS (
+        INSERT INTO "order" (customer_name, status)
+        SELECT 'Fulfillment benchmark', 'PENDING'
+        FROM generate_series(1, :orders)
+        RETURNING id
+    )
+    INSERT INTO order_items (order_id, product_id, quantity)
+    SELECT o.id, p.ids[1 + o.id % cardinality(p.ids)], 1
+    FROM new_orders o, products p
+    """
+)
+PENDING_SQL = text("""SELECT count(*) FROM "order" WHERE status = 'PENDING'""")
+
+
+def run_workers(processes: int, batch_size: int) -> tuple[float, int]:
+    """
+    Runs the workers until the queue is empty. Returns the seconds the
+    slowest one spent working, leaving out interpreter startup, and the
+    orders they completed together.
+    """
+    env = {**os.environ, "FULFILLMENT_STATS_INTERVAL_SECONDS": "0"}
+    command = [
+        sys.executable,
+        "-m",
+        "app.worker",
+        "--exit-when-idle",
+        f"--batch-size={batch_size}",
+    ]
+    workers = [
+        subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE)
+        for _ in range(processes)
+    ]
+    seconds, completed = 0.0, 0
+    for worker in workers:
+        stdout, _ = worker.communicate()
+        if worker.returncode:
+            raise RuntimeError(f"A worker exited with status {worker.returncode}.")
+        stats = json.loads(stdout.decode().strip().splitlines()[-1])
+        seconds = max(seconds, stats["seconds"])
+        completed += stats["orders"]
+    return seconds, completed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.FULFILLMENT_BATCH_SIZE
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL)
+    results = {}
+    base_rate = None
+    ok = True
+    for processes in args.processes:
+        with engine.begin() as connection:
+            connection.execute(INSERT_ORDERS_SQL, {"orders": args.orders})
+        subprocess.run(
+            [sys.executable, "-m", "scripts.maintenance", "rebuild-pending-orders"],
+            cwd=ROOT_DIR,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with engine.connect() as connection:
+            pending = connection.scalar(PENDING_SQL)
+
+        seconds, completed = run_workers(processes, args.batch_size)
+        with engine.connect() as connection:
+            left = connection.scalar(PENDING_SQL)
+        rate = completed / seconds
+        base_rate = base_rate or rate
+        results[processes] = {
+            "pending": pending,
+            "completed": completed,
+            "left_pending": left,
+            "seconds": round(seconds, 2),
+            "orders_per_second": round(rate, 1),
+            "speedup": round(rate / base_rate, 2),
+        }
+        if completed != pending or left:
+            ok = False
+    engine.dispose()
+    print(json.dumps(results, indent=2))
+    if not ok:
+        print("Completed orders do not match the pending ones.", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
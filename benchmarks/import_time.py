@@ -0,0 +1,105 @@
+# benchmarks/import_time.py
+"""
+Cold-start import budget.
+
+    python -m benchmarks.import_time [--budget-ms 1500] [--runs 5]
+
+Imports app.main in fresh interpreters under `python -X importtime` and
+fails if the fastest run took longer than --budget-ms, or if a development
+or seeding dependency (Faker, tqdm, ...) was imported at all: the app must
+not need them, and they slow down every worker start. The first run, which
+may have to write bytecode caches, is not counted.
+
+Prints the slowest top-level imports, which is where to look when the
+budget is exceeded. tests/test_import_time.py checks the same budget.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+BUDGET_MS = 1500
+
+# Packages only scripts/ and the tooling use
+FORBIDDEN_MODULES = (
+    "faker",
+    "faker_commerce",
+    "tqdm",
+    "alembic",
+    "black",
+    "isort",
+    "mypy",
+    "httpx",
+)
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """
+    (module, depth, cumulative microseconds) of every module imported by
+    `import module` in a fresh interpreter, in the order -X importtime
+    reports them.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(cumulative)))
+    return entries
+
+
+def total_ms(entries: list[tuple[str, int, int]]) -> float:
+    # Top-level entries (depth 0) add up to the whole import
+    return sum(us for _, depth, us in entries if depth == 0) / 1000
+
+
+def forbidden_imports(entries: list[tuple[str, int, int]]) -> list[str]:
+    imported = {name.split(".")[0] for name, _, _ in entries}
+    return [module for module in FORBIDDEN_MODULES if module in imported]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    import_times(args.module)
+    runs = [import_times(args.module) for _ in range(max(1, args.runs))]
+    fastest = min(runs, key=total_ms)
+    fastest_ms = total_ms(fastest)
+
+    print(f"import {args.module}: {fastest_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    top_level = sorted(
+        (entry for entry in fastest if entry[1] == 0), key=lambda e: -e[2]
+    )
+    for name, _, us in top_level[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if fastest_ms > args.budget_ms:
+        failures.append(
+            f"Import took {fastest_ms:.0f} ms, over {args.budget_ms:.0f} ms."
+        )
+    for module in forbidden_imports(fastest):
+        failures.append(f"{module} is imported by {args.module}.")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
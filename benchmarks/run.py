@@ -0,0 +1,378 @@
+# benchmarks/run.py
+"""
+HTTP load benchmarks.
+
+    python -m benchmarks.run --scale small --seed 42
+    python -m benchmarks.run --skip-seed --scenario product-read --concurrency 32
+    python -m benchmarks.run --scale small --write-baseline
+
+Seeds the database configured in .env through scripts/seed.py (bulk mode,
+so a given --scale, --seed and --as-of always produce the same data),
+boots the app with uvicorn, then runs each scenario of
+benchmarks/scenarios.py as a closed loop: --concurrency clients each send
+their next request as soon as the previous one is answered. Throughput and
+latency percentiles are written to --output as JSON.
+
+When a baseline exists (by default benchmarks/baselines/<scale>.json), every
+scenario is compared with it, and the run fails if p50 or p95 latency grew
+or throughput dropped by more than --threshold. Baselines are only
+meaningful on the machine that recorded them; record your own with
+--write-baseline before comparing changes.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+# One line per request otherwise
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCHMARKS_DIR.parent
+
+# Keeps scheduled jobs from running in the middle of a measurement
+APP_ENV = {
+    "LEDGER_SNAPSHOT_INTERVAL_SECONDS": "0",
+    "STOCK_VALUATION_REFRESH_INTERVAL_SECONDS": "0",
+    "PARTITION_MAINTENANCE_INTERVAL_SECONDS": "0",
+    "SLOW_REQUEST_THRESHOLD_MS": "0",
+}
+
+COMPARED_METRICS = (
+    # (metric, True if higher is better)
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("throughput_rps", True),
+)
+
+
+def run_module(*args: str) -> None:
+    subprocess.run([sys.executable, "-m", *args], cwd=ROOT_DIR, check=True)
+
+
+def seed(scale: str, seed_value: int, as_of: datetime.date) -> None:
+    logger.info(f"Seeding the '{scale}' dataset (seed {seed_value}, as of {as_of})...")
+    run_module(
+        "scripts.seed",
+        "--clean",
+        "--bulk",
+        f"--scale={scale}",
+        f"--seed={seed_value}",
+        f"--as-of={as_of.isoformat()}",
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def start_app(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host=127.0.0.1",
+            f"--port={port}",
+            "--log-level=warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT_DIR,
+        env={**os.environ, **APP_ENV},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The app exited during startup.")
+        try:
+            # Ready once the worker warmed up, see app/db/warmup.py
+            response = httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=1)
+            response.raise_for_status()
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The app did not start within 30 seconds.")
+
+
+async def drive(
+    base_url: str,
+    scenario: Scenario,
+    *,
+    requests: int,
+    warmup: int,
+    concurrency: int,
+    seed_value: int,
+) -> dict:
+    rng = random.Random(f"{seed_value}:{scenario.name}")
+    planned = [scenario.build(scenario, rng, n) for n in range(warmup + requests)]
+    latencies: list[float] = []
+    errors = 0
+    statuses: dict[str, int] = {}
+    next_request = 0
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+
+        async def worker(until: int, record: bool) -> None:
+            nonlocal next_request, errors
+            while next_request < until:
+                request = planned[next_request]
+                next_request += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        request.method,
+                        request.url,
+                        params=request.params,
+                        json=request.json,
+                    )
+                    status = str(response.status_code)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                    failed = True
+                elapsed = time.perf_counter() - started
+                if record:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    errors += failed
+
+        await asyncio.gather(*(worker(warmup, False) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(warmup + requests, True) for _ in range(concurrency))
+        )
+        duration = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "description": scenario.description,
+        "requests": requests,
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 1),
+        "mean_ms": round(float(np.mean(latencies)) * 1000, 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def environment(engine) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with engine.connect() as connection:
+        postgres = connection.execute(text("SHOW server_version")).scalar()
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "postgres": postgres,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns one message per metric that regressed by more than `threshold`.
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            logger.info(f"{name}: no baseline")
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            change = current[metric] / previous[metric] - 1 if previous[metric] else 0
+            regressed = -change > threshold if higher_is_better else change > threshold
+            logger.info(
+                f"{name:24} {metric:15} {previous[metric]:>10} -> "
+                f"{current[metric]:>10} ({change:+.1%}){'  REGRESSION' if regressed else ''}"
+            )
+            if regressed:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HTTP load benchmarks.")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeat for several. Defaults to all of them.",
+    )
+    parser.add_argument("--scale", default="small", help="scripts/seed.py --scale.")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset and RNG seed.")
+    parser.add_argument(
+        "--as-of",
+        type=datetime.date.fromisoformat,
+        default=datetime.date.today(),
+        help="Date (YYYY-MM-DD) the seeded timestamps are relative to.",
+    )
+    parser.add_argument(
+        "--skip-seed",
+        action="store_true",
+        help="Benchmark the data already in the database.",
+    )
+    parser.add_argument(
+        "--url",
+        help="Benchmark an app that is already running instead of starting one.",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=None,
+        help="Measured requests per scenario, instead of each scenario's default.",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=None,
+        help="Unmeasured requests per scenario first (default: a tenth).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=BENCHMARKS_DIR / "results" / "latest.json",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Results to compare with (default: benchmarks/baselines/<scale>.json).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative change counted as a regression.",
+    )
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="Save the results as the baseline instead of comparing with it.",
+    )
+    args = parser.parse_args()
+    baseline_path = args.baseline or BENCHMARKS_DIR / "baselines" / f"{args.scale}.json"
+
+    if not args.skip_seed:
+        seed(args.scale, args.seed, args.as_of)
+
+    engine = create_engine(settings.DATABASE_URL)
+    process = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        port = free_port()
+        process = start_app(port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    results = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "config": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "as_of": args.as_of.isoformat(),
+            "seeded": not args.skip_seed,
+            "concurrency": args.concurrency,
+        },
+        "environment": environment(engine),
+        "scenarios": {},
+    }
+    try:
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            for name in args.scenario or list(SCENARIOS):
+                scenario = SCENARIOS[name]
+                if scenario.setup is not None:
+                    scenario.setup(scenario, engine, client)
+                requests = args.requests or scenario.requests
+                result = asyncio.run(
+                    drive(
+                        base_url,
+                        scenario,
+                        requests=requests,
+                        warmup=(
+                            args.warmup if args.warmup is not None else requests // 10
+                        ),
+                        concurrency=args.concurrency,
+                        seed_value=args.seed,
+                    )
+                )
+                results["scenarios"][name] = result
+                logger.info(
+                    f"{name:24} {result['throughput_rps']:>8} req/s  "
+                    f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                    f"p99 {result['p99_ms']:>8} ms  errors {result['errors']}"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        engine.dispose()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    logger.info(f"Wrote {args.output}")
+
+    failed = any(result["errors"] for result in results["scenarios"].values())
+    if failed:
+        logger.error("Some requests failed; see the status counts in the results.")
+
+    if args.write_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        logger.info(f"Wrote baseline {baseline_path}")
+    elif baseline_path.exists():
+        regressions = compare(
+            results, json.loads(baseline_path.read_text()), args.threshold
+        )
+        if regressions:
+            logger.error("Regressions: " + ", ".join(regressions))
+            failed = True
+    else:
+        logger.info(f"No baseline at {baseline_path}; nothing to compare with.")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# benchmarks/scenarios.py
+"""
+Request mixes driven by benchmarks/run.py.
+
+A scenario turns a request number into one HTTP request. Its `setup` runs
+once against the seeded database before the clock starts, to collect what
+the requests need (existing ids, page cursors). Requests are drawn from an
+RNG seeded per scenario, so every run sends the same requests.
+"""
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+@dataclass(frozen=True)
+class Request:
+    method: str
+    url: str
+    params: dict[str, Any] | None = None
+    json: Any = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    # Requests per run, unless --requests overrides it
+    requests: int
+    build: Callable[["Scenario", random.Random, int], Request]
+    setup: Callable[["Scenario", Engine, httpx.Client], None] | None = None
+    state: dict[str, Any] = field(default_factory=dict)
+
+
+def _load_product_ids(scenario: Scenario, engine: Engine, client: httpx.Client):
+    with engine.connect() as connection:
+        scenario.state["ids"] = list(
+            connection.execute(text("SELECT id FROM product ORDER BY id")).scalars()
+        )
+    if not scenario.state["ids"]:
+        raise RuntimeError("No products to read; seed the database first.")
+
+
+def _product_read(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    return Request("GET", f"/products/{rng.choice(scenario.state['ids'])}")
+
+
+def _load_supplier_cursors(scenario: Scenario, engine: Engine, client: httpx.Client):
+    # Walks the listing once, so that requests hit pages at every depth
+    cursors: list[str | None] = [None]
+    while len(cursors) < 200:
+        params: dict[str, str | int] = {"limit": 50}
+        if cursors[-1] is not None:
+            params["cursor"] = cursors[-1]
+        response = client.get("/suppliers/", params=params)
+        response.raise_for_status()
+        next_cursor = response.json()["next_cursor"]
+        if next_cursor is None:
+            break
+        cursors.append(next_cursor)
+    scenario.state["cursors"] = cursors
+
+
+def _supplier_list(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    params = {"limit": 50}
+    cursor = rng.choice(scenario.state["cursors"])
+    if cursor is not None:
+        params["cursor"] = cursor
+    return Request("GET", "/suppliers/", params=params)
+
+
+def _load_supplier_ids(scenario: Scenario, engine: Engine, client: httpx.Client):
+    with engine.connect() as connection:
+        scenario.state["ids"] = list(
+            connection.execute(text("SELECT id FROM supplier ORDER BY id")).scalars()
+        )
+    if not scenario.state["ids"]:
+        raise RuntimeError("No suppliers to read; seed the database first.")
+
+
+def _supplier_detail(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    return Request("GET", f"/suppliers/{rng.choice(scenario.state['ids'])}")
+
+
+def _product_create(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    # SKUs must be unique across runs against the same database
+    run_id = scenario.state.setdefault("run_id", uuid.uuid4().hex[:12])
+    return Request(
+        "POST",
+        "/products/",
+        json={
+            "sku": f"BENCH-{run_id}-{n}",
+            "name": f"Benchmark product {n}",
+            "price": str(round(rng.uniform(1, 500), 2)),
+            "quantity_in_stock": rng.randint(0, 500),
+        },
+    )
+
+
+def _load_name_words(scenario: Scenario, engine: Engine, client: httpx.Client):
+    with engine.connect() as connection:
+        scenario.state["words"] = list(
+            connection.execute(
+                text(
+                    "SELECT DISTINCT lower(split_part(name, ' ', 1)) FROM product "
+                    "ORDER BY 1 LIMIT 500"
+                )
+            ).scalars()
+        )
+    if not scenario.state["words"]:
+        raise RuntimeError("No products to search; seed the database first.")
+
+
+def _product_search(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    words = rng.sample(scenario.state["words"], min(2, len(scenario.state["words"])))
+    # One word, two words, or a word with a typo in its last letter
+    q = rng.choice([words[0], " ".join(words), words[0][:-1] + "x"])
+    return Request("GET", "/products/search", params={"q": q, "limit": 20})
+
+
+def _wait_for_autocomplete(scenario: Scenario, engine: Engine, client: httpx.Client):
+    _load_name_words(scenario, engine, client)
+    # Measure the in-memory index, not the fallback used while it loads
+    deadline = time.monotonic() + 120
+    while not client.get("/maintenance/autocomplete/stats").json()["products"]["ready"]:
+        if time.monotonic() > deadline:
+            raise RuntimeError("The product autocomplete index did not load.")
+        time.sleep(0.5)
+
+
+def _product_autocomplete(scenario: Scenario, rng: random.Random, n: int) -> Request:
+    word = rng.choice(scenario.state["words"])
+    # What a picker sends as the user types the first letters
+    q = word[: rng.randint(1, max(1, len(word)))]
+    return Request(
+        "GET", "/products/search", params={"q": q, "mode": "prefix", "limit": 10}
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            "product-read",
+            "GET /products/{id} for random existing products",
+            requests=2000,
+            build=_product_read,
+            setup=_load_product_ids,
+        ),
+        Scenario(
+            "supplier-list",
+            "GET /suppliers/ pages of 50 at random depths",
+            requests=1000,
+            build=_supplier_list,
+            setup=_load_supplier_cursors,
+        ),
+        Scenario(
+            "supplier-list-products",
+            "GET /suppliers/?include=products, first page of 50 with products",
+            requests=200,
+            build=lambda scenario, rng, n: Request(
+                "GET", "/suppliers/", params={"limit": 50, "include": "products"}
+            ),
+        ),
+        Scenario(
+            "supplier-detail",
+            "GET /suppliers/{id} with products for random existing suppliers",
+            requests=1000,
+            build=_supplier_detail,
+            setup=_load_supplier_ids,
+        ),
+        Scenario(
+            "product-search",
+            "GET /products/search, ranked full-text and trigram matches",
+            requests=500,
+            build=_product_search,
+            setup=_load_name_words,
+        ),
+        Scenario(
+            "product-autocomplete",
+            "GET /products/search?mode=prefix, name prefixes of 1 or more letters",
+            requests=2000,
+            build=_product_autocomplete,
+            setup=_wait_for_autocomplete,
+        ),
+        Scenario(
+            "product-create",
+            "POST /products/ with new SKUs",
+            requests=500,
+            build=_product_create,
+        ),
+        Scenario(
+            "partition-maintenance",
+            "POST /maintenance/partitions/inventory/maintain",
+            requests=50,
+            build=lambda scenario, rng, n: Request(
+                "POST", "/maintenance/partitions/inventory/maintain"
+            ),
+        ),
+        Scenario(
+            "pending-orders-report",
+            "GET /reports/pending-orders",
+            requests=500,
+            build=lambda scenario, rng, n: Request("GET", "/reports/pending-orders"),
+        ),
+        Scenario(
+            "stock-valuation-report",
+            "GET /reports/stock-valuation, first page of 50 suppliers",
+            requests=500,
+            build=lambda scenario, rng, n: Request(
+                "GET", "/reports/stock-valuation?limit=50"
+            ),
+        ),
+        Scenario(
+            "velocity-report",
+            "GET /analytics/velocity, 50 most urgent products",
+            requests=100,
+            build=lambda scenario, rng, n: Request(
+                "GET", "/analytics/velocity?limit=50"
+            ),
+        ),
+    ]
+}
@@ -0,0 +1,453 @@
+# scripts/bulk_seed.py
+"""
+Bulk seeding mode for scripts/seed.py.
+
+Rows are generated in worker processes and streamed into PostgreSQL with
+COPY instead of going through the ORM. IDs are taken from blocks reserved up
+front on each table's sequence, so workers never need to read anything back.
+Inventory movements are copied into the partitioned parent table, which routes
+each row to the partition of its period; the partitions must exist already.
+
+Every chunk of work is generated from its own RNG, seeded from the global
+``--seed``, the phase name and the chunk number. The generated dataset is
+therefore identical for a given seed, scale and ``--as-of`` date, no matter
+how many workers are used.
+"""
+
+import csv
+import datetime
+import io
+import logging
+import math
+import multiprocessing
+import random
+from dataclasses import dataclass
+
+from faker import Faker
+from faker_commerce import Provider as CommerceProvider  # type: ignore[import-untyped]
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+from tqdm import tqdm  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+
+# Named dataset sizes for --scale. Explicit --suppliers/--products/--orders
+# arguments override the profile values.
+SCALE_PROFILES: dict[str, dict[str, int]] = {
+    "small": {"suppliers": 50, "products": 500, "orders": 2_000},
+    "medium": {"suppliers": 500, "products": 50_000, "orders": 200_000},
+    "large": {"suppliers": 5_000, "products": 500_000, "orders": 3_000_000},
+}
+
+# Upper bound on items per order; used to pre-allocate order item and sale
+# movement ID slots without knowing how many items each order will get.
+MAX_ITEMS_PER_ORDER = 5
+
+ORDER_STATUSES = ("PENDING", "COMPLETED", "CANCELLED")
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    """
+    Everything a worker needs to generate its chunk deterministically.
+    """
+
+    seed: int
+    as_of: datetime.datetime
+    chunk_size: int
+    supplier_first_id: int
+    num_suppliers: int
+    product_first_id: int
+    num_products: int
+    order_first_id: int
+    num_orders: int
+    order_chunk_size: int
+    order_item_first_id: int
+    movement_first_id: int
+
+    def num_chunks(self, count: int, chunk_size: int | None = None) -> int:
+        return math.ceil(count / (chunk_size or self.chunk_size))
+
+
+# --- Helpers shared by the parent and the workers ---
+
+
+def _chunk_rng(plan: SeedPlan, phase: str, chunk: int) -> random.Random:
+    return random.Random(f"{plan.seed}:{phase}:{chunk}")
+
+
+def _initial_stock(seed: int, product_id: int) -> int:
+    """
+    Initial stock of a product; a pure function of the seed and the ID so the
+    order workers can rebuild it without reading the product table.
+    """
+    return random.Random(f"{seed}:stock:{product_id}").randint(50, 500)
+
+
+def _ean13(number: int) -> str:
+    """
+    Builds a valid EAN-13 code from a product ID, which keeps SKUs unique
+    across workers without a shared `fake.unique` state.
+    """
+    body = f"20{number:010d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body))
+    return body + str((10 - total % 10) % 10)
+
+
+def _copy_rows(
+    connection: Connection, table: str, columns: tuple[str, ...], rows: list
+) -> None:
+    if not rows:
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+MOVEMENT_COLUMNS = (
+    "id",
+    "product_id",
+    "quantity_changed",
+    "movement_type",
+    "timestamp",
+)
+
+
+def _copy_movements(connection: Connection, movements: list) -> None:
+    _copy_rows(connection, "inventory_movement", MOVEMENT_COLUMNS, movements)
+
+
+# --- Worker side ---
+
+_worker_engine: Engine | None = None
+_worker_fake: Faker | None = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_engine, _worker_fake
+    # Each worker gets its own connection; nothing is shared with the parent.
+    _worker_engine = create_engine(database_url, poolclass=NullPool)
+    _worker_fake = Faker()
+    _worker_fake.add_provider(CommerceProvider)
+
+
+def _seeded_fake(plan: SeedPlan, phase: str, chunk: int) -> Faker:
+    assert _worker_fake is not None
+    _worker_fake.seed_instance(f"{plan.seed}:{phase}:faker:{chunk}")
+    # faker_commerce draws from the global `random` module rather than the
+    # Faker instance, so it has to be seeded as well
+    random.seed(f"{plan.seed}:{phase}:global:{chunk}")
+    return _worker_fake
+
+
+def _seed_supplier_chunk(args: tuple[SeedPlan, int]) -> int:
+    plan, chunk = args
+    fake = _seeded_fake(plan, "suppliers", chunk)
+    start = chunk * plan.chunk_size
+    stop = min(start + plan.chunk_size, plan.num_suppliers)
+
+    rows = []
+    for offset in range(start, stop):
+        supplier_id = plan.supplier_first_id + offset
+        rows.append(
+            (
+                supplier_id,
+                fake.company(),
+                fake.name(),
+                f"{fake.user_name()}.{supplier_id}@{fake.free_email_domain()}",
+                fake.phone_number(),
+            )
+        )
+
+    assert _worker_engine is not None
+    with _worker_engine.begin() as connection:
+        _copy_rows(
+            connection,
+            "supplier",
+            ("id", "name", "contact_person", "email", "phone"),
+            rows,
+        )
+    return len(rows)
+
+
+def _seed_product_chunk(args: tuple[SeedPlan, int]) -> int:
+    plan, chunk = args
+    rng = _chunk_rng(plan, "products", chunk)
+    fake = _seeded_fake(plan, "products", chunk)
+    start = chunk * plan.chunk_size
+    stop = min(start + plan.chunk_size, plan.num_products)
+    restock_window_start = plan.as_of - datetime.timedelta(days=730)
+
+    products = []
+    movements = []
+    for offset in range(start, stop):
+        product_id = plan.product_first_id + offset
+        initial_stock = _initial_stock(plan.seed, product_id)
+        products.append(
+            (
+                product_id,
+                _ean13(product_id),
+                fake.ecommerce_name(),
+                fake.sentence(),
+                f"{rng.uniform(10.99, 999.99):.2f}",
+                initial_stock,
+                plan.supplier_first_id + rng.randrange(plan.num_suppliers),
+            )
+        )
+        # The initial "restock" movement, one to two years before --as-of
+        movements.append(
+            (
+                plan.movement_first_id + offset,
+                product_id,
+                initial_stock,
+                "restock",
+                restock_window_start
+                + datetime.timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+            )
+        )
+
+    assert _worker_engine is not None
+    with _worker_engine.begin() as connection:
+        _copy_rows(
+            connection,
+            "product",
+            (
+                "id",
+                "sku",
+                "name",
+                "description",
+                "price",
+                "quantity_in_stock",
+                "supplier_id",
+            ),
+            products,
+        )
+        _copy_movements(connection, movements)
+    return len(products)
+
+
+def _seed_order_chunk(args: tuple[SeedPlan, int]) -> int:
+    """
+    Each order chunk only sells from its own contiguous shard of products, so
+    it can track stock locally and never oversell, with no coordination
+    between workers.
+    """
+    plan, chunk = args
+    rng = _chunk_rng(plan, "orders", chunk)
+    fake = _seeded_fake(plan, "orders", chunk)
+    start = chunk * plan.order_chunk_size
+    stop = min(start + plan.order_chunk_size, plan.num_orders)
+
+    num_chunks = plan.num_chunks(plan.num_orders, plan.order_chunk_size)
+    shard_start = plan.product_first_id + chunk * plan.num_products // num_chunks
+    shard_stop = plan.product_first_id + (chunk + 1) * plan.num_products // num_chunks
+    stock = {
+        product_id: _initial_stock(plan.seed, product_id)
+        for product_id in range(shard_start, shard_stop)
+    }
+
+    year_start = plan.as_of.replace(month=1, day=1)
+    window_seconds = max(int((plan.as_of - year_start).total_seconds()), 24 * 3600)
+
+    orders = []
+    items = []
+    movements = []
+    for offset in range(start, stop):
+        order_id = plan.order_first_id + offset
+        created_at = year_start + datetime.timedelta(
+            seconds=rng.randrange(window_seconds)
+        )
+        orders.append((order_id, fake.name(), rng.choice(ORDER_STATUSES), created_at))
+
+        # Each order will have 1 to 5 items
+        for slot_in_order in range(rng.randint(1, MAX_ITEMS_PER_ORDER)):
+            product_id = rng.randrange(shard_start, shard_stop)
+            quantity = rng.randint(1, 5)
+            # Only create the order item if there is enough stock
+            if stock[product_id] < quantity:
+                continue
+            stock[product_id] -= quantity
+            slot = offset * MAX_ITEMS_PER_ORDER + slot_in_order
+            items.append(
+                (plan.order_item_first_id + slot, order_id, product_id, quantity)
+            )
+            movements.append(
+                (
+                    plan.movement_first_id + plan.num_products + slot,
+                    product_id,
+                    -quantity,
+                    "sale",
+                    created_at,
+                )
+            )
+
+    assert _worker_engine is not None
+    with _worker_engine.begin() as connection:
+        _copy_rows(
+            connection,
+            '"order"',
+            ("id", "customer_name", "status", "created_at"),
+            orders,
+        )
+        _copy_rows(
+            connection,
+            "order_items",
+            ("id", "order_id", "product_id", "quantity"),
+            items,
+        )
+        _copy_movements(connection, movements)
+    return len(orders)
+
+
+# --- Parent side ---
+
+
+def _reserve_ids(connection: Connection, table: str, count: int) -> int:
+    """
+    Reserves a block of `count` IDs from the table's serial sequence and
+    returns the first one. Must run while the table is locked, so that no
+    concurrent insert can draw a value from the middle of the block.
+    """
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}
+    ).scalar_one()
+    first_id = connection.execute(
+        text("SELECT nextval(:sequence)"), {"sequence": sequence}
+    ).scalar_one()
+    if count > 1:
+        connection.execute(
+            text("SELECT setval(:sequence, :last_id)"),
+            {"sequence": sequence, "last_id": first_id + count - 1},
+        )
+    return int(first_id)
+
+
+def truncate_all(engine: Engine) -> None:
+    """
+    Empties every seeded table and restarts their sequences, so that a
+    re-run with the same --seed reproduces the same IDs as well.
+    """
+    logger.warning("Truncating all seeded tables...")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "TRUNCATE inventory_movement, movement_daily_rollup, stock_snapshot, "
+                'supplier_pending_orders, order_items, "order", product, supplier, '
+                "product_search_change RESTART IDENTITY"
+            )
+        )
+
+
+def bulk_seed(
+    engine: Engine,
+    *,
+    database_url: str,
+    num_suppliers: int,
+    num_products: int,
+    num_orders: int,
+    seed: int,
+    as_of: datetime.date,
+    workers: int,
+    chunk_size: int,
+) -> None:
+    """
+    Seeds the database through parallel COPY streams. Movements are dated
+    from two years before `as_of` up to it, and the partitions for those
+    periods must already exist.
+    """
+    if num_suppliers < 1 or num_products < 1:
+        logger.error("Bulk seeding needs at least one supplier and one product.")
+        return
+
+    as_of_dt = datetime.datetime.combine(as_of, datetime.time(), datetime.timezone.utc)
+    # Never give an order chunk an empty product shard
+    order_chunk_size = max(chunk_size, math.ceil(num_orders / num_products))
+
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                'LOCK TABLE supplier, product, "order", order_items, inventory_movement '
+                "IN EXCLUSIVE MODE"
+            )
+        )
+        max_slots = num_orders * MAX_ITEMS_PER_ORDER
+        plan = SeedPlan(
+            seed=seed,
+            as_of=as_of_dt,
+            chunk_size=chunk_size,
+            supplier_first_id=_reserve_ids(connection, "supplier", num_suppliers),
+            num_suppliers=num_suppliers,
+            product_first_id=_reserve_ids(connection, "product", num_products),
+            num_products=num_products,
+            order_first_id=_reserve_ids(connection, '"order"', num_orders),
+            num_orders=num_orders,
+            order_chunk_size=order_chunk_size,
+            order_item_first_id=_reserve_ids(connection, "order_items", max_slots),
+            movement_first_id=_reserve_ids(
+                connection, "inventory_movement", num_products + max_slots
+            ),
+        )
+    logger.info(
+        f"Bulk seeding with seed={seed}, as_of={as_of.isoformat()}, "
+        f"workers={workers}, chunk_size={chunk_size}."
+    )
+
+    # Forked workers must not inherit pooled connections from the parent
+    engine.dispose()
+
+    phases = [
+        ("Creating Suppliers", _seed_supplier_chunk, plan.num_chunks(num_suppliers)),
+        ("Creating Products", _seed_product_chunk, plan.num_chunks(num_products)),
+        (
+            "Creating Orders",
+            _seed_order_chunk,
+            plan.num_chunks(num_orders, order_chunk_size),
+        ),
+    ]
+    with multiprocessing.Pool(
+        processes=workers, initializer=_init_worker, initargs=(database_url,)
+    ) as pool:
+        for description, task, num_chunks in phases:
+            tasks = [(plan, chunk) for chunk in range(num_chunks)]
+            with tqdm(total=num_chunks, desc=description) as progress:
+                for _ in pool.imap_unordered(task, tasks):
+                    progress.update()
+
+    # Bring quantity_in_stock in line with the movements that were written
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                UPDATE product p
+                SET quantity_in_stock = m.total
+                FROM (
+                    SELECT product_id, SUM(quantity_changed) AS total
+                    FROM inventory_movement
+                    WHERE product_id BETWEEN :first_id AND :last_id
+                    GROUP BY product_id
+                ) m
+                WHERE p.id = m.product_id
+                """
+            ),
+            {
+                "first_id": plan.product_first_id,
+                "last_id": plan.product_first_id + num_products - 1,
+            },
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(
+            text('ANALYZE supplier, product, "order", order_items, inventory_movement')
+        )
+    logger.info(
+        f"Successfully bulk seeded {num_suppliers} suppliers, {num_products} products "
+        f"and {num_orders} orders."
+    )
@@ -0,0 +1,93 @@
+# scripts/export.py
+"""
+Exports the catalog or the movement history to a file, with the same
+exporter as GET /export/... (app/core/export.py), for nightly jobs.
+
+    python -m scripts.export products --output products.csv
+    python -m scripts.export inventory-movements --from 2026-01-01 --to 2026-02-01 \\
+        --format ndjson --output movements.ndjson
+
+Without --output, the export is written to stdout. Memory use stays the same
+whatever the size of the export.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import sys
+import time
+
+from app.core import export
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _utc_datetime(value: str) -> datetime.datetime:
+    at = datetime.datetime.fromisoformat(value)
+    return at if at.tzinfo else at.replace(tzinfo=datetime.timezone.utc)
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.what == "products":
+        blocks = export.export_products(
+            AsyncSessionLocal, args.format, chunk_size=args.chunk_size
+        )
+    else:
+        blocks = export.export_movements(
+            AsyncSessionLocal,
+            args.format,
+            start=args.start,
+            end=args.end,
+            chunk_size=args.chunk_size,
+        )
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    written = 0
+    try:
+        async for block in blocks:
+            output.write(block)
+            written += len(block)
+    finally:
+        if args.output:
+            output.close()
+        await async_engine.dispose()
+    logger.info(
+        f"Exported {args.what}: {written / 1e6:.1f} MB "
+        f"in {time.perf_counter() - started:.1f} s."
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export data to CSV or NDJSON.")
+    parser.add_argument("what", choices=["products", "inventory-movements"])
+    parser.add_argument("--format", choices=sorted(export.MEDIA_TYPES), default="csv")
+    parser.add_argument("--output", help="File to write (default: stdout).")
+    parser.add_argument(
+        "--from",
+        dest="start",
+        type=_utc_datetime,
+        help="inventory-movements: first timestamp to export (UTC if no zone).",
+    )
+    parser.add_argument(
+        "--to",
+        dest="end",
+        type=_utc_datetime,
+        help="inventory-movements: timestamp to stop before (UTC if no zone).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.EXPORT_CHUNK_SIZE,
+        help="Rows fetched and written at a time.",
+    )
+    args = parser.parse_args()
+    if args.start and args.end and args.end <= args.start:
+        parser.error("--to must be after --from")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
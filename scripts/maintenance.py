@@ -0,0 +1,92 @@
+# scripts/maintenance.py
+"""
+Command line access to the maintenance operations also exposed under
+/maintenance, for cron jobs and one-off runs.
+
+    python -m scripts.maintenance rebuild-pending-orders
+    python -m scripts.maintenance check-pending-orders
+    python -m scripts.maintenance refresh-stock-valuation
+    python -m scripts.maintenance maintain-partitions [--granularity month] [--ahead 3]
+    python -m scripts.maintenance rebuild-movement-rollup --start 2026-01-01 --end 2026-02-01
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import sys
+
+from app.core.config import settings
+from app.crud import crud_analytics, crud_maintenance, crud_report
+from app.db.session import AsyncSessionLocal, async_engine
+
+logging.basicConfig(level=logging.INFO)
+
+COMMANDS = {
+    "rebuild-pending-orders": lambda db, args: (
+        crud_report.rebuild_pending_orders_report(db)
+    ),
+    "check-pending-orders": lambda db, args: crud_report.check_pending_orders_report(
+        db
+    ),
+    "refresh-stock-valuation": lambda db, args: crud_report.refresh_stock_valuation(db),
+    "rebuild-movement-rollup": lambda db, args: (
+        crud_analytics.rebuild_movement_rollup(db, args.start, args.end)
+    ),
+    "maintain-partitions": lambda db, args: (
+        crud_maintenance.maintain_inventory_partitions(
+            db, granularity=args.granularity, ahead=args.ahead
+        )
+    ),
+}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await COMMANDS[args.command](db, args)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a maintenance operation.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "--granularity",
+        choices=["year", "month"],
+        default=settings.INVENTORY_PARTITION_GRANULARITY,
+        help="maintain-partitions: size of the partitions to create.",
+    )
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=settings.INVENTORY_PARTITIONS_AHEAD,
+        help="maintain-partitions: periods past the current one to create.",
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.date.fromisoformat,
+        help="rebuild-movement-rollup: first day to rebuild.",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.date.fromisoformat,
+        help="rebuild-movement-rollup: day after the last one to rebuild.",
+    )
+    args = parser.parse_args()
+    if args.command == "rebuild-movement-rollup" and not (args.start and args.end):
+        parser.error("rebuild-movement-rollup needs --start and --end")
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2, default=str))
+    if (
+        result.get("consistent") is False
+        or result.get("status") == "error"
+        or result.get("errors")
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 # scripts/seed.py
 
 import argparse
+import asyncio
+import datetime
 import logging
+import os
 import random
 
 from faker import Faker
@@ -9,9 +12,22 @@ from faker_commerce import Provider as CommerceProvider
 from sqlalchemy.orm import Session
 from tqdm import tqdm
 
-from app.db.session import SessionLocal
-from app.models import InventoryMovement, Order, OrderItem, Product, Supplier
+from app.core.config import settings
+from app.crud import crud_analytics, crud_report
+from app.crud.crud_maintenance import create_inventory_partitions_between
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.models import (
+    InventoryMovement,
+    MovementDailyRollup,
+    Order,
+    OrderItem,
+    Product,
+    StockSnapshot,
+    Supplier,
+    SupplierPendingOrders,
+)
 from app.models.inventory_movement import MovementType
+from scripts.bulk_seed import SCALE_PROFILES, bulk_seed, truncate_all
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
@@ -27,7 +43,6 @@ def seed_data(db: Session, num_suppliers: int, num_products: int, num_orders: in
     """
     Populates the database with a large set of realistic test data.
     """
-
     # --- 1. SEED SUPPLIERS ---
     logger.info("Seeding suppliers...")
     suppliers = []
@@ -139,6 +154,9 @@ def clean_data(db: Session):
     logger.warning("Cleaning all data from the database...")
     # The order of deletion is critical to avoid foreign key constraint errors
     db.query(InventoryMovement).delete()
+    db.query(MovementDailyRollup).delete()
+    db.query(StockSnapshot).delete()
+    db.query(SupplierPendingOrders).delete()
     db.query(OrderItem).delete()
     db.query(Order).delete()
     db.query(Product).delete()
@@ -147,35 +165,143 @@ def clean_data(db: Session):
     logger.info("All data has been deleted.")
 
 
+async def create_partitions(newest: datetime.date) -> None:
+    """
+    Creates the inventory_movement partitions, at the configured granularity,
+    for movements dated from two years before `newest` up to it.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            outcome = await create_inventory_partitions_between(
+                db,
+                datetime.date(newest.year - 2, 1, 1),
+                newest,
+                granularity=settings.INVENTORY_PARTITION_GRANULARITY,
+            )
+    finally:
+        await async_engine.dispose()
+    if outcome["errors"]:
+        raise RuntimeError(
+            "Could not create inventory partitions: " + " ".join(outcome["errors"])
+        )
+
+
+async def rebuild_derived_tables(newest: datetime.date) -> None:
+    """
+    Recomputes the tables and views that the API keeps up to date as it
+    writes, or that are refreshed on a schedule, since seeding inserts orders,
+    products and movements directly. Movements are dated from two years
+    before `newest` up to it.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud_analytics.rebuild_movement_rollup(
+                db,
+                datetime.date(newest.year - 2, 1, 1),
+                newest + datetime.timedelta(days=1),
+            )
+            await crud_report.rebuild_pending_orders_report(db)
+            await crud_report.refresh_stock_valuation(db)
+    finally:
+        await async_engine.dispose()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Seed the database with test data.")
     parser.add_argument(
         "--clean", action="store_true", help="Delete all existing data before seeding."
     )
     parser.add_argument(
-        "--suppliers", type=int, default=50, help="Number of suppliers to create."
+        "--scale",
+        choices=sorted(SCALE_PROFILES),
+        default="small",
+        help="Dataset size profile; explicit counts below override it.",
+    )
+    parser.add_argument(
+        "--suppliers", type=int, default=None, help="Number of suppliers to create."
+    )
+    parser.add_argument(
+        "--products", type=int, default=None, help="Number of products to create."
     )
     parser.add_argument(
-        "--products", type=int, default=500, help="Number of products to create."
+        "--orders", type=int, default=None, help="Number of orders to create."
     )
     parser.add_argument(
-        "--orders", type=int, default=2000, help="Number of orders to create."
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed; the same seed reproduces the same dataset.",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Generate data in worker processes and load it with COPY.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes for --bulk.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        help="Rows generated per worker task for --bulk.",
+    )
+    parser.add_argument(
+        "--as-of",
+        type=datetime.date.fromisoformat,
+        default=datetime.date.today(),
+        help="Date (YYYY-MM-DD) that --bulk timestamps are relative to.",
     )
     args = parser.parse_args()
 
-    db = SessionLocal()
-    try:
-        if args.clean:
-            clean_data(db)
+    profile = SCALE_PROFILES[args.scale]
+    num_suppliers = (
+        args.suppliers if args.suppliers is not None else profile["suppliers"]
+    )
+    num_products = args.products if args.products is not None else profile["products"]
+    num_orders = args.orders if args.orders is not None else profile["orders"]
 
-        seed_data(
-            db=db,
-            num_suppliers=args.suppliers,
-            num_products=args.products,
-            num_orders=args.orders,
+    # Bulk timestamps are relative to --as-of, the others to today
+    newest = args.as_of if args.bulk else datetime.date.today()
+    asyncio.run(create_partitions(newest))
+
+    if args.bulk:
+        if args.clean:
+            truncate_all(engine)
+        bulk_seed(
+            engine,
+            database_url=settings.DATABASE_URL,
+            num_suppliers=num_suppliers,
+            num_products=num_products,
+            num_orders=num_orders,
+            seed=args.seed if args.seed is not None else 0,
+            as_of=args.as_of,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
         )
-    finally:
-        db.close()
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+            Faker.seed(args.seed)
+
+        db = SessionLocal()
+        try:
+            if args.clean:
+                clean_data(db)
+
+            seed_data(
+                db=db,
+                num_suppliers=num_suppliers,
+                num_products=num_products,
+                num_orders=num_orders,
+            )
+        finally:
+            db.close()
+
+    asyncio.run(rebuild_derived_tables(newest))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+# tests/test_import_time.py
+"""
+Cold-start budget of app.main, as checked by `python -m benchmarks.import_time`.
+"""
+from benchmarks.import_time import BUDGET_MS, forbidden_imports, import_times, total_ms
+
+MODULE = "app.main"
+RUNS = 5
+
+
+def test_import_time_within_budget():
+    # The first run may have to write bytecode caches
+    import_times(MODULE)
+    fastest_ms = min(total_ms(import_times(MODULE)) for _ in range(RUNS))
+    assert fastest_ms <= BUDGET_MS, f"import {MODULE} took {fastest_ms:.0f} ms"
+
+
+def test_no_tooling_imported():
+    assert forbidden_imports(import_times(MODULE)) == []
@@ -0,0 +1,152 @@
+# tests/test_supplier_queries.py
+"""
+Suppliers with their products and aggregates must load in a fixed number of
+statements, however many suppliers a page holds and however many products
+each supplier has.
+"""
+import contextlib
+import uuid
+from decimal import Decimal
+from typing import Iterator
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.crud.crud_supplier import SUPPLIER_SORT_KEYS
+from app.crud.pagination import encode_cursor
+from app.db.session import AsyncSessionLocal, async_engine, replica_engine
+from app.models.product import Product
+from app.models.supplier import Supplier
+
+pytestmark = pytest.mark.anyio
+
+# Products of each supplier created for the tests
+PRODUCT_COUNTS = [0, 1, 2, 5, 3, 8]
+
+# The supplier (or page), then the products of all of them
+LOAD_STATEMENTS = 2
+# The same for the versions an If-None-Match is checked against
+ETAG_STATEMENTS = 2
+
+
+@contextlib.contextmanager
+def count_statements() -> Iterator[list[str]]:
+    """
+    Collects the statements sent to the database the read routes use.
+    """
+    statements: list[str] = []
+    engine = (replica_engine or async_engine).sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def supplier_ids(client):
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        suppliers = [
+            Supplier(name=f"Test supplier {tag} {i}", email=f"{tag}.{i}@example.com")
+            for i in range(len(PRODUCT_COUNTS))
+        ]
+        db.add_all(suppliers)
+        await db.flush()
+        db.add_all(
+            Product(
+                sku=f"{tag}-{i}-{j}",
+                name=f"Test product {tag} {i} {j}",
+                price=Decimal("9.99"),
+                quantity_in_stock=j,
+                supplier_id=supplier.id,
+            )
+            for i, (supplier, count) in enumerate(zip(suppliers, PRODUCT_COUNTS))
+            for j in range(count)
+        )
+        await db.commit()
+        ids = [supplier.id for supplier in suppliers]
+    yield ids
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Product).where(Product.supplier_id.in_(ids)))
+        await db.execute(delete(Supplier).where(Supplier.id.in_(ids)))
+        await db.commit()
+
+
+async def test_supplier_detail_statement_count(client, supplier_ids):
+    counts = set()
+    for supplier_id, product_count in zip(supplier_ids, PRODUCT_COUNTS):
+        with count_statements() as statements:
+            response = await client.get(f"/suppliers/{supplier_id}")
+        assert response.status_code == 200
+        assert len(response.json()["products"]) == product_count
+        assert response.json()["product_count"] == product_count
+        counts.add(len(statements))
+    assert counts == {LOAD_STATEMENTS}, counts
+
+
+async def test_supplier_detail_if_none_match_statement_count(client, supplier_ids):
+    stale, fresh = set(), set()
+    for supplier_id in supplier_ids:
+        with count_statements() as statements:
+            response = await client.get(
+                f"/suppliers/{supplier_id}", headers={"If-None-Match": '"stale"'}
+            )
+        assert response.status_code == 200
+        stale.add(len(statements))
+
+        with count_statements() as statements:
+            response = await client.get(
+                f"/suppliers/{supplier_id}",
+                headers={"If-None-Match": response.headers["ETag"]},
+            )
+        assert response.status_code == 304
+        fresh.add(len(statements))
+    assert stale == {ETAG_STATEMENTS + LOAD_STATEMENTS}, stale
+    assert fresh == {ETAG_STATEMENTS}, fresh
+
+
+async def test_supplier_page_with_products_statement_count(client, supplier_ids):
+    # Starts the listing at the suppliers created for the test
+    cursor = encode_cursor(SUPPLIER_SORT_KEYS["id"], [supplier_ids[0] - 1])
+    counts = set()
+    for limit in (2, 5):
+        with count_statements() as statements:
+            response = await client.get(
+                "/suppliers/",
+                params={"include": "products", "limit": limit, "cursor": cursor},
+            )
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["id"] for item in items] == supplier_ids[:limit]
+        assert [len(item["products"]) for item in items] == PRODUCT_COUNTS[:limit]
+        counts.add(len(statements))
+    assert counts == {LOAD_STATEMENTS}, counts
+
+
+async def test_supplier_page_if_none_match_statement_count(client, supplier_ids):
+    cursor = encode_cursor(SUPPLIER_SORT_KEYS["id"], [supplier_ids[0] - 1])
+    stale, fresh = set(), set()
+    for limit in (2, 5):
+        params = {"include": "products", "limit": limit, "cursor": cursor}
+        with count_statements() as statements:
+            response = await client.get(
+                "/suppliers/", params=params, headers={"If-None-Match": '"stale"'}
+            )
+        assert response.status_code == 200
+        stale.add(len(statements))
+
+        with count_statements() as statements:
+            response = await client.get(
+                "/suppliers/",
+                params=params,
+                headers={"If-None-Match": response.headers["ETag"]},
+            )
+        assert response.status_code == 304
+        fresh.add(len(statements))
+    assert stale == {ETAG_STATEMENTS + LOAD_STATEMENTS}, stale
+    assert fresh == {ETAG_STATEMENTS}, fresh